@@ -0,0 +1,83 @@
+"""Compare chunk_pdf_content against the langchain splitter it replaced.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_chunker --pages 2000
+"""
+
+import argparse
+import random
+import time
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from src.agent.state import PDFPageData
+from src.agent.utils import chunk_pdf_content
+from src.agent.utils.chunk_pdf_content import (
+    CHUNK_OVERLAP,
+    CHUNK_SEPARATORS,
+    CHUNK_SIZE,
+)
+
+VOCABULARY = "the cell membrane energy protein transport gradient enzyme".split()
+
+
+def synthetic_pages(count: int, seed: int = 0) -> list[PDFPageData]:
+    """Pages of roughly 2-4k characters with paragraph and line breaks."""
+    rng = random.Random(seed)
+    pages: list[PDFPageData] = []
+    for page in range(count):
+        paragraphs = []
+        for _ in range(rng.randint(3, 8)):
+            lines = [
+                " ".join(rng.choices(VOCABULARY, k=rng.randint(6, 14)))
+                for _ in range(rng.randint(2, 6))
+            ]
+            paragraphs.append("\n".join(lines))
+        pages.append({"page_number": page + 1, "content": "\n\n".join(paragraphs)})
+    return pages
+
+
+def langchain_chunks(pages: list[PDFPageData]) -> list[str]:
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
+        separators=CHUNK_SEPARATORS,
+    )
+    docs = splitter.split_documents(
+        [
+            Document(page_content=p["content"], metadata={"page_number": p["page_number"]})
+            for p in pages
+        ]
+    )
+    return [doc.page_content for doc in docs]
+
+
+def best_of(repeat: int, func, pages):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(pages)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = synthetic_pages(args.pages)
+    baseline, expected = best_of(args.repeat, langchain_chunks, pages)
+    spans, chunks = best_of(args.repeat, chunk_pdf_content, pages)
+
+    assert [c["chunk_text"] for c in chunks] == expected, "chunk texts differ"
+    print(f"{args.pages} pages, {len(chunks)} chunks")
+    print(f"langchain splitter: {baseline * 1000:8.1f} ms")
+    print(f"chunk_pdf_content:  {spans * 1000:8.1f} ms  ({baseline / spans:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
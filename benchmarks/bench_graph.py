@@ -0,0 +1,141 @@
+"""Measure per-run graph startup cost and checkpointer memory across many runs.
+
+Three setups are compared, each over the same sequence of runs with the
+LLM stubbed out:
+
+  per-run    a freshly compiled graph and InMemorySaver for every run
+  shared     one compiled graph with an unbounded InMemorySaver
+  bounded    one compiled graph with the BoundedMemorySaver
+
+Each setup runs twice: on a small sparse PDF, and on a dense PDF of many
+chunks. The real generator subgraph runs for every chunk, so anything it
+writes to the saver (a namespace per chunk, say) shows up in the second
+case.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_graph --runs 200 --many-runs 20
+"""
+
+import argparse
+import asyncio
+import gc
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+from benchmarks.bench_ingest import make_pdf
+from src.agent import graph as graph_module
+from src.agent import llm
+from src.agent.schemas import MultipleQuiz, ReviewedQuiz
+from src.core import logger, settings
+
+QUIZ = {
+    "question": "Which gradient drives transport across the membrane?",
+    "option_a": "The proton gradient",
+    "option_b": "The sugar gradient",
+    "option_c": "The salt gradient",
+    "option_d": "The light gradient",
+    "answer": "A",
+    "explanation": "The proton gradient drives transport.",
+}
+
+
+class StubLLM:
+    def __init__(self, schema: type) -> None:
+        self.schema = schema
+
+    async def ainvoke(self, messages):
+        if self.schema is ReviewedQuiz:
+            return ReviewedQuiz(is_relevant=True, feedback="")
+        return MultipleQuiz.model_validate({"quizzes": [QUIZ]})
+
+
+async def measure(setup: str, runs: int, pdf_path: str) -> tuple[float, float, int, int]:
+    """Mean ms in build_graph per run, KiB retained per run, threads and namespaces kept."""
+    build = graph_module.build_graph.__wrapped__
+    saver_class = graph_module.BoundedMemorySaver
+
+    def compile_graph():
+        if setup == "bounded":
+            return build()
+        graph_module.BoundedMemorySaver = lambda **_: InMemorySaver()
+        try:
+            return build()
+        finally:
+            graph_module.BoundedMemorySaver = saver_class
+
+    shared = None if setup == "per-run" else compile_graph()
+    build_ms = 0.0
+
+    def build_graph():
+        nonlocal build_ms
+        started = time.perf_counter()
+        graph = shared if shared is not None else compile_graph()
+        build_ms += (time.perf_counter() - started) * 1000
+        return graph
+
+    graph_module.build_graph = build_graph
+    try:
+        await graph_module.graph_ainvoke(pdf_url_or_base64=pdf_path)  # warm-up
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        build_ms = 0.0
+        for _ in range(runs):
+            await graph_module.graph_ainvoke(pdf_url_or_base64=pdf_path)
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+    finally:
+        graph_module.build_graph = graph_module.lru_cache(maxsize=1)(build)
+
+    storage = {} if shared is None else shared.checkpointer.storage
+    namespaces = sum(len(thread) for thread in storage.values())
+    return build_ms / runs, retained / runs / 1024, len(storage), namespaces
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--many-runs", type=int, default=20)
+    parser.add_argument("--many-pages", type=int, default=40)
+    args = parser.parse_args()
+
+    # Per-node logging would dominate the timings.
+    logger.remove()
+    settings.PRECHECK_ENABLED = False
+    settings.LLM_CACHE_PATH = ""
+    llm.get_structured_llm = lambda schema, **_: StubLLM(schema)
+
+    cases = [
+        ("few chunks", args.runs, args.pages, "sparse"),
+        ("many chunks", args.many_runs, args.many_pages, "dense"),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, runs, pages, density in cases:
+            pdf_path = Path(tmp) / f"{density}.pdf"
+            make_pdf(pdf_path, pages, density, "letter" if density == "dense" else "a5")
+            # Keep the bound below the run count so eviction is exercised.
+            settings.CHECKPOINT_MAX_THREADS = max(runs // 4, 1)
+            print(f"\n{name}: {runs} runs of a {pages}-page {density} PDF")
+            print(
+                f"{'setup':<10} {'build ms/run':>13} {'KiB kept/run':>13}"
+                f" {'threads':>8} {'namespaces':>11}"
+            )
+            for setup in ("per-run", "shared", "bounded"):
+                build_ms, kib, threads, namespaces = asyncio.run(
+                    measure(setup, runs, str(pdf_path))
+                )
+                print(
+                    f"{setup:<10} {build_ms:>13.2f} {kib:>13.1f}"
+                    f" {threads:>8} {namespaces:>11}"
+                )
+
+
+if __name__ == "__main__":
+    main()
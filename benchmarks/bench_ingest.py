@@ -0,0 +1,198 @@
+"""Measure ingestion and chunking throughput on synthetic PDFs.
+
+Each case runs in a fresh process so peak RSS reflects that case alone.
+Results are printed as a table and written as JSON, one file per run,
+for comparing commits:
+
+    python -m benchmarks.bench_ingest
+    python -m benchmarks.bench_ingest --pages 100 1000 --compare results/<old>.json
+"""
+
+import argparse
+import base64
+import json
+import multiprocessing
+import platform
+import random
+import resource
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pymupdf
+
+from src.agent.utils import chunk_pdf_content, ingest_pdf
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+PAGE_SIZES = {"a5": pymupdf.paper_rect("a5"), "letter": pymupdf.paper_rect("letter")}
+# Words per page: a sparse slide deck versus a dense textbook page.
+DENSITIES = {"sparse": 60, "dense": 600}
+VOCABULARY = "the cell membrane energy protein transport gradient enzyme".split()
+
+
+@dataclass
+class Case:
+    pages: int
+    density: str
+    page_size: str
+    source: str  # "path" or "base64"
+
+
+@dataclass
+class Result:
+    case: Case
+    pdf_bytes: int
+    extracted_pages: int
+    chunks: int
+    ingest_seconds: float
+    chunk_seconds: float
+    pages_per_sec: float
+    chunks_per_sec: float
+    peak_rss_mb: float
+
+
+def make_pdf(path: Path, pages: int, density: str, page_size: str, seed: int = 0) -> None:
+    """Write a synthetic PDF of *pages* pages filled with random prose."""
+    rng = random.Random(seed)
+    rect = PAGE_SIZES[page_size]
+    words = DENSITIES[density]
+    doc = pymupdf.open()
+    for _ in range(pages):
+        page = doc.new_page(width=rect.width, height=rect.height)
+        text = " ".join(rng.choices(VOCABULARY, k=words))
+        page.insert_textbox(rect + (36, 36, -36, -36), text, fontsize=7)
+    doc.save(path)
+    doc.close()
+
+
+def run_case(case: Case, pdf_path: str) -> Result:
+    """Ingest and chunk one PDF; runs inside a fresh worker process."""
+    raw = Path(pdf_path).read_bytes()
+    source = (
+        pdf_path
+        if case.source == "path"
+        else "data:application/pdf;base64," + base64.b64encode(raw).decode()
+    )
+
+    started = time.perf_counter()
+    pages = ingest_pdf(source)
+    ingest_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    chunks = chunk_pdf_content(pages)
+    chunk_seconds = time.perf_counter() - started
+
+    # ru_maxrss is reported in kilobytes on Linux.
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return Result(
+        case=case,
+        pdf_bytes=len(raw),
+        extracted_pages=len(pages),
+        chunks=len(chunks),
+        ingest_seconds=ingest_seconds,
+        chunk_seconds=chunk_seconds,
+        pages_per_sec=len(pages) / ingest_seconds if ingest_seconds else 0.0,
+        chunks_per_sec=len(chunks) / chunk_seconds if chunk_seconds else 0.0,
+        peak_rss_mb=peak_rss_mb,
+    )
+
+
+def run_isolated(case: Case, pdf_path: Path) -> Result:
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(run_case, case, str(pdf_path)).result()
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def case_key(case: dict) -> tuple:
+    return case["pages"], case["density"], case["page_size"], case["source"]
+
+
+def print_table(results: list[Result], baseline: dict[tuple, dict]) -> None:
+    header = (
+        f"{'pages':>6} {'density':>7} {'size':>6} {'source':>6} "
+        f"{'pages/s':>9} {'chunks/s':>10} {'peak MB':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        case = result.case
+        line = (
+            f"{case.pages:>6} {case.density:>7} {case.page_size:>6} {case.source:>6} "
+            f"{result.pages_per_sec:>9.0f} {result.chunks_per_sec:>10.0f} "
+            f"{result.peak_rss_mb:>8.1f}"
+        )
+        previous = baseline.get(case_key(asdict(case)))
+        if previous and previous["pages_per_sec"]:
+            change = result.pages_per_sec / previous["pages_per_sec"] - 1
+            line += f"  ({change:+.0%} pages/s)"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[50, 250, 1000])
+    parser.add_argument("--density", choices=DENSITIES, nargs="+", default=list(DENSITIES))
+    parser.add_argument(
+        "--page-size", choices=PAGE_SIZES, nargs="+", default=list(PAGE_SIZES)
+    )
+    parser.add_argument(
+        "--source", choices=["path", "base64"], nargs="+", default=["path", "base64"]
+    )
+    parser.add_argument("--output", type=Path, help="Where to write the JSON results")
+    parser.add_argument("--compare", type=Path, help="Earlier JSON results to diff against")
+    args = parser.parse_args()
+
+    results: list[Result] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            for density in args.density:
+                for page_size in args.page_size:
+                    pdf_path = Path(tmp) / f"{pages}-{density}-{page_size}.pdf"
+                    make_pdf(pdf_path, pages, density, page_size)
+                    for source in args.source:
+                        case = Case(pages, density, page_size, source)
+                        results.append(run_isolated(case, pdf_path))
+
+    baseline: dict[tuple, dict] = {}
+    if args.compare:
+        previous = json.loads(args.compare.read_text())
+        baseline = {case_key(r["case"]): r for r in previous["results"]}
+    print_table(results, baseline)
+
+    revision = git_revision()
+    output = args.output or RESULTS_DIR / f"ingest-{revision}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(
+            {
+                "revision": revision,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "pymupdf": pymupdf.VersionBind,
+                "results": [asdict(result) for result in results],
+            },
+            indent=2,
+        )
+    )
+    print(f"\nWrote {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from .state import FinalQuizItem
+
+
+class TokenCounterCallback(AsyncCallbackHandler):
+    def __init__(self, on_total: Callable[[int], None] | None = None) -> None:
+        self.total_tokens: int = 0
+        # Called with the new total after every LLM call that reported usage.
+        self.on_total = on_total
+
+    async def on_llm_end(self, response: LLMResult, **kwargs: object) -> None:
+        try:
+            found = False
+            for gen_list in response.generations:
+                for gen in gen_list:
+                    msg = getattr(gen, "message", None)
+                    usage = getattr(msg, "usage_metadata", None) if msg else None
+                    if isinstance(usage, dict) and usage.get("total_tokens"):
+                        self.total_tokens += usage["total_tokens"]
+                        found = True
+                        break
+                if found:
+                    break
+            if not found and response.llm_output:
+                usage = response.llm_output.get("token_usage", {})
+                if isinstance(usage, dict):
+                    self.total_tokens += usage.get("total_tokens", 0)
+        except Exception:
+            pass
+        if self.on_total is not None:
+            self.on_total(self.total_tokens)
+
+
+@dataclass
+class RunBudget:
+    """Limits that end a run early; 0 leaves a limit off.
+
+    ``graph_ainvoke`` stops the run once ``max_questions`` accepted questions
+    exist, once ``max_tokens`` have been spent, or ``deadline_s`` seconds
+    after it started: no more chunks are released, chunks in progress are
+    cancelled, and the questions finished so far are returned.
+    """
+
+    max_questions: int = 0
+    max_tokens: int = 0
+    deadline_s: float = 0
+    # Which limit ended the run, once one has.
+    reason: str = ""
+
+    def check(self, questions: int, tokens: int) -> bool:
+        """Whether a limit has been reached; records the first one that was."""
+        if not self.reason:
+            if self.max_questions and questions >= self.max_questions:
+                self.reason = f"reached {self.max_questions} questions"
+            elif self.max_tokens and tokens >= self.max_tokens:
+                self.reason = f"spent {tokens} of {self.max_tokens} tokens"
+        return bool(self.reason)
+
+    def expire(self) -> None:
+        self.reason = self.reason or f"deadline of {self.deadline_s:g}s passed"
+
+    def trim(self, quizzes: list[FinalQuizItem]) -> list[FinalQuizItem]:
+        """Drop questions past the target that arrived before the run stopped."""
+        return quizzes[: self.max_questions] if self.max_questions else quizzes
@@ -0,0 +1,111 @@
+import time
+from collections import OrderedDict
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata
+from langgraph.checkpoint.memory import InMemorySaver
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """``InMemorySaver`` for a long-lived process that shares one compiled graph.
+
+    Only the latest checkpoint of each thread and namespace is kept, with the
+    blobs it references and its pending writes, which is all ``aget_state``
+    and the running graph need. Whole threads are evicted, least recently
+    written first, beyond *max_threads* or once idle for *ttl_seconds*
+    (0 disables either bound), except threads a run holds ``active``.
+    History (``aget_state_history``) is not kept.
+    """
+
+    def __init__(self, max_threads: int = 0, ttl_seconds: float = 0, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.max_threads = max_threads
+        self.ttl_seconds = ttl_seconds
+        # thread_id -> last write time, least recently written first.
+        self._touched: OrderedDict[str, float] = OrderedDict()
+        # (thread_id, checkpoint_ns) -> {channel: version} of the latest checkpoint.
+        self._versions: dict[tuple[str, str], dict[str, Any]] = {}
+        # thread_id -> runs in progress on it; these are never evicted.
+        self._active: dict[str, int] = {}
+
+    @property
+    def thread_count(self) -> int:
+        return len(self._touched)
+
+    @contextmanager
+    def active(self, thread_id: str) -> Iterator[None]:
+        """Keep *thread_id* from being evicted while a run is using it."""
+        self._active[thread_id] = self._active.get(thread_id, 0) + 1
+        try:
+            yield
+        finally:
+            self._active[thread_id] -= 1
+            if not self._active[thread_id]:
+                del self._active[thread_id]
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        self._prune(thread_id, checkpoint_ns, checkpoint["id"], new_versions)
+        self._touch(thread_id)
+        return saved
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        super().put_writes(config, writes, task_id, task_path)
+        self._touch(config["configurable"]["thread_id"])
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        self._touched.pop(thread_id, None)
+        for key in [key for key in self._versions if key[0] == thread_id]:
+            del self._versions[key]
+
+    def _prune(
+        self,
+        thread_id: str,
+        checkpoint_ns: str,
+        checkpoint_id: str,
+        new_versions: ChannelVersions,
+    ) -> None:
+        """Drop what the new checkpoint supersedes in its thread and namespace."""
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        for old_id in [old_id for old_id in checkpoints if old_id != checkpoint_id]:
+            del checkpoints[old_id]
+            self.writes.pop((thread_id, checkpoint_ns, old_id), None)
+
+        versions = self._versions.setdefault((thread_id, checkpoint_ns), {})
+        for channel, version in new_versions.items():
+            old_version = versions.get(channel)
+            if old_version is not None and old_version != version:
+                self.blobs.pop((thread_id, checkpoint_ns, channel, old_version), None)
+            versions[channel] = version
+
+    def _touch(self, thread_id: str) -> None:
+        now = time.monotonic()
+        self._touched[thread_id] = now
+        self._touched.move_to_end(thread_id)
+        excess = len(self._touched) - self.max_threads if self.max_threads > 0 else 0
+        for oldest, written in list(self._touched.items()):
+            expired = self.ttl_seconds > 0 and now - written > self.ttl_seconds
+            if excess <= 0 and not expired:
+                break
+            if oldest == thread_id or oldest in self._active:
+                continue
+            self.delete_thread(oldest)
+            excess -= 1
@@ -0,0 +1,137 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from threading import Lock
+
+from ..core import logger, settings
+
+# Multiplicative decrease on a rate-limit error, and the minimum time between
+# two decreases so one burst of 429s only halves the limit once.
+BACKOFF_FACTOR = 0.5
+BACKOFF_COOLDOWN_SECONDS = 2.0
+LATENCY_SMOOTHING = 0.2
+
+
+class AdaptiveLimiter:
+    """AIMD bound on concurrent LLM calls to one provider/model.
+
+    Each successful call raises the limit by ``1 / limit`` (about one slot per
+    round of calls); a rate-limit error halves it, at most once per cooldown.
+    The limit stays within ``[minimum, maximum]``.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int) -> None:
+        self.minimum = max(minimum, 1)
+        self.maximum = max(maximum, self.minimum)
+        self._limit = float(min(max(initial, self.minimum), self.maximum))
+        self.in_flight = 0
+        self.successes = 0
+        self.rate_limits = 0
+        self.latency_ms = 0.0
+        self._last_backoff = float("-inf")
+        self._waiters: list[asyncio.Future[None]] = []
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one in-flight slot for the duration of an LLM call."""
+        await self.acquire()
+        try:
+            with self.observe():
+                yield
+        finally:
+            self.release()
+
+    @contextmanager
+    def observe(self) -> Iterator[None]:
+        """Feed one call's outcome into the limit: its latency, or a backoff on a 429.
+
+        For a call made while holding a slot taken with ``acquire``.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as error:
+            if is_rate_limit_error(error):
+                self.record_rate_limit()
+            raise
+        else:
+            self.record_success((time.perf_counter() - started) * 1000)
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self.in_flight >= self.limit:
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Pass a wake-up we can no longer use on to the next waiter.
+                if waiter.done() and not waiter.cancelled():
+                    self._wake()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def record_success(self, latency_ms: float) -> None:
+        self.successes += 1
+        self.latency_ms += LATENCY_SMOOTHING * (latency_ms - self.latency_ms)
+        self._limit = min(self._limit + 1 / self._limit, float(self.maximum))
+        self._wake()
+
+    def record_rate_limit(self) -> None:
+        self.rate_limits += 1
+        now = time.monotonic()
+        if now - self._last_backoff < BACKOFF_COOLDOWN_SECONDS:
+            return
+        self._last_backoff = now
+        self._limit = max(self._limit * BACKOFF_FACTOR, float(self.minimum))
+        logger.warning(f"Rate limited; concurrency limit lowered to {self.limit}")
+
+    def _wake(self) -> None:
+        free = self.limit - self.in_flight
+        for waiter in list(self._waiters):
+            if free <= 0:
+                break
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Whether *error* is a provider's HTTP 429 / rate-limit response."""
+    status = getattr(error, "status_code", None) or getattr(
+        getattr(error, "response", None), "status_code", None
+    )
+    return status == 429 or "ratelimit" in type(error).__name__.lower()
+
+
+_limiters: dict[tuple[str, str], AdaptiveLimiter] = {}
+_limiters_lock = Lock()
+
+
+def get_limiter(provider: str, model: str) -> AdaptiveLimiter | None:
+    """The shared limiter for *provider*/*model*, or None when adaptive
+    concurrency is disabled."""
+    if not settings.ADAPTIVE_CONCURRENCY:
+        return None
+    with _limiters_lock:
+        limiter = _limiters.get((provider, model))
+        if limiter is None:
+            limiter = AdaptiveLimiter(
+                settings.GEN_CONCURRENCY,
+                settings.GEN_CONCURRENCY_MIN,
+                settings.GEN_CONCURRENCY_MAX,
+            )
+            _limiters[(provider, model)] = limiter
+        return limiter
@@ -1,53 +1,101 @@
 import asyncio
 import os
-from functools import lru_cache
-from typing import Awaitable, Callable, Final, Literal, cast
+import time
+from contextlib import nullcontext
+from functools import lru_cache, partial
+from typing import Awaitable, Callable, Final, Literal, Sequence, cast
 
-from langchain.messages import HumanMessage
 from langchain_core.runnables import RunnableConfig
-from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.state import CompiledStateGraph
 from langgraph.types import RetryPolicy, Send, StateSnapshot
 
-from ..core import logger, settings
-from .llm import get_llm
-from .prompts import GENERATE_QUIZ_PROMPT, REVIEW_QUIZ_PROMPT
-from .schemas import MultipleQuiz, ReviewedQuiz
+from ..core import logger, run_blocking, run_blocking_in_thread, settings
+from .budget import RunBudget, TokenCounterCallback
+from .checkpoint import BoundedMemorySaver
+from .llm import context_window, invoke_structured
+from .rate_limit import current_session
+from .run_context import RunContext, get_run_context
+from .scheduler import ChunkScheduler, SchedulePolicy
+from .prompts import (
+    BATCH_INSTRUCTION_PROMPT,
+    BATCH_SECTION_PROMPT,
+    GENERATE_QUIZ_PROMPT,
+    QUESTION_COUNT_PROMPT,
+    REGENERATE_FEEDBACK_PROMPT,
+    REPLACEMENT_PROMPT,
+    REVIEW_QUIZ_PROMPT,
+    REVIEW_VERDICTS_PROMPT,
+    SELF_REVIEW_PROMPT,
+)
+from .schemas import (
+    MultipleBatchedQuiz,
+    MultipleQuiz,
+    ReviewedQuiz,
+    SelfReviewedBatchedQuiz,
+    SelfReviewedQuiz,
+)
 from .state import (
     ChunkData,
+    ChunkTask,
     FinalQuizItem,
     GlobalQuizState,
+    PageBatchOutput,
+    PageBatchState,
     PDFPageData,
+    ReviewMode,
     SubGraphState,
 )
-from .utils import chunk_pdf_content, ingest_pdf
+from .utils import (
+    CHUNKER_PARAMS,
+    PACKER_VERSION,
+    PDFSource,
+    cached_stage,
+    chunk_pdf_content,
+    count_pdf_pages,
+    dedup_chunks,
+    estimate_tokens,
+    get_pdf_cache,
+    get_run_store,
+    ingest_pdf,
+    pack_pdf_content,
+    pdf_digest,
+    precheck_quiz,
+    resolve_pdf_source,
+    sample_chunks_per_page,
+    select_pages,
+    spill_pdf,
+)
+
+# Receives the current unreviewed questions for a batch of chunk ids; each
+# call replaces what was published for those chunks before.
+OnQuestions = Callable[[list[str], list[FinalQuizItem]], Awaitable[None] | None]
 
 # ============================================================================
 # MAIN GRAPH
 # ============================================================================
 
 
+@lru_cache(maxsize=1)
 def build_graph() -> CompiledStateGraph:
+    """Compile the main graph once; every run shares it, keyed by thread_id."""
 
-    memory = InMemorySaver()
+    memory = BoundedMemorySaver(
+        max_threads=settings.CHECKPOINT_MAX_THREADS,
+        ttl_seconds=settings.CHECKPOINT_TTL_MINUTES * 60,
+    )
     builder = StateGraph(GlobalQuizState)
 
     # Nodes
-    builder.add_node(node="page_ingestor", action=page_ingestor)
-    builder.add_node(node="chunking", action=chunking)
-    builder.add_node(
-        node="subgraph_generator",
-        action=subgraph_generator,
-    )
+    builder.add_node(node="page_planner", action=page_planner)
+    builder.add_node(node="page_batch", action=build_page_batch_subgraph())
 
     builder.add_node(node="aggregator", action=aggregator)
 
     # Edges
-    builder.add_edge(start_key=START, end_key="page_ingestor")
-    builder.add_edge(start_key="page_ingestor", end_key="chunking")
-    builder.add_conditional_edges(source="chunking", path=route_chunks_to_subgraph)
-    builder.add_edge(start_key="subgraph_generator", end_key="aggregator")
+    builder.add_edge(start_key=START, end_key="page_planner")
+    builder.add_conditional_edges(source="page_planner", path=route_page_batches)
+    builder.add_edge(start_key="page_batch", end_key="aggregator")
 
     builder.add_edge(start_key="aggregator", end_key=END)
 
@@ -58,64 +106,404 @@ def build_graph() -> CompiledStateGraph:
     return graph
 
 
-async def page_ingestor(state: GlobalQuizState) -> dict[str, list[PDFPageData]]:
+def build_page_batch_subgraph() -> CompiledStateGraph:
+    """Compile the ingest/chunk/dedup/generate pipeline for one page batch.
+
+    Every batch is its own ``page_batch`` task in a single superstep of the
+    main graph, so a batch's generation never waits at a barrier for other
+    batches to be read or generated. Like the generator subgraph it never
+    checkpoints; only its quizzes and stats flow back to the main graph.
+    """
+    builder = StateGraph(PageBatchState, output_schema=PageBatchOutput)
+
+    builder.add_node(node="page_ingestor", action=page_ingestor)
+    builder.add_node(node="chunking", action=chunking)
+    builder.add_node(node="dedup", action=dedup)
+    builder.add_node(node="subgraph_generator", action=subgraph_generator)
+
+    builder.add_edge(start_key=START, end_key="page_ingestor")
+    builder.add_edge(start_key="page_ingestor", end_key="chunking")
+    builder.add_edge(start_key="chunking", end_key="dedup")
+    builder.add_conditional_edges(source="dedup", path=route_chunks_to_subgraph)
+    builder.add_edge(start_key="subgraph_generator", end_key=END)
+
+    return builder.compile(checkpointer=False)
+
+
+async def page_planner(
+    state: GlobalQuizState, config: RunnableConfig
+) -> dict[str, object]:
+    """Count the PDF's pages and apply the page range / sampling before any extraction."""
+
+    logger.info("--------🚦 NODE - PAGE PLANNER--------")
+    pdf_source = _pdf_source(state, config)
+    return await _offload(pdf_source)(
+        _plan_pages,
+        pdf_source,
+        page_ranges=state.get("page_ranges", ""),
+        sample_chunks=state.get("sample_chunks", 0),
+    )
+
+
+def _pdf_source(state: GlobalQuizState | PageBatchState, config: RunnableConfig) -> PDFSource:
+    # In-memory sources arrive through the run config, so they are never checkpointed.
+    return config.get("configurable", {}).get("pdf_source") or state.get(
+        "pdf_url_or_base64", ""
+    )
+
+
+def _offload(pdf_source: PDFSource) -> Callable[..., Awaitable]:
+    # Buffers stay on the thread pool: shipping them to a process copies them.
+    return run_blocking if isinstance(pdf_source, str) else run_blocking_in_thread
+
+
+def _plan_pages(
+    pdf_source: PDFSource, page_ranges: str, sample_chunks: int
+) -> dict[str, object]:
+    digest = pdf_digest(pdf_source) if get_pdf_cache() is not None else ""
+    document_pages = cached_stage("page_count", digest, lambda: count_pdf_pages(pdf_source))
+    page_indices = select_pages(
+        document_pages, page_ranges=page_ranges, sample_chunks=sample_chunks
+    )
+    return {
+        "pdf_digest": digest,
+        "page_indices": page_indices,
+        "page_count": len(page_indices),
+    }
+
+
+def route_page_batches(state: GlobalQuizState, config: RunnableConfig) -> list[Send] | str:
+    """Send every ``INGEST_BATCH_PAGES`` selected pages to their own ``page_batch`` task.
+
+    The batches are read in the order the run's schedule policy asks for.
+    """
+    page_indices = state.get("page_indices", [])
+    size = settings.INGEST_BATCH_PAGES
+    if size <= 0:
+        size = max(len(page_indices), 1)
+    offsets = range(0, len(page_indices), size)
+    read_order = get_run_context(config).scheduler.read_order(len(offsets))
+    turns = {batch: turn for turn, batch in enumerate(read_order)}
+    routes = [
+        Send(
+            "page_batch",
+            PageBatchState(
+                pdf_url_or_base64=state.get("pdf_url_or_base64", ""),
+                pdf_digest=state.get("pdf_digest", ""),
+                batch_index=turns[index],
+                page_indices=page_indices[offset : offset + size],
+                page_offset=offset,
+                page_count=len(page_indices),
+                page_numbers=[],
+                chunk_ids=[],
+                sample_chunks=state.get("sample_chunks", 0),
+                chunk_tokens=state.get("chunk_tokens", 0),
+                questions_per_chunk=state.get("questions_per_chunk", 0),
+                review_mode=state.get("review_mode", "separate"),
+                run_stats={},
+                final_quiz=[],
+                completed_chunks=[],
+            ),
+        )
+        for index, offset in enumerate(offsets)
+    ]
+    return routes or "aggregator"
+
+
+async def page_ingestor(
+    state: PageBatchState, config: RunnableConfig
+) -> dict[str, object]:
     """
     Receives raw PDF content and prepares it for crawling/chunking.
+
+    Reads the batch's pages once every earlier batch has been read, so pages
+    are extracted one batch at a time while earlier batches already generate.
+    Page text goes to the run context, so it is never checkpointed.
     """
 
     logger.info("--------🚦 NODE - PAGE INGESTOR--------")
-    pdf_content: list[PDFPageData] = ingest_pdf(state.get("pdf_url_or_base64", ""))
-    logger.debug(f"Ingested PDF content length: {len(pdf_content)} pages")
-    # logger.debug(f"Sample of PDF content: {pdf_content[:2]}")
+    context = get_run_context(config)
+    async with context.ingest_turns.turn(state.get("batch_index", 0)):
+        if context.scheduler.stopped:
+            # The run was stopped early: read no more pages.
+            return {"page_numbers": []}
+        pdf_source = _pdf_source(state, config)
+        pages: list[PDFPageData] = await _offload(pdf_source)(
+            _read_pages,
+            pdf_source,
+            digest=state.get("pdf_digest", ""),
+            pages=state.get("page_indices", []),
+        )
+    context.pages.update((page["page_number"], page) for page in pages)
+    return {"page_numbers": [page["page_number"] for page in pages]}
 
-    return {
-        "pdf_pages_data": pdf_content,
-    }
+
+def _read_pages(pdf_source: PDFSource, digest: str, pages: list[int]) -> list[PDFPageData]:
+    pdf_content: list[PDFPageData] = cached_stage(
+        "pages",
+        digest,
+        lambda: ingest_pdf(pdf_source, pages=pages, workers=settings.INGEST_WORKERS),
+        pages=pages,
+    )
+    logger.debug(f"Ingested {len(pages)} pages: {len(pdf_content)} non-empty pages")
+    return pdf_content
 
 
-async def chunking(state: GlobalQuizState) -> dict[str, list[ChunkData]]:
+async def chunking(state: PageBatchState, config: RunnableConfig) -> dict[str, object]:
     """
     Breaks down PDF into processable chunks for quiz generation.
     """
     logger.info("--------🚦 NODE - CHUNKING--------")
-    chunks = chunk_pdf_content(state.get("pdf_pages_data", []))
+    context = get_run_context(config)
+    pages = [
+        context.pages.pop(number)
+        for number in state.get("page_numbers", [])
+        if number in context.pages
+    ]
+    chunks = await run_blocking(
+        _chunk_batch,
+        pages,
+        digest=state.get("pdf_digest", ""),
+        sample_chunks=state.get("sample_chunks", 0),
+        max_tokens=state.get("chunk_tokens", 0),
+        sampled_pages=[index + 1 for index in state.get("page_indices", [])],
+    )
     logger.debug(f"Generated {len(chunks)} chunks from PDF content -< {chunks[:2]}")
-    return {"crawled_chunks": chunks}
+    context.chunks.update((chunk["chunk_id"], chunk) for chunk in chunks)
+    return {"chunk_ids": [chunk["chunk_id"] for chunk in chunks]}
+
+
+def _chunk_batch(
+    pages: list[PDFPageData],
+    digest: str,
+    sample_chunks: int,
+    max_tokens: int = 0,
+    sampled_pages: Sequence[int] = (),
+) -> list[ChunkData]:
+    if max_tokens:
+        compute = partial(pack_pdf_content, pages, max_tokens)
+        params: dict[str, object] = {"chunker": PACKER_VERSION, "max_tokens": max_tokens}
+    else:
+        compute = partial(chunk_pdf_content, pages)
+        params = CHUNKER_PARAMS
+    chunks: list[ChunkData] = cached_stage(
+        "chunks",
+        digest if pages else "",
+        compute,
+        pages=[page["page_number"] for page in pages],
+        **params,
+    )
+    if sample_chunks:
+        chunks = sample_chunks_per_page(chunks, sampled_pages)
+    return chunks
 
 
-def route_chunks_to_subgraph(state: GlobalQuizState) -> list[Send]:
-    chunks = state.get("crawled_chunks", [])
-    provider = state.get("provider", "")
-    model_name = state.get("model_name", "")
-    api_key = state.get("api_key", "")
-    return [
-        Send(
-            "subgraph_generator",
-            {"chunk": chunk, "provider": provider, "model_name": model_name, "api_key": api_key},
+async def dedup(state: PageBatchState, config: RunnableConfig) -> dict[str, object]:
+    """
+    Drops boilerplate lines and near-duplicate chunks before they cost LLM calls.
+
+    Batches take turns, in the order they were read, so which of two
+    near-duplicates survives does not depend on task timing.
+    """
+    logger.info("--------🚦 NODE - DEDUP--------")
+    if not settings.DEDUP_ENABLED:
+        return {}
+
+    context = get_run_context(config)
+    chunk_ids = state.get("chunk_ids", [])
+    async with context.dedup_turns.turn(state.get("batch_index", 0)):
+        result = await run_blocking(
+            dedup_chunks,
+            [context.chunks[chunk_id] for chunk_id in chunk_ids if chunk_id in context.chunks],
+            boilerplate_lines=context.boilerplate_lines,
+            seen_signatures=context.chunk_signatures,
+            threshold=settings.DEDUP_THRESHOLD,
         )
-        for chunk in chunks
-    ]
+        context.chunk_signatures = result.signatures
+        context.boilerplate_lines = result.boilerplate_lines
+    logger.debug(
+        f"Dedup removed {result.chunks_removed} chunks and stripped "
+        f"{result.lines_stripped} boilerplate lines (~{result.tokens_saved} tokens)"
+    )
+    for chunk_id in chunk_ids:
+        context.chunks.pop(chunk_id, None)
+    context.chunks.update((chunk["chunk_id"], chunk) for chunk in result.chunks)
+    return {
+        "chunk_ids": [chunk["chunk_id"] for chunk in result.chunks],
+        "run_stats": {
+            "chunks_removed": result.chunks_removed,
+            "tokens_saved": result.tokens_saved,
+        },
+    }
+
 
+def default_concurrency() -> int:
+    """Chunks in progress at once when the caller does not choose.
 
-async def subgraph_generator(state: SubGraphState) -> dict[str, list[FinalQuizItem]]:
+    With adaptive concurrency the per-model limiter throttles the LLM calls
+    themselves, so the graph may keep up to its maximum in progress.
+    """
+    if settings.ADAPTIVE_CONCURRENCY:
+        return settings.GEN_CONCURRENCY_MAX
+    return settings.GEN_CONCURRENCY
+
+
+def chunk_token_budget(provider: str | None, model_name: str | None) -> int:
+    """Token size of packed chunks for this model, or 0 for character chunks."""
+    if settings.CHUNK_MODE != "tokens":
+        return 0
+    return min(settings.CHUNK_MAX_TOKENS, context_window(provider, model_name) // 4)
+
+
+async def route_chunks_to_subgraph(
+    state: PageBatchState, config: RunnableConfig
+) -> list[Send] | str:
+    """Send every batch at once; the run's scheduler decides when each starts.
+
+    Async so batches are queued on the event loop the scheduler runs on.
+    """
+    context = get_run_context(config)
+    chunks = [
+        context.chunks[chunk_id]
+        for chunk_id in state.get("chunk_ids", [])
+        if chunk_id in context.chunks
+    ]
+    questions_per_chunk = state.get("questions_per_chunk", 0)
+    review_mode = state.get("review_mode", "separate")
+    # Position of each page among the selected pages, for the priority policy.
+    offset = state.get("page_offset", 0)
+    positions = {
+        index + 1: offset + i for i, index in enumerate(state.get("page_indices", []))
+    }
+    total = state.get("page_count", 0)
+    routes: list[Send] = []
+    for batch in batch_chunks(chunks, context.provider, context.model_name):
+        chunk_ids = [chunk["chunk_id"] for chunk in batch]
+        context.scheduler.submit(
+            chunk_ids[0], batch, positions.get(batch[0]["page_number"], 0), total
+        )
+        # Each task carries chunk ids only; the chunks stay in the run context.
+        routes.append(
+            Send(
+                "subgraph_generator",
+                ChunkTask(
+                    chunk_ids=chunk_ids,
+                    questions_per_chunk=questions_per_chunk,
+                    review_mode=review_mode,
+                ),
+            )
+        )
+    return routes or END
+
+
+def batch_chunks(
+    chunks: list[ChunkData], provider: str | None, model_name: str | None
+) -> list[list[ChunkData]]:
+    """Group chunks into generation requests according to ``GEN_BATCH_SIZE``."""
+    size = settings.GEN_BATCH_SIZE
+    if size > 0:
+        return [chunks[i : i + size] for i in range(0, len(chunks), size)]
+
+    # Derive the batch from the model: fill a quarter of its context window.
+    budget = context_window(provider, model_name) // 4
+    batches: list[list[ChunkData]] = []
+    batch: list[ChunkData] = []
+    used = 0
+    for chunk in chunks:
+        tokens = estimate_tokens(chunk["chunk_text"])
+        if batch and (used + tokens > budget or len(batch) >= settings.GEN_BATCH_MAX):
+            batches.append(batch)
+            batch, used = [], 0
+        batch.append(chunk)
+        used += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+async def subgraph_generator(
+    state: ChunkTask, config: RunnableConfig | None = None
+) -> dict[str, list]:
     """
     Generate quiz from chunk using LLM.
+
+    Waits for the run's scheduler to admit the batch first; batches turned
+    away or cancelled by a stop are left for a resumed run. With a run store
+    configured, chunks this thread already finished are taken from the
+    store and only the missing ones are generated.
     """
+    context = get_run_context(config)
+    chunk_ids = state["chunk_ids"]
+    result = await context.scheduler.run(
+        chunk_ids[0], partial(_generate_batch, state, config, context)
+    )
+    if result is None:
+        # Turned away or cancelled by a stop; nothing was stored for these.
+        _release_chunks(context, chunk_ids)
+        return {"run_stats": {"chunks_skipped": len(chunk_ids)}}
+    return result
+
+
+async def _generate_batch(
+    state: ChunkTask, config: RunnableConfig | None, context: RunContext
+) -> dict[str, list]:
+    chunk_ids = state["chunk_ids"]
+    batch = [context.chunks[chunk_id] for chunk_id in chunk_ids if chunk_id in context.chunks]
+    thread_id = (config or {}).get("configurable", {}).get("thread_id", "")
+    run_store = get_run_store() if thread_id else None
+    stored: dict[str, list[FinalQuizItem]] = {}
+    if run_store is not None:
+        stored = await run_blocking_in_thread(run_store.get, thread_id, chunk_ids)
+    resumed = [quiz for chunk_id in chunk_ids for quiz in stored.get(chunk_id, [])]
+    resume_stats = {"chunks_resumed": len(stored)} if stored else {}
+    batch = [chunk for chunk in batch if chunk.get("chunk_id", "") not in stored]
+    if not batch:
+        if stored:
+            logger.info(f"resuming {len(stored)} finished chunk(s) from the run store")
+        _release_chunks(context, chunk_ids)
+        return {
+            "final_quiz": resumed,
+            "completed_chunks": chunk_ids,
+            "run_stats": resume_stats,
+        }
+
     subgraph = build_generator_subgraph()
     subgraph_state = SubGraphState(
-        chunk=state["chunk"],
+        chunk_ids=[chunk["chunk_id"] for chunk in batch],
         quiz=[],
+        accepted=[],
+        review_feedback="",
         iter_count=0,
         is_quiz_relevant=False,
-        provider=state.get("provider", settings.MODEL_PROVIDER),
-        model_name=state.get("model_name", ""),
-        api_key=state.get("api_key", ""),
+        questions_per_chunk=state.get("questions_per_chunk", 0),
+        review_mode=state.get("review_mode", "separate"),
+        precheck="",
+        run_stats={},
     )
     logger.info(
-        f"firing up subgraph generator for chunk_id: {state['chunk'].get('chunk_id', 'unknown')}"
+        f"firing up subgraph generator for chunk_id: {batch[0].get('chunk_id', 'unknown')}"
+        + (f" (+{len(batch) - 1} batched)" if len(batch) > 1 else "")
     )
-    subgraph_result = await subgraph.ainvoke(subgraph_state)
-    return {"final_quiz": subgraph_result.get("quiz", [])}
+    subgraph_result = await subgraph.ainvoke(subgraph_state, config)
+    final_quiz = subgraph_result.get("accepted", []) + subgraph_result.get("quiz", [])
+    if run_store is not None:
+        results: dict[str, list[FinalQuizItem]] = {
+            chunk.get("chunk_id", ""): [] for chunk in batch
+        }
+        for quiz in final_quiz:
+            results.setdefault(quiz.get("chunk_id", ""), []).append(quiz)
+        await run_blocking_in_thread(run_store.put, thread_id, results)
+    _release_chunks(context, chunk_ids)
+    return {
+        "final_quiz": resumed + final_quiz,
+        "completed_chunks": chunk_ids,
+        "run_stats": {**subgraph_result.get("run_stats", {}), **resume_stats},
+    }
+
+
+def _release_chunks(context: RunContext, chunk_ids: list[str]) -> None:
+    for chunk_id in chunk_ids:
+        context.chunks.pop(chunk_id, None)
 
 
 async def aggregator(state: GlobalQuizState) -> dict:
@@ -130,22 +518,56 @@ async def aggregator(state: GlobalQuizState) -> dict:
 
 MAX_SUBGRAPH_ITER: Final = 3
 
-retry_policy = RetryPolicy(jitter=True)
+_default_retry_on = RetryPolicy().retry_on
+
+
+def _retry_on(error: Exception) -> bool:
+    """LangGraph's default, plus LLM calls abandoned after ``LLM_CALL_TIMEOUT_S``.
+
+    ``TimeoutError`` is an ``OSError``, which the default never retries.
+    """
+    return isinstance(error, TimeoutError) or _default_retry_on(error)
+
+
+retry_policy = RetryPolicy(jitter=True, retry_on=_retry_on)
 
 
 @lru_cache(maxsize=1)
 def build_generator_subgraph() -> CompiledStateGraph:
+    """Compile the per-chunk generate/review loop.
+
+    It never checkpoints: its state lives for one ``subgraph_generator``
+    task, and the main graph's saver would otherwise keep a namespace per
+    chunk.
+    """
     subgraph_builder = StateGraph(SubGraphState)
 
     subgraph_builder.add_node(
         node="quiz_generator", action=quiz_generator, retry_policy=retry_policy
     )
+    subgraph_builder.add_node(node="quiz_prechecker", action=quiz_prechecker)
     subgraph_builder.add_node(
         node="quiz_reviewer", action=quiz_reviewer, retry_policy=retry_policy
     )
 
     subgraph_builder.add_edge(start_key=START, end_key="quiz_generator")
-    subgraph_builder.add_edge(start_key="quiz_generator", end_key="quiz_reviewer")
+    subgraph_builder.add_conditional_edges(
+        source="quiz_generator",
+        path=should_review_quiz,
+        path_map={
+            "review": "quiz_prechecker",
+            "completed": END,
+        },
+    )
+    subgraph_builder.add_conditional_edges(
+        source="quiz_prechecker",
+        path=route_after_precheck,
+        path_map={
+            "review": "quiz_reviewer",
+            "regenerate": "quiz_generator",
+            "completed": END,
+        },
+    )
     subgraph_builder.add_conditional_edges(
         source="quiz_reviewer",
         path=should_regenerate_quiz,
@@ -155,16 +577,26 @@ def build_generator_subgraph() -> CompiledStateGraph:
         },
     )
 
-    subgraph = subgraph_builder.compile()
+    subgraph = subgraph_builder.compile(checkpointer=False)
     return subgraph
 
 
-async def quiz_generator(state: SubGraphState) -> dict[str, list[FinalQuizItem]]:
-    """Generate quiz from chunk using LLM."""
+async def quiz_generator(
+    state: SubGraphState, config: RunnableConfig | None = None
+) -> dict[str, object]:
+    """Generate quiz from chunk using LLM.
+
+    In ``self`` review mode the same response carries the model's own verdict
+    on the quizzes, and a passing verdict skips the separate reviewer call.
+    When the run has an ``on_questions`` callback, the reply is streamed and
+    each question is published, unreviewed, as soon as it is complete.
+    """
 
     logger.info("*****SUBGRAPH - QUIZ GENERATOR*****")
 
-    chunk_text = state["chunk"].get("chunk_text", "")
+    context = get_run_context(config)
+    batch = _chunks(state, context)
+    chunk_text = _source_text(batch)
     logger.debug(f"Generating quiz for chunk of length: {len(chunk_text)}...")
 
     if not chunk_text or not chunk_text.strip():
@@ -174,62 +606,274 @@ async def quiz_generator(state: SubGraphState) -> dict[str, list[FinalQuizItem]]
         )
         return {"quiz": []}
 
-    provider = state.get("provider") or None
-    model_name = state.get("model_name") or None
-    api_key = state.get("api_key") or None
-    structured_llm = get_llm(provider=provider, model=model_name, api_key=api_key).with_structured_output(
-        MultipleQuiz
+    self_review = state.get("review_mode") == "self"
+    generator_prompt = GENERATE_QUIZ_PROMPT.format(chunk=chunk_text)
+    if len(batch) > 1:
+        generator_prompt += BATCH_INSTRUCTION_PROMPT
+    if state.get("review_feedback"):
+        generator_prompt += REGENERATE_FEEDBACK_PROMPT.format(
+            feedback=state["review_feedback"]
+        )
+    accepted = state.get("accepted", [])
+    if accepted:
+        # Keep what the reviewer accepted and only ask for the rejected rest.
+        generator_prompt += REPLACEMENT_PROMPT.format(
+            accepted=_numbered(accepted), count=max(len(state.get("quiz", [])), 1)
+        )
+    elif state.get("questions_per_chunk"):
+        generator_prompt += QUESTION_COUNT_PROMPT.format(
+            count=state["questions_per_chunk"] * len(batch)
+        )
+    if self_review:
+        generator_prompt += SELF_REVIEW_PROMPT
+    schema = {
+        (False, False): MultipleQuiz,
+        (True, False): MultipleBatchedQuiz,
+        (False, True): SelfReviewedQuiz,
+        (True, True): SelfReviewedBatchedQuiz,
+    }[(len(batch) > 1, self_review)]
+    chunks_by_id = {chunk.get("chunk_id", ""): chunk for chunk in batch}
+    chunk_ids = list(chunks_by_id)
+    on_questions: OnQuestions | None = (config or {}).get("configurable", {}).get(
+        "on_questions"
     )
+    on_partial = None
+    if on_questions is not None:
+        # Rejected questions from an earlier attempt are withdrawn right away.
+        await _publish_questions(on_questions, chunk_ids, accepted)
+        on_partial = _question_streamer(
+            on_questions, chunk_ids, accepted, chunks_by_id, batch[0]
+        )
 
-    generator_prompt = GENERATE_QUIZ_PROMPT.format(chunk=chunk_text)
-    generator_response = await structured_llm.ainvoke(
-        [HumanMessage(content=generator_prompt)]
+    # Each regeneration is its own cache attempt, so a quiz the reviewer
+    # rejected is never handed back from the cache.
+    call_stats: dict[str, int] = {}
+    generator_response = await invoke_structured(
+        schema,
+        generator_prompt,
+        provider=context.provider or None,
+        model=context.model_name or None,
+        api_key=context.api_key or None,
+        attempt=state.get("iter_count", 0),
+        stats=call_stats,
+        on_partial=on_partial,
     )
     logger.debug(f"Generated quiz response: {generator_response}")
-    quizzes: list[dict[str, object]] = []
-    if isinstance(generator_response, MultipleQuiz):
-        quizzes = [quiz.model_dump() for quiz in generator_response.quizzes]
-    elif isinstance(generator_response, dict):
-        raw_quizzes = generator_response.get("quizzes", [])
-        if isinstance(raw_quizzes, list):
-            quizzes = [item for item in raw_quizzes if isinstance(item, dict)]
-
-    normalized_quizzes: list[FinalQuizItem] = []
-    for quiz in quizzes:
-        options_raw = quiz.get("options")
-        options = options_raw if isinstance(options_raw, dict) else {}
-        explanation_raw = str(quiz.get("explanation", "")).strip()
-
-        answer_raw = str(quiz.get("answer", "")).strip().upper()
-        normalized_answer: Literal["A", "B", "C", "D"] = (
-            cast(Literal["A", "B", "C", "D"], answer_raw)
-            if answer_raw in {"A", "B", "C", "D"}
-            else "A"
-        )
+    normalized_quizzes = [
+        _normalize_quiz(quiz, chunks_by_id, batch[0])
+        for quiz in _raw_quizzes(generator_response)
+    ]
+    if on_questions is not None:
+        await _publish_questions(on_questions, chunk_ids, accepted + normalized_quizzes)
 
-        normalized_quiz: FinalQuizItem = {
-            "question": str(quiz.get("question", "")),
-            "option_a": str(quiz.get("option_a") or options.get("A") or ""),
-            "option_b": str(quiz.get("option_b") or options.get("B") or ""),
-            "option_c": str(quiz.get("option_c") or options.get("C") or ""),
-            "option_d": str(quiz.get("option_d") or options.get("D") or ""),
-            "answer": normalized_answer,
-            "explanation": explanation_raw if explanation_raw else "N/A",
-            "page_number": state["chunk"].get("page_number", 0),
-            "chunk_id": state["chunk"].get("chunk_id", ""),
+    if not self_review:
+        return {
+            "quiz": normalized_quizzes,
+            "run_stats": call_stats,
         }
-        normalized_quizzes.append(normalized_quiz)
 
+    is_relevant = False
+    if isinstance(generator_response, SelfReviewedQuiz | SelfReviewedBatchedQuiz):
+        is_relevant = generator_response.is_relevant
+    elif isinstance(generator_response, dict):
+        is_relevant = bool(generator_response.get("is_relevant", False))
+    is_relevant = is_relevant and bool(normalized_quizzes)
+
+    if is_relevant:
+        # What the separate reviewer would have been sent for this quiz.
+        review_prompt = REVIEW_QUIZ_PROMPT.format(
+            chunk=chunk_text, quiz=str(normalized_quizzes)
+        )
+        call_stats["reviews_skipped"] = 1
+        call_stats["review_tokens_saved"] = estimate_tokens(review_prompt)
     return {
         "quiz": normalized_quizzes,
+        "is_quiz_relevant": is_relevant,
+        "run_stats": call_stats,
+    }
+
+
+async def should_review_quiz(state: SubGraphState) -> Literal["review", "completed"]:
+    """Skip the reviewer when the generator's own review already passed."""
+    if state.get("review_mode") == "self" and state.get("is_quiz_relevant", False):
+        return "completed"
+    return "review"
+
+
+def _raw_quizzes(response: object) -> list[dict[str, object]]:
+    """The quiz dicts of a (possibly partial) generator reply."""
+    if isinstance(response, (MultipleQuiz, MultipleBatchedQuiz)):
+        return [quiz.model_dump() for quiz in response.quizzes]
+    if isinstance(response, dict):
+        raw_quizzes = response.get("quizzes", [])
+        if isinstance(raw_quizzes, list):
+            return [item for item in raw_quizzes if isinstance(item, dict)]
+    return []
+
+
+def _normalize_quiz(
+    quiz: dict[str, object],
+    chunks_by_id: dict[str, ChunkData],
+    default_chunk: ChunkData,
+) -> FinalQuizItem:
+    # Batched replies tag each quiz with its chunk; fall back to the first.
+    source_chunk = chunks_by_id.get(str(quiz.get("chunk_id", "")), default_chunk)
+    options_raw = quiz.get("options")
+    options = options_raw if isinstance(options_raw, dict) else {}
+    explanation_raw = str(quiz.get("explanation", "")).strip()
+
+    answer_raw = str(quiz.get("answer", "")).strip().upper()
+    normalized_answer: Literal["A", "B", "C", "D"] = (
+        cast(Literal["A", "B", "C", "D"], answer_raw)
+        if answer_raw in {"A", "B", "C", "D"}
+        else "A"
+    )
+
+    return {
+        "question": str(quiz.get("question", "")),
+        "option_a": str(quiz.get("option_a") or options.get("A") or ""),
+        "option_b": str(quiz.get("option_b") or options.get("B") or ""),
+        "option_c": str(quiz.get("option_c") or options.get("C") or ""),
+        "option_d": str(quiz.get("option_d") or options.get("D") or ""),
+        "answer": normalized_answer,
+        "explanation": explanation_raw if explanation_raw else "N/A",
+        "page_number": source_chunk.get("page_number", 0),
+        "chunk_id": source_chunk.get("chunk_id", ""),
+    }
+
+
+def _question_streamer(
+    on_questions: OnQuestions,
+    chunk_ids: list[str],
+    accepted: list[FinalQuizItem],
+    chunks_by_id: dict[str, ChunkData],
+    default_chunk: ChunkData,
+) -> Callable[[object], Awaitable[None]]:
+    """Callback for partial replies that publishes each newly completed quiz."""
+    published = 0
+
+    async def on_partial(response: object) -> None:
+        nonlocal published
+        # The last quiz of a partial reply may still be mid-sentence.
+        complete = _raw_quizzes(response)[:-1]
+        if len(complete) <= published:
+            return
+        published = len(complete)
+        await _publish_questions(
+            on_questions,
+            chunk_ids,
+            accepted + [_normalize_quiz(q, chunks_by_id, default_chunk) for q in complete],
+        )
+
+    return on_partial
+
+
+async def _publish_questions(
+    on_questions: OnQuestions, chunk_ids: list[str], questions: list[FinalQuizItem]
+) -> None:
+    try:
+        result = on_questions(chunk_ids, questions)
+        if result is not None:
+            await result
+    except Exception:
+        logger.warning("on_questions callback error (ignored)", exc_info=True)
+
+
+def _numbered(quizzes: list[FinalQuizItem]) -> str:
+    return "\n".join(f"{index}. {quiz}" for index, quiz in enumerate(quizzes, start=1))
+
+
+def _chunks(state: SubGraphState, context: RunContext) -> list[ChunkData]:
+    """The chunks a subgraph run generates from, looked up in the run context."""
+    return [
+        context.chunks[chunk_id]
+        for chunk_id in state.get("chunk_ids", [])
+        if chunk_id in context.chunks
+    ]
+
+
+def _source_text(batch: list[ChunkData]) -> str:
+    """The content a quiz is generated from: one chunk, or tagged batch sections."""
+    if len(batch) == 1:
+        return batch[0].get("chunk_text", "")
+    return "\n".join(
+        BATCH_SECTION_PROMPT.format(
+            chunk_id=chunk.get("chunk_id", ""), chunk_text=chunk.get("chunk_text", "")
+        )
+        for chunk in batch
+    )
+
+
+async def quiz_prechecker(
+    state: SubGraphState, config: RunnableConfig | None = None
+) -> dict[str, object]:
+    """Settle clear passes and failures locally; only borderline quizzes reach the LLM reviewer.
+
+    Passing questions are accepted as they are and failing ones regenerated
+    on their own, the way the reviewer's per-question verdicts are applied.
+    """
+
+    logger.info("*****SUBGRAPH - QUIZ PRECHECKER*****")
+    if not settings.PRECHECK_ENABLED:
+        return {"precheck": "borderline"}
+
+    quiz = state.get("quiz", [])
+    chunk_text = _source_text(_chunks(state, get_run_context(config)))
+    result = precheck_quiz(quiz, chunk_text, settings.PRECHECK_PASS_OVERLAP)
+    logger.debug(f"Quiz precheck: {result.verdict} {result.problems}")
+    if result.verdict == "pass":
+        return {
+            "precheck": "pass",
+            "is_quiz_relevant": True,
+            "run_stats": {"prechecks_passed": 1},
+        }
+    if not result.verdicts:
+        return {"precheck": "borderline"}
+
+    by_verdict: dict[str, list[FinalQuizItem]] = {"pass": [], "fail": [], "borderline": []}
+    for item, verdict in zip(quiz, result.verdicts):
+        by_verdict[verdict].append(item)
+    failures = "; ".join(
+        f"{item['question']!r}: {note}"
+        for item, verdict, note in zip(quiz, result.verdicts, result.notes)
+        if verdict == "fail"
+    )
+    update: dict[str, object] = {
+        "accepted": state.get("accepted", []) + by_verdict["pass"],
+        "review_feedback": failures,
     }
+    if by_verdict["borderline"]:
+        # The reviewer decides on the rest; the failures wait to be replaced
+        # together with anything it rejects.
+        return update | {
+            "precheck": "borderline",
+            "quiz": by_verdict["borderline"],
+            "rejected": by_verdict["fail"],
+            "run_stats": {"prechecks_failed": 1} if failures else {},
+        }
+    return update | {
+        "precheck": "fail",
+        "quiz": by_verdict["fail"],
+        "is_quiz_relevant": False,
+        "iter_count": state.get("iter_count", 0) + 1,
+        "run_stats": {"prechecks_failed": 1},
+    }
+
+
+async def route_after_precheck(
+    state: SubGraphState,
+) -> Literal["review", "regenerate", "completed"]:
+    if state.get("precheck") == "borderline":
+        return "review"
+    return await should_regenerate_quiz(state)
 
 
-async def quiz_reviewer(state: SubGraphState) -> dict[str, int | bool]:
+async def quiz_reviewer(
+    state: SubGraphState, config: RunnableConfig | None = None
+) -> dict[str, object]:
     """Review the generated quiz for relevance and quality, and determine if regeneration is needed."""
 
     logger.info("*****SUBGRAPH - QUIZ REVIEWER*****")
-    chunk_text = state["chunk"].get("chunk_text", "")
     quiz = state.get("quiz", [])
 
     if not quiz:
@@ -241,33 +885,85 @@ async def quiz_reviewer(state: SubGraphState) -> dict[str, int | bool]:
             "is_quiz_relevant": False,
             "iter_count": MAX_SUBGRAPH_ITER,
         }
-    provider = state.get("provider") or None
-    model_name = state.get("model_name") or None
-    api_key = state.get("api_key") or None
-    structured_llm = get_llm(provider=provider, model=model_name, api_key=api_key).with_structured_output(
-        ReviewedQuiz
+    context = get_run_context(config)
+    chunk_text = _source_text(_chunks(state, context))
+    review_prompt = (
+        REVIEW_QUIZ_PROMPT.format(chunk=chunk_text, quiz=_numbered(quiz))
+        + REVIEW_VERDICTS_PROMPT
     )
 
-    review_prompt = REVIEW_QUIZ_PROMPT.format(
-        chunk=chunk_text,
-        quiz=str(quiz),
-    )
-
-    review_response = await structured_llm.ainvoke(
-        [HumanMessage(content=review_prompt)]
+    started = time.perf_counter()
+    run_stats: dict[str, int] = {}
+    review_response = await invoke_structured(
+        ReviewedQuiz,
+        review_prompt,
+        provider=context.provider or None,
+        model=context.model_name or None,
+        api_key=context.api_key or None,
+        attempt=state.get("iter_count", 0),
+        stats=run_stats,
     )
 
     logger.debug(f"Quiz review response: {review_response}")
-    is_relevant = False
-    if isinstance(review_response, ReviewedQuiz):
-        is_relevant = review_response.is_relevant
-    elif isinstance(review_response, dict):
-        is_relevant = review_response.get("is_relevant", False)
-
-    return {
-        "is_quiz_relevant": is_relevant,
+    if isinstance(review_response, dict):
+        review_response = ReviewedQuiz.model_validate(
+            {"is_relevant": False, "feedback": "", **review_response}
+        )
+    if not isinstance(review_response, ReviewedQuiz):
+        review_response = ReviewedQuiz(is_relevant=False, feedback="")
+    kept, rejected, feedback = _apply_verdicts(quiz, review_response)
+    prechecked = state.get("rejected", [])
+    if prechecked:
+        rejected += prechecked
+        feedback = "; ".join(note for note in (feedback, state.get("review_feedback")) if note)
+
+    run_stats["reviews"] = 1
+    run_stats["review_ms"] = round((time.perf_counter() - started) * 1000)
+    update: dict[str, object] = {
+        "is_quiz_relevant": not rejected,
         "iter_count": state.get("iter_count", 0) + 1,
+        "run_stats": run_stats,
     }
+    if rejected:
+        update["review_feedback"] = feedback
+    if prechecked:
+        update["rejected"] = []
+    if kept and rejected:
+        # Only the rejected questions are regenerated and reviewed again.
+        update["accepted"] = state.get("accepted", []) + kept
+        update["quiz"] = rejected
+        run_stats["questions_kept"] = len(kept)
+    elif prechecked:
+        update["quiz"] = rejected
+    return update
+
+
+def _apply_verdicts(
+    quiz: list[FinalQuizItem], review: ReviewedQuiz
+) -> tuple[list[FinalQuizItem], list[FinalQuizItem], str]:
+    """Split reviewed questions into (kept, rejected, feedback for the rejected).
+
+    Without per-question verdicts the overall ``is_relevant`` decides for the
+    whole list, as does it for any question the reviewer left out.
+    """
+    if not review.verdicts:
+        if review.is_relevant:
+            return quiz, [], ""
+        return [], quiz, review.feedback
+
+    verdicts = {verdict.index: verdict for verdict in review.verdicts}
+    kept: list[FinalQuizItem] = []
+    rejected: list[FinalQuizItem] = []
+    notes: list[str] = []
+    for index, item in enumerate(quiz, start=1):
+        verdict = verdicts.get(index)
+        if verdict.accepted if verdict else review.is_relevant:
+            kept.append(item)
+            continue
+        rejected.append(item)
+        reason = verdict.feedback if verdict and verdict.feedback else review.feedback
+        notes.append(f"{item['question']!r}: {reason}" if reason else repr(item["question"]))
+    return kept, rejected, "; ".join(notes)
 
 
 async def should_regenerate_quiz(
@@ -289,7 +985,7 @@ async def should_regenerate_quiz(
 
 
 async def graph_ainvoke(
-    pdf_url_or_base64: str = "temp/sample.pdf",
+    pdf_url_or_base64: PDFSource = "temp/sample.pdf",
     thread_id: str | None = None,
     on_update: Callable[[dict], Awaitable[None]] | None = None,
     cancel_event: asyncio.Event | None = None,
@@ -298,51 +994,154 @@ async def graph_ainvoke(
     concurrency: int | None = None,
     api_key: str | None = None,
     callbacks: list | None = None,
+    page_ranges: str | None = None,
+    sample_chunks: int | None = None,
+    questions_per_chunk: int | None = None,
+    review_mode: ReviewMode | None = None,
+    on_questions: OnQuestions | None = None,
+    schedule_policy: SchedulePolicy | None = None,
+    scheduler: ChunkScheduler | None = None,
+    budget: RunBudget | None = None,
+    resume: bool = False,
 ) -> GlobalQuizState | StateSnapshot:
+    if resume and not settings.CHECKPOINT_PATH:
+        # Nothing was stored to resume from: run afresh on a new thread and
+        # leave the named one, which another session may still be using, alone.
+        thread_id = None
+    resuming = resume and thread_id is not None
     if thread_id is None:
         thread_id = f"qthread_{os.urandom(8).hex()}"
 
+    # Paths stay in state; buffers (including decoded data URLs) travel in the
+    # config so the checkpointer never snapshots the document itself.
+    pdf_source = resolve_pdf_source(pdf_url_or_base64)
+    pdf_path = pdf_source if isinstance(pdf_source, str) else ""
+    provider = provider or settings.MODEL_PROVIDER
+
     initial_state: GlobalQuizState = GlobalQuizState(
-        pdf_url_or_base64=pdf_url_or_base64,
-        pdf_pages_data=[],
-        crawled_chunks=[],
+        pdf_url_or_base64=pdf_path,
+        pdf_digest="",
+        page_ranges=page_ranges or "",
+        sample_chunks=sample_chunks or 0,
+        page_indices=[],
+        page_count=0,
+        run_stats={},
         final_quiz=[],
-        provider=provider or settings.MODEL_PROVIDER,
-        model_name=model_name or "",
-        api_key=api_key or "",
+        completed_chunks=[],
+        chunk_tokens=chunk_token_budget(provider, model_name),
+        questions_per_chunk=questions_per_chunk or settings.QUESTIONS_PER_CHUNK,
+        review_mode=review_mode or settings.REVIEW_MODE,
+    )
+
+    # The scheduler, not max_concurrency, bounds the chunks in progress: every
+    # batch is sent at once and waits there for its turn in policy order.
+    if scheduler is None:
+        scheduler = ChunkScheduler(
+            window=concurrency or default_concurrency(),
+            policy=schedule_policy or settings.SCHEDULE_POLICY,
+        )
+
+    budget = budget or RunBudget()
+    callbacks = list(callbacks or [])
+    questions = 0
+    token_counter = TokenCounterCallback()
+
+    def stop_if_over_budget() -> None:
+        if not budget.check(questions, token_counter.total_tokens):
+            return
+        if not scheduler.stopped:
+            logger.info(f"Run budget: {budget.reason}; stopping generation")
+            scheduler.stop(cancel_running=True)
+
+    def stop_at_deadline() -> None:
+        budget.expire()
+        stop_if_over_budget()
+
+    if budget.max_tokens:
+        token_counter.on_total = lambda _total: stop_if_over_budget()
+        callbacks.append(token_counter)
+    deadline = (
+        asyncio.get_running_loop().call_later(budget.deadline_s, stop_at_deadline)
+        if budget.deadline_s > 0
+        else None
     )
 
     graph = build_graph()
+    # Parallel extraction reads a file: spill a buffer once for every page
+    # batch of the run rather than once per batch.
+    spill_path = ""
+    if not isinstance(pdf_source, str) and settings.INGEST_WORKERS > 1:
+        spill_path = spill_pdf(pdf_source)
     config: RunnableConfig = {
         "configurable": {
             "thread_id": thread_id,
+            "pdf_source": spill_path or (None if pdf_path else pdf_source),
+            "on_questions": on_questions,
+            "run_context": RunContext(
+                provider=provider,
+                model_name=model_name or "",
+                api_key=api_key or "",
+                scheduler=scheduler,
+            ),
         },
-        "max_concurrency": concurrency or settings.GEN_CONCURRENCY,
-        "callbacks": callbacks or [],
+        "callbacks": callbacks,
     }
 
-    logger.info("--------🚦 graph execution stream started--------")
-    async for update in graph.astream(
-        initial_state,
-        config=config,
-        stream_mode="updates",
-    ):
-        summary = {
-            node_name: list(node_update.keys()) if isinstance(node_update, dict) else []
-            for node_name, node_update in update.items()
-        }
-        logger.info(f"Graph Update -  {summary}\n\n")
-        if on_update is not None:
-            try:
-                await on_update(update)
-            except Exception:
-                logger.warning("on_update callback error (ignored)", exc_info=True)
-
-        if cancel_event is not None and cancel_event.is_set():
-            logger.info("Graph execution cancelled by user")
-            break
-
-    final_state = await graph.aget_state(config=config)
+    # Lets the shared rate limiter tell this run's calls apart from others.
+    session = current_session.set(thread_id)
+    logger.info(f"--------🚦 graph execution stream started ({thread_id})--------")
+    # A shared checkpointer must not evict this thread while the run is live.
+    checkpointer = graph.checkpointer
+    keep_thread = (
+        checkpointer.active(thread_id)
+        if isinstance(checkpointer, BoundedMemorySaver)
+        else nullcontext()
+    )
+    with keep_thread:
+        try:
+            if resuming:
+                # Finished chunks come from the run store; start the thread's
+                # graph state afresh so list channels are not appended to the
+                # interrupted attempt.
+                await checkpointer.adelete_thread(thread_id)
+            async for namespace, update in graph.astream(
+                initial_state,
+                config=config,
+                stream_mode="updates",
+                subgraphs=True,
+            ):
+                if len(namespace) > 1 or "page_batch" in update:
+                    # The generate/review loop's own steps, and each page
+                    # batch's total of the updates already streamed from it.
+                    continue
+                summary = {
+                    node_name: list(node_update.keys()) if isinstance(node_update, dict) else []
+                    for node_name, node_update in update.items()
+                }
+                logger.info(f"Graph Update -  {summary}\n\n")
+                if on_update is not None:
+                    try:
+                        await on_update(update)
+                    except Exception:
+                        logger.warning("on_update callback error (ignored)", exc_info=True)
+
+                generated = update.get("subgraph_generator")
+                if isinstance(generated, dict):
+                    questions += len(generated.get("final_quiz", []) or [])
+                    stop_if_over_budget()
+
+                if cancel_event is not None and cancel_event.is_set():
+                    logger.info("Graph execution cancelled by user")
+                    scheduler.stop()
+                    break
+        finally:
+            current_session.reset(session)
+            if deadline is not None:
+                deadline.cancel()
+            if spill_path:
+                os.unlink(spill_path)
+
+        final_state = await graph.aget_state(config=config)
 
     logger.info("--------✅ graph execution stream completed--------")
 
@@ -0,0 +1,102 @@
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from threading import Lock
+from typing import TypeVar
+
+from ..core import logger, settings
+
+T = TypeVar("T")
+
+# Latencies remembered per model, and how many are needed before hedging.
+LATENCY_WINDOW = 200
+MIN_SAMPLES = 20
+
+
+class LatencyTracker:
+    """Recent successful call latencies for one provider/model."""
+
+    def __init__(self, window: int = LATENCY_WINDOW) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, percent: float, min_samples: int = MIN_SAMPLES) -> float | None:
+        """The *percent*-th percentile in seconds, or None with too few samples."""
+        if len(self._samples) < max(min_samples, 1):
+            return None
+        ordered = sorted(self._samples)
+        index = min(math.ceil(len(ordered) * percent / 100) - 1, len(ordered) - 1)
+        return ordered[max(index, 0)]
+
+
+_trackers: dict[tuple[str, str], LatencyTracker] = {}
+_trackers_lock = Lock()
+
+
+def get_latency_tracker(provider: str, model: str) -> LatencyTracker:
+    with _trackers_lock:
+        return _trackers.setdefault((provider, model), LatencyTracker())
+
+
+async def call_with_hedge(
+    primary: Callable[[], Awaitable[T]],
+    backup: Callable[[], Awaitable[T]] | None,
+    tracker: LatencyTracker,
+    stats: dict[str, int] | None = None,
+) -> T:
+    """Await *primary*, hedging with *backup* if it turns into a straggler.
+
+    Once *primary* has run longer than the model's ``HEDGE_PERCENTILE``
+    latency, *backup* is started as well and whichever succeeds first wins;
+    the other is cancelled. The whole call fails with ``TimeoutError`` after
+    ``LLM_CALL_TIMEOUT_S`` seconds when that is set. Counters for calls,
+    hedges, hedge wins and deadlines go into *stats*.
+    """
+    stats = {} if stats is None else stats
+    stats["llm_calls"] = stats.get("llm_calls", 0) + 1
+    hedge_after = (
+        tracker.percentile(settings.HEDGE_PERCENTILE) if backup is not None else None
+    )
+    deadline = settings.LLM_CALL_TIMEOUT_S or None
+
+    started = time.perf_counter()
+    first = asyncio.ensure_future(primary())
+    second: asyncio.Future[T] | None = None
+    try:
+        async with asyncio.timeout(deadline):
+            if hedge_after is not None:
+                await asyncio.wait({first}, timeout=hedge_after)
+            if first.done() or backup is None or hedge_after is None:
+                result = await first
+                tracker.record(time.perf_counter() - started)
+                return result
+
+            logger.debug(f"LLM call exceeded {hedge_after:.1f}s; sending a hedge request")
+            stats["hedged"] = stats.get("hedged", 0) + 1
+            second = asyncio.ensure_future(backup())
+            pending: set[asyncio.Future[T]] = {first, second}
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            stats["hedge_wins"] = stats.get("hedge_wins", 0) + 1
+                        else:
+                            tracker.record(time.perf_counter() - started)
+                        return task.result()
+            # Both failed: surface the original request's error.
+            return first.result()
+    except TimeoutError:
+        stats["deadline_exceeded"] = stats.get("deadline_exceeded", 0) + 1
+        logger.warning(f"LLM call gave up after the {deadline}s deadline")
+        raise
+    finally:
+        for task in (first, second):
+            if task is not None and not task.done():
+                task.cancel()
@@ -1,10 +1,59 @@
+import hashlib
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager, nullcontext
+from dataclasses import dataclass, field
+from functools import partial
+from threading import Lock
+from typing import TypeVar
+
+from langchain.messages import HumanMessage
 from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import Runnable
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_groq import ChatGroq
 from langchain_openai import ChatOpenAI
-from pydantic import SecretStr
+from pydantic import BaseModel, SecretStr
+
+from ..core import logger, run_blocking_in_thread, settings
+from .concurrency import AdaptiveLimiter, get_limiter
+from .hedging import call_with_hedge, get_latency_tracker
+from .prompts import PROMPT_VERSION
+from .rate_limit import get_rate_limiter
+from .utils import estimate_tokens, get_response_cache, response_key
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+# Input context windows in tokens. Model entries win over the provider default.
+MODEL_CONTEXT_WINDOWS: dict[str, int] = {
+    "gpt-4.1": 1_047_576,
+    "gpt-4.1-mini": 1_047_576,
+    "gpt-4.1-nano": 1_047_576,
+    "gpt-4o": 128_000,
+    "gpt-4o-mini": 128_000,
+    "llama-3.3-70b-versatile": 131_072,
+    "llama-3.1-8b-instant": 131_072,
+    "gemma2-9b-it": 8_192,
+}
+PROVIDER_CONTEXT_WINDOWS: dict[str, int] = {
+    "google": 1_048_576,
+    "groq": 131_072,
+    "openai": 128_000,
+}
+DEFAULT_CONTEXT_WINDOW = 8_192
+
+
+@dataclass
+class _ClientEntry:
+    llm: BaseChatModel
+    # Keyed by (schema, streaming).
+    structured: dict[tuple[type[BaseModel], bool], Runnable] = field(default_factory=dict)
+
 
-from ..core import logger, settings
+# Clients keyed by (provider, model, hashed API key), least recently used first.
+# Reusing a client reuses its HTTP connection pool across chunks and sessions.
+_clients: OrderedDict[tuple[str, str, str], _ClientEntry] = OrderedDict()
+_clients_lock = Lock()
 
 
 def get_llm(
@@ -12,35 +61,244 @@ def get_llm(
     model: str | None = None,
     api_key: str | None = None,
 ) -> BaseChatModel:
-    """Build the LLM client for the active (or given) provider.
+    """Return the shared LLM client for the active (or given) provider.
 
     When *provider*, *model*, or *api_key* are supplied they take precedence
     over the global ``settings`` values, allowing per-session configuration
-    without mutating the shared singleton.
+    without mutating the shared singleton. Clients are cached per provider,
+    model and API key, up to ``LLM_CLIENT_CACHE_SIZE`` entries.
+    """
+    return _client_entry(provider, model, api_key).llm
+
+
+def get_structured_llm(
+    schema: type[BaseModel],
+    provider: str | None = None,
+    model: str | None = None,
+    api_key: str | None = None,
+    streaming: bool = False,
+) -> Runnable:
+    """Shared ``with_structured_output(schema)`` runnable for a cached client.
+
+    A *streaming* runnable has the model call *schema* as a tool, whose
+    parser yields each partially parsed object while tokens arrive; the JSON
+    schema parsers OpenAI and Gemini default to only yield the whole reply.
+    """
+    entry = _client_entry(provider, model, api_key)
+    runnable = entry.structured.get((schema, streaming))
+    if runnable is None:
+        if streaming:
+            runnable = entry.llm.with_structured_output(schema, method="function_calling")
+        else:
+            runnable = entry.llm.with_structured_output(schema)
+        entry.structured[(schema, streaming)] = runnable
+    return runnable
+
+
+async def invoke_structured(
+    schema: type[SchemaT],
+    prompt: str,
+    provider: str | None = None,
+    model: str | None = None,
+    api_key: str | None = None,
+    attempt: int = 0,
+    stats: dict[str, int] | None = None,
+    on_partial: Callable[[BaseModel | dict], Awaitable[None]] | None = None,
+) -> SchemaT | dict | None:
+    """Send *prompt* to the model and parse the reply into *schema*.
+
+    Every generator and reviewer call goes through here so the optional
+    response cache (``LLM_CACHE_PATH``), the process-wide rate limit and the
+    provider/model's adaptive concurrency limit see all of them. *attempt* is part of the cache key: a
+    retry of the same prompt gets a fresh answer, while a re-run of the same
+    document replays each attempt from the cache.
+
+    Once admitted, calls are subject to the ``LLM_CALL_TIMEOUT_S`` deadline
+    and, with ``HEDGE_ENABLED``, hedged once they outlast the model's usual
+    latency; see :func:`call_with_hedge`. Call and hedge counters are added
+    to *stats*. With *on_partial* the reply is streamed and each partially
+    parsed object is passed to it; a hedge request is never streamed.
     """
     chosen = provider or settings.MODEL_PROVIDER
+    name = model or default_model(chosen)
+    response_cache = get_response_cache()
+    key = ""
+    if response_cache is not None:
+        key = response_key(
+            chosen,
+            name,
+            schema.__name__,
+            PROMPT_VERSION,
+            prompt,
+            attempt,
+        )
+        cached = await run_blocking_in_thread(response_cache.get, key)
+        if cached is not None:
+            logger.debug(f"LLM cache hit for {schema.__name__}")
+            return schema.model_validate(cached)
 
-    if chosen == "google":
-        key = api_key or settings.GEMINI_API_KEY
+    messages = [HumanMessage(content=prompt)]
+    backup = None
+    if settings.HEDGE_ENABLED:
+        # A user's key belongs to their provider; a fallback provider uses ours.
+        hedge_provider = settings.HEDGE_FALLBACK_PROVIDER or chosen
+        hedge_model = settings.HEDGE_FALLBACK_MODEL or (
+            name if hedge_provider == chosen else default_model(hedge_provider)
+        )
+        hedge_key = api_key if hedge_provider == chosen else None
+        backup = partial(_send, schema, messages, hedge_provider, hedge_model, hedge_key)
+
+    structured_llm = get_structured_llm(
+        schema,
+        provider=chosen,
+        model=name,
+        api_key=api_key,
+        streaming=on_partial is not None,
+    )
+    # Admitted before the deadline and hedge timer start: a call waiting on
+    # the rate limit or a busy model is neither timed out nor hedged.
+    async with _admitted(chosen, name, api_key, messages) as limiter:
+        response = await call_with_hedge(
+            partial(_complete, structured_llm, messages, on_partial, limiter),
+            backup,
+            get_latency_tracker(chosen, name),
+            stats,
+        )
+
+    if response_cache is not None:
+        value = response.model_dump() if isinstance(response, BaseModel) else response
+        if isinstance(value, dict):
+            await run_blocking_in_thread(response_cache.put, key, value)
+    return response
+
+
+async def _send(
+    schema: type[BaseModel],
+    messages: list[HumanMessage],
+    provider: str,
+    model: str,
+    api_key: str | None,
+):
+    """A call admitted on its own: the hedge request, raced against the primary."""
+    structured_llm = get_structured_llm(
+        schema, provider=provider, model=model, api_key=api_key
+    )
+    async with _admitted(provider, model, api_key, messages) as limiter:
+        return await _complete(structured_llm, messages, limiter=limiter)
+
+
+@asynccontextmanager
+async def _admitted(
+    provider: str, model: str, api_key: str | None, messages: list[HumanMessage]
+) -> AsyncIterator[AdaptiveLimiter | None]:
+    """Wait for the rate limit, then hold a slot of the model's limiter, if any."""
+    rate_limiter = get_rate_limiter(provider, api_key or _default_api_key(provider))
+    if rate_limiter is not None:
+        await rate_limiter.acquire(estimate_tokens(str(messages[0].content)))
+    limiter = get_limiter(provider, model)
+    if limiter is None:
+        yield None
+        return
+    await limiter.acquire()
+    try:
+        yield limiter
+    finally:
+        limiter.release()
+
+
+async def _complete(
+    structured_llm: Runnable,
+    messages: list[HumanMessage],
+    on_partial: Callable[[BaseModel | dict], Awaitable[None]] | None = None,
+    limiter: AdaptiveLimiter | None = None,
+):
+    with limiter.observe() if limiter is not None else nullcontext():
+        if on_partial is None:
+            return await structured_llm.ainvoke(messages)
+        # Structured output parsers yield the object parsed so far; the last
+        # chunk is the complete reply.
+        response = None
+        async for response in structured_llm.astream(messages):
+            await on_partial(response)
+        return response
+
+
+def clear_llm_clients() -> None:
+    """Drop every cached client, e.g. after rotating API keys."""
+    with _clients_lock:
+        _clients.clear()
+
+
+def _client_entry(
+    provider: str | None, model: str | None, api_key: str | None
+) -> _ClientEntry:
+    chosen = provider or settings.MODEL_PROVIDER
+    name = model or default_model(chosen)
+    key = api_key or _default_api_key(chosen)
+    cache_key = (chosen, name, hashlib.sha256(key.encode()).hexdigest())
+
+    with _clients_lock:
+        entry = _clients.get(cache_key)
+        if entry is not None:
+            _clients.move_to_end(cache_key)
+            return entry
+
+    entry = _ClientEntry(_build_llm(chosen, name, key))
+    with _clients_lock:
+        # Another task may have built the same client meanwhile; keep the first.
+        entry = _clients.setdefault(cache_key, entry)
+        _clients.move_to_end(cache_key)
+        while len(_clients) > max(settings.LLM_CLIENT_CACHE_SIZE, 1):
+            _clients.popitem(last=False)
+    return entry
+
+
+def _default_api_key(provider: str) -> str:
+    return {
+        "google": settings.GEMINI_API_KEY,
+        "groq": settings.GROQ_API_KEY,
+        "openai": settings.OPENAI_API_KEY,
+    }.get(provider, "")
+
+
+def _build_llm(provider: str, model: str, key: str) -> BaseChatModel:
+    if provider == "google":
         return ChatGoogleGenerativeAI(
-            model=model or settings.GEMINI_MODEL,
+            model=model,
             api_key=SecretStr(key) if key else None,
             temperature=1.0,
         )
-    if chosen == "groq":
-        key = api_key or settings.GROQ_API_KEY
+    if provider == "groq":
         return ChatGroq(
-            model=model or settings.GROQ_MODEL,
+            model=model,
             api_key=SecretStr(key) if key else None,
             temperature=1.0,
         )
-    if chosen == "openai":
-        key = api_key or settings.OPENAI_API_KEY
+    if provider == "openai":
         return ChatOpenAI(
-            model=model or settings.OPENAI_MODEL,
+            model=model,
             api_key=SecretStr(key) if key else None,
         )
-    raise ValueError(f"Unsupported model provider: {chosen}")
+    raise ValueError(f"Unsupported model provider: {provider}")
+
+
+def default_model(provider: str | None = None) -> str:
+    """The configured model name for *provider* (or the active provider)."""
+    chosen = provider or settings.MODEL_PROVIDER
+    return {
+        "google": settings.GEMINI_MODEL,
+        "groq": settings.GROQ_MODEL,
+        "openai": settings.OPENAI_MODEL,
+    }.get(chosen, "")
+
+
+def context_window(provider: str | None = None, model: str | None = None) -> int:
+    """Input context window, in tokens, of the given (or configured) model."""
+    chosen = provider or settings.MODEL_PROVIDER
+    name = model or default_model(chosen)
+    if name in MODEL_CONTEXT_WINDOWS:
+        return MODEL_CONTEXT_WINDOWS[name]
+    return PROVIDER_CONTEXT_WINDOWS.get(chosen, DEFAULT_CONTEXT_WINDOW)
 
 
 def main() -> None:
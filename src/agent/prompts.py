@@ -1,3 +1,5 @@
+import hashlib
+
 REVIEW_QUIZ_PROMPT = """You are an assistant that reviews the quality and relevance of a generated quiz based on provided content.
 The provided content is {chunk}\n
 The generated quiz is {quiz}\n
@@ -30,3 +32,55 @@ Return a JSON object with key "quizzes" where each quiz has exactly these keys:
 - answer (must be one of: "A", "B", "C", "D")
 - explanation (short reason why the correct answer is correct; use "N/A" if unavailable)
 """
+
+
+QUESTION_COUNT_PROMPT = """Generate exactly {count} quiz questions, spread across the whole of the provided content.
+"""
+
+
+BATCH_SECTION_PROMPT = """[chunk_id: {chunk_id}]
+{chunk_text}
+"""
+
+
+BATCH_INSTRUCTION_PROMPT = """The provided content is made of several sections, each starting with a [chunk_id: ...] line.
+Write quizzes for every section, never mixing sections in one quiz, and add a chunk_id key to each quiz with the id of the section it tests.
+"""
+
+
+SELF_REVIEW_PROMPT = """After writing the quizzes, review them yourself for relevance to the content, accuracy of the correct answer, plausibility of the distractors, clarity and difficulty.
+Set is_relevant to true only if every quiz passes, and describe any problems in feedback.
+"""
+
+
+REVIEW_VERDICTS_PROMPT = """The quizzes are numbered. In verdicts, give one entry per quiz with its number, whether it is accepted, and a short reason when it is not.
+Set is_relevant to true only if every quiz is accepted.
+"""
+
+
+REGENERATE_FEEDBACK_PROMPT = """Earlier questions for this content were rejected with this feedback: {feedback}
+Make sure the new questions avoid those problems.
+"""
+
+
+REPLACEMENT_PROMPT = """These questions were already accepted, so do not repeat them:
+{accepted}
+Generate exactly {count} new quiz questions to replace the rejected ones.
+"""
+
+
+# Changes whenever a template changes, so cached responses to old prompts are
+# never reused.
+PROMPT_VERSION = hashlib.sha256(
+    (
+        REVIEW_QUIZ_PROMPT
+        + GENERATE_QUIZ_PROMPT
+        + QUESTION_COUNT_PROMPT
+        + BATCH_SECTION_PROMPT
+        + BATCH_INSTRUCTION_PROMPT
+        + SELF_REVIEW_PROMPT
+        + REVIEW_VERDICTS_PROMPT
+        + REGENERATE_FEEDBACK_PROMPT
+        + REPLACEMENT_PROMPT
+    ).encode()
+).hexdigest()[:16]
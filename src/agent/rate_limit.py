@@ -0,0 +1,145 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+from threading import Lock
+
+from ..core import settings
+
+# The run a call belongs to; graph_ainvoke sets it to the run's thread id so
+# the rate limiter can share capacity fairly between concurrent sessions.
+current_session: ContextVar[str] = ContextVar("current_session", default="")
+
+
+class _Bucket:
+    """Token bucket refilled at *per_minute* / 60 per second."""
+
+    def __init__(self, per_minute: int, burst_seconds: float) -> None:
+        self.rate = per_minute / 60
+        self.capacity = max(self.rate * burst_seconds, 1.0)
+        self.level = self.capacity
+
+    def refill(self, elapsed: float) -> None:
+        self.level = min(self.level + elapsed * self.rate, self.capacity)
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until *amount* is available (0 when it already is)."""
+        amount = min(amount, self.capacity)
+        return max(amount - self.level, 0.0) / self.rate
+
+
+@dataclass
+class _Waiter:
+    tokens: int
+    future: asyncio.Future[None]
+
+
+class RateLimiter:
+    """Requests/minute and tokens/minute budget shared by every session.
+
+    Callers queue per session and are served round-robin across sessions, so
+    one large upload cannot starve the others; nothing is ever rejected, work
+    just waits for capacity. A limit of 0 disables that budget.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        burst_seconds: float = 60.0,
+    ) -> None:
+        self._requests = (
+            _Bucket(requests_per_minute, burst_seconds) if requests_per_minute > 0 else None
+        )
+        self._tokens = (
+            _Bucket(tokens_per_minute, burst_seconds) if tokens_per_minute > 0 else None
+        )
+        self._queues: OrderedDict[str, deque[_Waiter]] = OrderedDict()
+        self._refilled_at = time.monotonic()
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def acquire(self, tokens: int, session: str | None = None) -> None:
+        """Wait until one request of *tokens* estimated tokens may be sent."""
+        session = current_session.get() if session is None else session
+        waiter = _Waiter(tokens, asyncio.get_running_loop().create_future())
+        self._queues.setdefault(session, deque()).append(waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            queue = self._queues.get(session)
+            if queue is not None and waiter in queue:
+                queue.remove(waiter)
+                if not queue:
+                    del self._queues[session]
+            self._dispatch()
+            raise
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        for bucket in (self._requests, self._tokens):
+            if bucket is not None:
+                bucket.refill(now - self._refilled_at)
+        self._refilled_at = now
+
+        while self._queues:
+            session, queue = next(iter(self._queues.items()))
+            waiter = queue[0]
+            if waiter.future.done():
+                self._advance(session, queue)
+                continue
+            charges = self._charges(waiter)
+            wait = max((bucket.wait_for(amount) for bucket, amount in charges), default=0.0)
+            if wait > 0:
+                self._schedule(wait)
+                return
+            for bucket, amount in charges:
+                bucket.level -= min(amount, bucket.capacity)
+            waiter.future.set_result(None)
+            self._advance(session, queue)
+
+    def _charges(self, waiter: _Waiter) -> list[tuple[_Bucket, float]]:
+        charges: list[tuple[_Bucket, float]] = []
+        if self._requests is not None:
+            charges.append((self._requests, 1))
+        if self._tokens is not None:
+            charges.append((self._tokens, waiter.tokens))
+        return charges
+
+    def _advance(self, session: str, queue: deque[_Waiter]) -> None:
+        # Serve the next session before this one's next request.
+        queue.popleft()
+        del self._queues[session]
+        if queue:
+            self._queues[session] = queue
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer is not None and not self._timer.cancelled():
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+
+_limiters: dict[tuple[str, str], RateLimiter] = {}
+_limiters_lock = Lock()
+
+
+def get_rate_limiter(provider: str, api_key: str) -> RateLimiter | None:
+    """The process-wide limiter for *provider* and *api_key*, or None when no
+    limits are configured for the provider."""
+    requests = settings.RATE_LIMIT_RPM.get(provider, 0)
+    tokens = settings.RATE_LIMIT_TPM.get(provider, 0)
+    if requests <= 0 and tokens <= 0:
+        return None
+    key = (provider, hashlib.sha256(api_key.encode()).hexdigest())
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = RateLimiter(requests, tokens)
+            _limiters[key] = limiter
+        return limiter
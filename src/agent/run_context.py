@@ -0,0 +1,39 @@
+from dataclasses import dataclass, field
+
+from langchain_core.runnables import RunnableConfig
+
+from .scheduler import ChunkScheduler, OrderedTurns
+from .state import ChunkData, PDFPageData
+
+
+@dataclass
+class RunContext:
+    """Per-run payloads kept out of checkpointed graph state.
+
+    ``graph_ainvoke`` puts one in ``configurable["run_context"]``. Nodes keep
+    page text and chunks here and only page numbers and chunk ids in state,
+    so checkpoints stay small however large the PDF is; pages are dropped
+    once chunked and chunks once generated. The LLM target, including the
+    API key, is read from here instead of being copied into every ``Send``.
+    """
+
+    provider: str = ""
+    model_name: str = ""
+    api_key: str = ""
+    pages: dict[int, PDFPageData] = field(default_factory=dict)
+    chunks: dict[str, ChunkData] = field(default_factory=dict)
+    # MinHash signatures of every chunk kept so far, for near-duplicate checks,
+    # and the header/footer lines found so far.
+    chunk_signatures: list[list[int]] = field(default_factory=list)
+    boilerplate_lines: list[str] = field(default_factory=list)
+    # Page batches are read, and deduplicated, one at a time in turn.
+    ingest_turns: OrderedTurns = field(default_factory=OrderedTurns)
+    dedup_turns: OrderedTurns = field(default_factory=OrderedTurns)
+    # Releases chunk batches into generation; admits everything by default.
+    scheduler: ChunkScheduler = field(default_factory=ChunkScheduler)
+
+
+def get_run_context(config: RunnableConfig | None) -> RunContext:
+    """The run's context, or an empty one outside ``graph_ainvoke``."""
+    context = (config or {}).get("configurable", {}).get("run_context")
+    return context if isinstance(context, RunContext) else RunContext()
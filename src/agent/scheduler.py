@@ -0,0 +1,209 @@
+import asyncio
+import heapq
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from itertools import count
+from typing import Literal, TypeVar
+
+from .state import ChunkData
+from .utils import estimate_tokens
+
+SchedulePolicy = Literal["document", "spread", "shortest"]
+
+# Priority of a batch of chunks (lower goes first), given the position of its
+# page among the ``total`` selected pages.
+PriorityPolicy = Callable[[list[ChunkData], int, int], float]
+
+T = TypeVar("T")
+
+
+def document_order(chunks: list[ChunkData], position: int, total: int) -> float:
+    """Pages in reading order."""
+    return position
+
+
+def spread_order(chunks: list[ChunkData], position: int, total: int) -> float:
+    """First, middle, quarters, eighths, ...: early questions cover the whole document.
+
+    The bit-reversed page position (a van der Corput sequence) halves the
+    largest gap between pages already started with every step.
+    """
+    bits = max(total - 1, 0).bit_length()
+    return int(f"{position:0{bits}b}"[::-1], 2) if bits else 0
+
+
+def shortest_first(chunks: list[ChunkData], position: int, total: int) -> float:
+    """Smallest requests first, for the quickest first results."""
+    return sum(estimate_tokens(chunk["chunk_text"]) for chunk in chunks)
+
+
+POLICIES: dict[str, PriorityPolicy] = {
+    "document": document_order,
+    "spread": spread_order,
+    "shortest": shortest_first,
+}
+
+
+class ChunkScheduler:
+    """Sliding window over one run's chunk batches, released by priority.
+
+    The graph sends every batch to ``subgraph_generator`` as soon as it is
+    chunked; each batch is ``submit``-ted here first and its task waits in
+    ``turn`` until one of ``window`` slots frees up, so the batches start in
+    policy order rather than in the order the tasks happen to be scheduled.
+    ``stop`` turns the queued batches away and, if asked, cancels the ones
+    started through ``run``. A window of 0 admits everything at once.
+    """
+
+    def __init__(self, window: int = 0, policy: SchedulePolicy = "document") -> None:
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown schedule policy: {policy!r}")
+        self.window = window
+        self.policy = policy
+        self.running = 0
+        self.stopped = False
+        self._heap: list[tuple[float, int, str]] = []
+        self._queued: set[str] = set()
+        self._admitted: set[str] = set()
+        self._waiters: dict[str, asyncio.Future[None]] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._order = count()
+
+    def read_order(self, batches: int) -> list[int]:
+        """The order to read a run's page batches in, first to last.
+
+        Batches start generating as they are read, so with ``spread`` the
+        first, middle, quarter, ... batches are read first and the window
+        fills from across the whole document. The other policies read in
+        document order; ``shortest`` only knows a batch's size once it is read.
+        """
+        if self.policy != "spread":
+            return list(range(batches))
+        return sorted(range(batches), key=lambda batch: spread_order([], batch, batches))
+
+    @property
+    def queued(self) -> int:
+        """Batches waiting for a slot."""
+        return len(self._queued)
+
+    def submit(
+        self, key: str, chunks: list[ChunkData], position: int = 0, total: int = 1
+    ) -> None:
+        """Queue a batch; its task then waits in ``turn(key)``."""
+        if self.stopped:
+            return
+        priority = POLICIES[self.policy](chunks, position, total)
+        heapq.heappush(self._heap, (priority, next(self._order), key))
+        self._queued.add(key)
+
+    def stop(self, cancel_running: bool = False) -> None:
+        """Release no more batches; queued ones are turned away."""
+        self.stopped = True
+        self._heap.clear()
+        self._queued.clear()
+        for waiter in self._waiters.values():
+            if not waiter.done():
+                waiter.set_result(None)
+        if cancel_running:
+            for task in self._tasks:
+                task.cancel()
+
+    async def run(self, key: str, work: Callable[[], Awaitable[T]]) -> T | None:
+        """Run ``work`` in the batch's turn; None if turned away or cancelled by ``stop``."""
+        async with self.turn(key) as admitted:
+            if not admitted:
+                return None
+            task = asyncio.ensure_future(work())
+            self._tasks.add(task)
+            try:
+                return await task
+            except asyncio.CancelledError:
+                current = asyncio.current_task()
+                if not self.stopped or (current is not None and current.cancelling()):
+                    raise
+                return None
+            finally:
+                self._tasks.discard(task)
+
+    @asynccontextmanager
+    async def turn(self, key: str) -> AsyncIterator[bool]:
+        """Hold a slot while the batch runs; yields False if it was turned away.
+
+        Keys that were never submitted (a task run outside ``graph_ainvoke``)
+        take a slot straight away.
+        """
+        if key in self._queued:
+            await self._wait(key)
+        if key in self._admitted:
+            self._admitted.discard(key)
+        elif self.stopped:
+            yield False
+            return
+        else:
+            self.running += 1
+        try:
+            yield True
+        finally:
+            self.running -= 1
+            self._dispatch()
+
+    async def _wait(self, key: str) -> None:
+        self._dispatch()
+        if key in self._admitted:
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[key] = waiter
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            self._queued.discard(key)
+            if key in self._admitted:
+                # Pass a slot we can no longer use on to the next batch.
+                self._admitted.discard(key)
+                self.running -= 1
+                self._dispatch()
+            raise
+        finally:
+            self._waiters.pop(key, None)
+
+    def _dispatch(self) -> None:
+        while self._heap and (self.window <= 0 or self.running < self.window):
+            _, _, key = heapq.heappop(self._heap)
+            if key not in self._queued:
+                continue
+            self._queued.discard(key)
+            self._admitted.add(key)
+            self.running += 1
+            waiter = self._waiters.get(key)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(None)
+
+
+class OrderedTurns:
+    """Lets tasks through one at a time by rank: 0, then 1, then 2, ...
+
+    A run's page batches all start at once; taking turns here keeps their
+    extraction sequential and their dedup in a fixed order. A turn passes on
+    however its holder exits, and a rank already passed goes straight in.
+    """
+
+    def __init__(self) -> None:
+        self.next = 0
+        self._waiters: dict[int, asyncio.Future[None]] = {}
+
+    @asynccontextmanager
+    async def turn(self, rank: int) -> AsyncIterator[None]:
+        if rank > self.next:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters[rank] = waiter
+            try:
+                await waiter
+            finally:
+                self._waiters.pop(rank, None)
+        try:
+            yield
+        finally:
+            self.next = max(self.next, rank + 1)
+            waiter = self._waiters.get(self.next)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(None)
@@ -3,11 +3,20 @@ from typing import Literal
 from pydantic import BaseModel, Field
 
 
+class QuestionVerdict(BaseModel):
+    index: int = Field(..., description="The 1-based number of the reviewed quiz")
+    accepted: bool = Field(..., description="Whether this quiz is good enough to keep")
+    feedback: str = Field("", description="Why the quiz was rejected, if it was")
+
+
 class ReviewedQuiz(BaseModel):
     is_relevant: bool = Field(
         ..., description="Whether the quiz is relevant to the content"
     )
     feedback: str = Field(..., description="Feedback on the quiz quality and relevance")
+    verdicts: list[QuestionVerdict] = Field(
+        default_factory=list, description="One verdict per numbered quiz"
+    )
 
 
 class SingleQuiz(BaseModel):
@@ -30,3 +39,31 @@ class MultipleQuiz(BaseModel):
     quizzes: list[SingleQuiz] = Field(
         ..., description="A list of quiz questions with options and answers"
     )
+
+
+class BatchedQuiz(SingleQuiz):
+    chunk_id: str = Field(
+        ..., description="The chunk_id of the content section this quiz tests"
+    )
+
+
+class MultipleBatchedQuiz(BaseModel):
+    quizzes: list[BatchedQuiz] = Field(
+        ..., description="Quiz questions for every section, each tagged with its chunk_id"
+    )
+
+
+class SelfReview(BaseModel):
+    is_relevant: bool = Field(
+        ...,
+        description="Whether every quiz is relevant to, and answerable from, the content",
+    )
+    feedback: str = Field(..., description="Feedback on the quiz quality and relevance")
+
+
+class SelfReviewedQuiz(MultipleQuiz, SelfReview):
+    """Quizzes together with the generator's own review of them."""
+
+
+class SelfReviewedBatchedQuiz(MultipleBatchedQuiz, SelfReview):
+    """Batched quizzes together with the generator's own review of them."""
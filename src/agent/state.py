@@ -1,5 +1,8 @@
 from operator import add
-from typing import Annotated, Literal, TypedDict
+from typing import Annotated, Literal, NotRequired, TypedDict
+
+
+ReviewMode = Literal["separate", "self"]
 
 
 class PDFPageData(TypedDict):
@@ -27,21 +30,85 @@ class FinalQuizItem(TypedDict):
     chunk_id: str
 
 
+def merge_stats(left: dict[str, int], right: dict[str, int]) -> dict[str, int]:
+    """Reducer that sums per-key counters reported by parallel nodes."""
+    merged = dict(left or {})
+    for key, value in (right or {}).items():
+        merged[key] = merged.get(key, 0) + value
+    return merged
+
+
 class GlobalQuizState(TypedDict):
+    # Checkpointed every superstep, so only references and small metadata:
+    # page text and chunks live in the run context (see run_context.py).
     pdf_url_or_base64: str
-    pdf_pages_data: list[PDFPageData]
-    crawled_chunks: list[ChunkData]
+    pdf_digest: str
+    page_ranges: str
+    sample_chunks: int
+    # The selected pages (0-based) in document order.
+    page_indices: list[int]
+    page_count: int
+    run_stats: Annotated[dict[str, int], merge_stats]
+    final_quiz: Annotated[list[FinalQuizItem], add]
+    completed_chunks: Annotated[list[str], add]
+    chunk_tokens: int
+    questions_per_chunk: int
+    review_mode: ReviewMode
+
+
+class PageBatchOutput(TypedDict):
+    """What a ``page_batch`` task hands back to the main graph."""
+
+    run_stats: Annotated[dict[str, int], merge_stats]
     final_quiz: Annotated[list[FinalQuizItem], add]
-    provider: str
-    model_name: str
-    api_key: str
+    completed_chunks: Annotated[list[str], add]
+
+
+class PageBatchState(PageBatchOutput):
+    """One batch of selected pages, from ingestion to its generated quizzes."""
+
+    pdf_url_or_base64: str
+    pdf_digest: str
+    # Turn of this batch among the run's batches, for ingestion and dedup;
+    # the schedule policy sets the order.
+    batch_index: int
+    # The batch's pages (0-based), and the position of the first among all
+    # ``page_count`` selected pages.
+    page_indices: list[int]
+    page_offset: int
+    page_count: int
+    # Pages read by ``page_ingestor``, and the chunks to generate.
+    page_numbers: list[int]
+    chunk_ids: list[str]
+    sample_chunks: int
+    chunk_tokens: int
+    questions_per_chunk: int
+    review_mode: ReviewMode
+
+
+class ChunkTask(TypedDict):
+    """What one ``subgraph_generator`` task is sent: references, not text."""
+
+    chunk_ids: list[str]
+    questions_per_chunk: int
+    review_mode: ReviewMode
 
 
 class SubGraphState(TypedDict):
-    chunk: ChunkData
+    # The chunks generated from in one request, by id; their text and the
+    # LLM target are read from the run context.
+    chunk_ids: list[str]
     quiz: list[FinalQuizItem]
+    # Questions the reviewer already accepted; ``quiz`` then holds only the
+    # latest replacements, and ``review_feedback`` why their predecessors failed.
+    accepted: list[FinalQuizItem]
+    review_feedback: str
+    # Questions the precheck failed while others await the reviewer; they are
+    # regenerated alongside whatever the reviewer rejects.
+    rejected: NotRequired[list[FinalQuizItem]]
     iter_count: int
     is_quiz_relevant: bool
-    provider: str
-    model_name: str
-    api_key: str
+    questions_per_chunk: int
+    review_mode: ReviewMode
+    precheck: str
+    run_stats: Annotated[dict[str, int], merge_stats]
@@ -1,2 +1,30 @@
-from .chunk_pdf_content import chunk_pdf_content
-from .ingest_pdf import ingest_pdf
+from .chunk_pdf_content import (
+    CHUNKER_PARAMS,
+    PACKER_VERSION,
+    chunk_pdf_content,
+    pack_pdf_content,
+)
+from .dedup_chunks import DedupResult, dedup_chunks, minhash_signature
+from .ingest_pdf import (
+    PDFSource,
+    count_pdf_pages,
+    ingest_pdf,
+    iter_pdf_pages,
+    resolve_pdf_source,
+    spill_pdf,
+)
+from .precheck_quiz import PrecheckResult, precheck_quiz
+from .pdf_cache import PDFCache, cached_stage, get_pdf_cache, pdf_digest
+from .page_selection import (
+    parse_page_ranges,
+    sample_chunks_per_page,
+    sample_evenly,
+    select_pages,
+)
+from .response_cache import (
+    ResponseCache,
+    get_response_cache,
+    response_key,
+)
+from .run_store import RunStore, get_run_store
+from .tokens import estimate_tokens
@@ -1,50 +1,205 @@
-import os
-
-from langchain_core.documents import Document
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+import hashlib
+from collections import deque
+from itertools import accumulate
 
 from ...core import logger
 from ..state import ChunkData, PDFPageData
+from .tokens import CHARS_PER_TOKEN
+
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+CHUNK_SEPARATORS = ["\n\n", "\n", " ", ""]
+
+# Everything that changes chunk output; part of the chunk cache key.
+CHUNKER_PARAMS: dict[str, object] = {
+    "chunker": "spans-v1",
+    "chunk_size": CHUNK_SIZE,
+    "chunk_overlap": CHUNK_OVERLAP,
+    "separators": CHUNK_SEPARATORS,
+}
+
+# Version tag for pack_pdf_content output; part of the chunk cache key.
+PACKER_VERSION = "packed-v1"
+PAGE_SEPARATOR = "\n\n"
+
+Span = tuple[int, int]
 
 
 def chunk_pdf_content(pages_data: list[PDFPageData]) -> list[ChunkData]:
     """Split raw page text into smaller graph-compatible chunks.
 
     Returns a list suitable for feeding into the quiz generator nodes.
+
+    Splits on the same separator hierarchy as langchain's
+    ``RecursiveCharacterTextSplitter`` and yields the same chunk texts, but
+    works on ``(start, end)`` spans over the joined page text so no
+    intermediate strings or Document objects are created. Chunk ids are
+    derived from the page number, offset and text, so the same PDF always
+    produces the same ids.
     """
     try:
-        docs = [
-            Document(
-                page_content=page["content"],
-                metadata={"page_number": page["page_number"]},
-            )
-            for page in pages_data
-        ]
+        text = "".join(page["content"] for page in pages_data)
+        offsets = [0, *accumulate(len(page["content"]) for page in pages_data)]
+
+        graph_chunks: list[ChunkData] = []
+        for page, page_start, page_end in zip(pages_data, offsets, offsets[1:]):
+            page_number = page["page_number"]
+            for start, end in _split_span(text, page_start, page_end, CHUNK_SEPARATORS):
+                graph_chunks.append(
+                    _chunk(page_number, start - page_start, text[start:end])
+                )
+
+        return graph_chunks
+    except Exception:
+        logger.exception("Failed to chunk PDF content")
+        raise
 
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000, chunk_overlap=200, separators=["\n\n", "\n", " ", ""]
-        )
 
-        split_docs = text_splitter.split_documents(docs)
+def pack_pdf_content(pages_data: list[PDFPageData], max_tokens: int) -> list[ChunkData]:
+    """Pack whole pages into chunks of at most *max_tokens* estimated tokens.
 
+    Adjacent pages are joined until the next one would overflow the budget;
+    a page that is larger than the budget on its own is split with the usual
+    separator hierarchy. Chunks do not overlap and take the page number of
+    their first page.
+    """
+    try:
+        max_chars = max(max_tokens, 1) * CHARS_PER_TOKEN
         graph_chunks: list[ChunkData] = []
-        chunk_num = 0
-        for doc in split_docs:
-            chunk_id = f"{chunk_num}_{os.urandom(4).hex()}"
-            page_number = doc.metadata.get("page_number", 0)
-            normalized_page_number = page_number if isinstance(page_number, int) else 0
-            graph_chunks.append(
-                {
-                    "chunk_text": doc.page_content,
-                    "page_number": normalized_page_number,
-                    "iter_count": 0,
-                    "is_quiz_relevant": False,
-                    "chunk_id": chunk_id,
-                }
-            )
-            chunk_num += 1
+        group: list[PDFPageData] = []
+        size = 0
+
+        def flush() -> None:
+            nonlocal group, size
+            if group:
+                chunk_text = PAGE_SEPARATOR.join(p["content"].strip() for p in group)
+                graph_chunks.append(_chunk(group[0]["page_number"], 0, chunk_text))
+            group, size = [], 0
+
+        for page in pages_data:
+            length = len(page["content"].strip())
+            if not length:
+                continue
+            if length > max_chars:
+                flush()
+                text = page["content"]
+                for start, end in _split_span(
+                    text, 0, len(text), CHUNK_SEPARATORS, max_chars, 0
+                ):
+                    graph_chunks.append(
+                        _chunk(page["page_number"], start, text[start:end])
+                    )
+                continue
+            if group and size + len(PAGE_SEPARATOR) + length > max_chars:
+                flush()
+            size += length + (len(PAGE_SEPARATOR) if group else 0)
+            group.append(page)
+        flush()
 
         return graph_chunks
     except Exception:
-        logger.exception("Failed to chunk PDF content")
+        logger.exception("Failed to pack PDF content")
         raise
+
+
+def _chunk(page_number: int, offset: int, chunk_text: str) -> ChunkData:
+    return {
+        "chunk_text": chunk_text,
+        "page_number": page_number,
+        "iter_count": 0,
+        "is_quiz_relevant": False,
+        "chunk_id": chunk_id_for(page_number, offset, chunk_text),
+    }
+
+
+def chunk_id_for(page_number: int, offset: int, chunk_text: str) -> str:
+    """Stable id for a chunk, derived from where it sits and what it says."""
+    digest = hashlib.blake2b(
+        f"{page_number}:{offset}:{chunk_text}".encode(), digest_size=8
+    ).hexdigest()
+    return f"p{page_number}_{digest}"
+
+
+def _split_span(
+    text: str,
+    start: int,
+    end: int,
+    separators: list[str],
+    size: int = CHUNK_SIZE,
+    overlap: int = CHUNK_OVERLAP,
+) -> list[Span]:
+    # Pick the first separator present in the span; "" splits into characters.
+    separator = separators[-1]
+    remaining: list[str] = []
+    for i, candidate in enumerate(separators):
+        if not candidate:
+            separator = candidate
+            break
+        if text.find(candidate, start, end) != -1:
+            separator = candidate
+            remaining = separators[i + 1 :]
+            break
+
+    chunks: list[Span] = []
+    good: list[Span] = []
+    for piece in _pieces(text, start, end, separator):
+        if piece[1] - piece[0] < size:
+            good.append(piece)
+            continue
+        if good:
+            chunks.extend(_merge(text, good, size, overlap))
+            good = []
+        if not remaining:
+            chunks.extend(_strip(text, *piece))
+        else:
+            chunks.extend(
+                _split_span(text, piece[0], piece[1], remaining, size, overlap)
+            )
+    if good:
+        chunks.extend(_merge(text, good, size, overlap))
+    return chunks
+
+
+def _pieces(text: str, start: int, end: int, separator: str) -> list[Span]:
+    """Split a span before each separator, keeping the separator with its piece."""
+    if not separator:
+        return [(i, i + 1) for i in range(start, end)]
+
+    pieces: list[Span] = []
+    piece_start = start
+    found = text.find(separator, start, end)
+    while found != -1:
+        if found > piece_start:
+            pieces.append((piece_start, found))
+        piece_start = found
+        found = text.find(separator, found + len(separator), end)
+    if end > piece_start:
+        pieces.append((piece_start, end))
+    return pieces
+
+
+def _merge(text: str, pieces: list[Span], size: int, overlap: int) -> list[Span]:
+    """Greedily pack adjacent pieces into chunks, carrying *overlap* over."""
+    chunks: list[Span] = []
+    window: deque[Span] = deque()
+    total = 0
+    for piece in pieces:
+        length = piece[1] - piece[0]
+        if total + length > size and window:
+            chunks.extend(_strip(text, window[0][0], window[-1][1]))
+            while total > overlap or (total + length > size and total > 0):
+                total -= window[0][1] - window[0][0]
+                window.popleft()
+        window.append(piece)
+        total += length
+    if window:
+        chunks.extend(_strip(text, window[0][0], window[-1][1]))
+    return chunks
+
+
+def _strip(text: str, start: int, end: int) -> list[Span]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return [(start, end)] if end > start else []
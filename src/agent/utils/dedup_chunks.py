@@ -0,0 +1,172 @@
+import hashlib
+import re
+from dataclasses import dataclass, field
+
+from ..prompts import GENERATE_QUIZ_PROMPT, REVIEW_QUIZ_PROMPT
+from ..state import ChunkData
+from .tokens import estimate_tokens
+
+NUM_PERMUTATIONS = 32
+BANDS = 8
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_WORDS = 3
+
+# Lines this close to a page edge are header/footer candidates.
+EDGE_LINES = 3
+# A candidate must repeat on this share of a batch's pages (and at least
+# MIN_BOILERPLATE_PAGES of them) to be treated as boilerplate.
+BOILERPLATE_PAGE_RATIO = 0.5
+MIN_BOILERPLATE_PAGES = 3
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_DIGITS = re.compile(r"\d+")
+_WORDS = re.compile(r"\w+")
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest())
+
+
+_PERMUTATIONS = [
+    (_hash64(f"a{i}") % _MERSENNE_PRIME | 1, _hash64(f"b{i}") % _MERSENNE_PRIME)
+    for i in range(NUM_PERMUTATIONS)
+]
+
+# Tokens a chunk costs before its own text: one generate and one review prompt.
+_PROMPT_OVERHEAD_TOKENS = estimate_tokens(GENERATE_QUIZ_PROMPT) + estimate_tokens(
+    REVIEW_QUIZ_PROMPT
+)
+
+
+@dataclass
+class DedupResult:
+    chunks: list[ChunkData]
+    boilerplate_lines: list[str]
+    signatures: list[list[int]]
+    chunks_removed: int = 0
+    tokens_saved: int = 0
+    lines_stripped: int = 0
+    duplicates: list[str] = field(default_factory=list)
+
+
+def normalize_line(line: str) -> str:
+    """Collapse whitespace and digits so "Page 3" and "Page 14" compare equal."""
+    return _DIGITS.sub("#", " ".join(line.split())).lower()
+
+
+def find_boilerplate_lines(chunks: list[ChunkData]) -> set[str]:
+    """Normalised lines that repeat near the top or bottom of many pages.
+
+    A page's edges are the head of its first chunk and the tail of its last;
+    the edges of chunks in the middle of a page are body text.
+    """
+
+    heads: dict[int, list[str]] = {}
+    tails: dict[int, list[str]] = {}
+    for chunk in chunks:
+        lines = [line for line in chunk["chunk_text"].splitlines() if line.strip()]
+        heads.setdefault(chunk["page_number"], lines[:EDGE_LINES])
+        tails[chunk["page_number"]] = lines[-EDGE_LINES:]
+
+    min_pages = max(MIN_BOILERPLATE_PAGES, int(len(heads) * BOILERPLATE_PAGE_RATIO))
+    counts: dict[str, int] = {}
+    for page, head in heads.items():
+        for line in {normalize_line(line) for line in head + tails[page]}:
+            counts[line] = counts.get(line, 0) + 1
+    return {line for line, count in counts.items() if line and count >= min_pages}
+
+
+def strip_edge_lines(lines: list[str], boilerplate: set[str]) -> list[str]:
+    """Drop boilerplate among the first and last ``EDGE_LINES`` non-blank lines."""
+
+    content = [index for index, line in enumerate(lines) if line.strip()]
+    edges = set(content[:EDGE_LINES] + content[-EDGE_LINES:])
+    return [
+        line
+        for index, line in enumerate(lines)
+        if index not in edges or normalize_line(line) not in boilerplate
+    ]
+
+
+def minhash_signature(text: str) -> list[int]:
+    """MinHash of the text's word shingles."""
+
+    words = _WORDS.findall(text.lower())
+    shingles = {
+        " ".join(words[i : i + SHINGLE_WORDS])
+        for i in range(max(len(words) - SHINGLE_WORDS + 1, 1))
+    }
+    hashes = [_hash64(shingle) for shingle in shingles]
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def _bands(signature: list[int]) -> list[tuple[int, ...]]:
+    return [
+        (band, *signature[band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND])
+        for band in range(BANDS)
+    ]
+
+
+def _similarity(left: list[int], right: list[int]) -> float:
+    return sum(a == b for a, b in zip(left, right)) / NUM_PERMUTATIONS
+
+
+def dedup_chunks(
+    chunks: list[ChunkData],
+    boilerplate_lines: list[str] | None = None,
+    seen_signatures: list[list[int]] | None = None,
+    threshold: float = 0.8,
+) -> DedupResult:
+    """Strip repeated header/footer lines and drop near-duplicate chunks.
+
+    *boilerplate_lines* and *seen_signatures* carry what earlier batches of the
+    same document learned, so duplicates are caught across batches too.
+    """
+
+    boilerplate = set(boilerplate_lines or []) | find_boilerplate_lines(chunks)
+    signatures = list(seen_signatures or [])
+    index: dict[tuple[int, ...], list[int]] = {}
+    for position, signature in enumerate(signatures):
+        for band in _bands(signature):
+            index.setdefault(band, []).append(position)
+
+    result = DedupResult(
+        chunks=[], boilerplate_lines=sorted(boilerplate), signatures=signatures
+    )
+    for chunk in chunks:
+        lines = chunk["chunk_text"].splitlines()
+        kept_lines = strip_edge_lines(lines, boilerplate)
+        text = "\n".join(kept_lines).strip()
+
+        signature = minhash_signature(text) if text else []
+        candidates = {
+            position for band in _bands(signature) for position in index.get(band, [])
+        }
+        if not text or any(
+            _similarity(signature, signatures[c]) >= threshold for c in candidates
+        ):
+            result.chunks_removed += 1
+            result.tokens_saved += _PROMPT_OVERHEAD_TOKENS + _review_cost(
+                chunk["chunk_text"]
+            )
+            result.duplicates.append(chunk["chunk_id"])
+            continue
+
+        if len(kept_lines) < len(lines):
+            result.lines_stripped += len(lines) - len(kept_lines)
+            result.tokens_saved += _review_cost(chunk["chunk_text"]) - _review_cost(
+                text
+            )
+            chunk = {**chunk, "chunk_text": text}
+
+        for band in _bands(signature):
+            index.setdefault(band, []).append(len(signatures))
+        signatures.append(signature)
+        result.chunks.append(chunk)
+
+    return result
+
+
+def _review_cost(text: str) -> int:
+    # A chunk's text is sent twice: to the generator and to the reviewer.
+    return 2 * estimate_tokens(text)
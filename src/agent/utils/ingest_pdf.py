@@ -1,59 +1,211 @@
 import base64
+import mmap
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
+from threading import Lock
+from typing import BinaryIO, Iterator, Sequence
 
 import pymupdf
 
 from ...core import logger
 from ..state import PDFPageData
 
+# Below this many pages per worker, process start-up and result pickling cost
+# more than the extraction itself, so the range is read in-process instead.
+MIN_PAGES_PER_WORKER = 8
 
-def ingest_pdf(pdf_path_or_base64: str) -> list[PDFPageData]:
+_DATA_URL_PREFIX = "data:application/pdf;base64,"
+
+PDFBuffer = bytes | memoryview
+PDFSource = str | os.PathLike[str] | bytes | bytearray | memoryview | BinaryIO
+
+_pools: dict[int, ProcessPoolExecutor] = {}
+_pools_lock = Lock()
+
+
+def resolve_pdf_source(source: PDFSource) -> str | PDFBuffer:
     """
-    Reads PDF from path or base64, extracts text, and stores in state.
+    Normalises a PDF input to a file path or an in-memory buffer.
+
+    Raw buffers and ``BytesIO`` contents are wrapped without copying, files
+    with a descriptor are memory-mapped, and a base64 data URL is decoded once,
+    so callers can resolve up front and reuse the result for every page batch.
     """
 
-    try:
+    if isinstance(source, os.PathLike):
+        return os.fspath(source)
 
-        if pdf_path_or_base64.endswith(".pdf"):
+    if isinstance(source, str):
+        if source.startswith(_DATA_URL_PREFIX):
+            # Handle base64-encoded PDF
+            return base64.b64decode(source[len(_DATA_URL_PREFIX) :])
+        if source.lower().endswith(".pdf") or os.path.isfile(source):
             # Handle PDF file path
+            return source
+        logger.exception("Invalid PDF input. Must be a file path or base64 string.")
+        raise ValueError(
+            "Input must be a PDF file path or a base64-encoded PDF string."
+        )
 
-            reader = pymupdf.open(pdf_path_or_base64)
-            pages_data: list[PDFPageData] = []
-            for i in range(reader.page_count):
-                page = reader.load_page(i)
-                raw_page_text = page.get_text("text")
-                if not isinstance(raw_page_text, str):
-                    continue
-                page_text = raw_page_text
-                if page_text.strip():  # Only add non-empty pages
-                    pages_data.append({"page_number": i + 1, "content": page_text})
-            reader.close()
-            return pages_data
+    if isinstance(source, (bytes, memoryview)):
+        return source
+    if isinstance(source, bytearray):
+        return memoryview(source)
+    if isinstance(source, BytesIO):
+        return source.getbuffer()
+    if hasattr(source, "read"):
+        try:
+            return _map_fd(source.fileno())
+        except (AttributeError, OSError, ValueError):
+            return source.read()
+
+    raise ValueError(f"Unsupported PDF input type: {type(source).__name__}")
+
+
+def open_pdf(source: PDFSource) -> pymupdf.Document:
+    """
+    Opens a PDF from a file path, base64 data URL, buffer or file object.
+    """
+
+    resolved = resolve_pdf_source(source)
+    if isinstance(resolved, str):
+        return pymupdf.open(stream=_map_file(resolved), filetype="pdf")
+    return pymupdf.open(stream=resolved, filetype="pdf")
+
+
+def _map_file(path: str) -> memoryview:
+    with open(path, "rb") as file:
+        return _map_fd(file.fileno())
+
+
+def _map_fd(fd: int) -> memoryview:
+    # The mapping outlives the descriptor and is released with the last view.
+    return memoryview(mmap.mmap(fd, 0, access=mmap.ACCESS_READ))
+
+
+def count_pdf_pages(source: PDFSource) -> int:
+    """
+    Returns the number of pages in the PDF without extracting any text.
+    """
+
+    with open_pdf(source) as reader:
+        return reader.page_count
 
-        elif pdf_path_or_base64.startswith("data:application/pdf;base64,"):
-            # Handle base64-encoded PDF
 
-            base64_data = pdf_path_or_base64.split(",")[1]
-            pdf_bytes = base64.b64decode(base64_data)
-            pdf_file = BytesIO(pdf_bytes)
-            reader = pymupdf.open(pdf_file)
-            pages_data: list[PDFPageData] = []
-            for i in range(reader.page_count):
+def iter_pdf_pages(
+    source: PDFSource,
+    start: int = 0,
+    stop: int | None = None,
+    pages: Sequence[int] | None = None,
+) -> Iterator[PDFPageData]:
+    """
+    Yields non-empty pages one at a time as they are extracted.
+
+    *start* and *stop* are zero-based page indices (``stop`` exclusive), so a
+    caller can walk a large document in batches without holding every page's
+    text in memory at once. An explicit list of zero-based *pages* takes
+    precedence over the range; pages outside the document are ignored.
+    """
+
+    try:
+        with open_pdf(source) as reader:
+            if pages is None:
+                last = reader.page_count if stop is None else stop
+                pages = range(start, min(last, reader.page_count))
+            for i in pages:
+                if not 0 <= i < reader.page_count:
+                    continue
                 page = reader.load_page(i)
                 raw_page_text = page.get_text("text")
                 if not isinstance(raw_page_text, str):
                     continue
                 page_text = raw_page_text
                 if page_text.strip():  # Only add non-empty pages
-                    pages_data.append({"page_number": i + 1, "content": page_text})
-            reader.close()
-            return pages_data
-
-        else:
-            logger.exception("Invalid PDF input. Must be a file path or base64 string.")
-            raise ValueError(
-                "Input must be a PDF file path or a base64-encoded PDF string."
-            )
+                    yield {"page_number": i + 1, "content": page_text}
     except Exception:
         logger.exception("Failed to ingest PDF content")
         raise
+
+
+def ingest_pdf(
+    source: PDFSource,
+    start: int = 0,
+    stop: int | None = None,
+    workers: int = 1,
+    pages: Sequence[int] | None = None,
+) -> list[PDFPageData]:
+    """
+    Reads PDF from path, base64, buffer or file object and extracts page text.
+
+    With *workers* > 1 the selected pages are split into contiguous slices
+    that are extracted in a pool of worker processes, each opening the
+    document itself; the slices are merged back in page order.
+    """
+
+    resolved = resolve_pdf_source(source)
+    if pages is None:
+        if stop is None:
+            stop = count_pdf_pages(resolved)
+        pages = range(start, stop)
+    workers = min(workers, len(pages) // MIN_PAGES_PER_WORKER)
+    if workers <= 1:
+        return list(iter_pdf_pages(resolved, pages=pages))
+
+    spill_path: str | None = None
+    if isinstance(resolved, str):
+        worker_path = resolved
+    else:
+        # Callers reading many batches spill once up front and pass the path.
+        worker_path = spill_path = spill_pdf(resolved)
+
+    try:
+        # A few more slices than workers evens out pages of uneven density.
+        slice_count = workers * 2
+        bounds = [len(pages) * i // slice_count for i in range(slice_count + 1)]
+        pool = _get_pool(workers)
+        futures = [
+            pool.submit(_extract_pages, worker_path, list(pages[lo:hi]))
+            for lo, hi in zip(bounds, bounds[1:])
+            if hi > lo
+        ]
+
+        pages_data: list[PDFPageData] = []
+        for future in futures:
+            pages_data.extend(future.result())
+        return pages_data
+    finally:
+        if spill_path is not None:
+            os.unlink(spill_path)
+
+
+def spill_pdf(buffer: PDFBuffer) -> str:
+    """
+    Writes an in-memory PDF to a temporary file and returns its path.
+
+    Worker processes open the path instead of each receiving a pickled copy
+    of the buffer; the caller deletes the file once done.
+    """
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as spill:
+        spill.write(buffer)
+    return spill.name
+
+
+def _extract_pages(pdf_path: str, pages: list[int]) -> list[PDFPageData]:
+    return list(iter_pdf_pages(pdf_path, pages=pages))
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            # spawn, not fork: the parent runs an event loop and worker threads.
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _pools[workers] = pool
+        return pool
@@ -0,0 +1,101 @@
+from typing import Sequence, TypeVar
+
+from ...core import logger
+from ..state import ChunkData
+
+T = TypeVar("T")
+
+
+def parse_page_ranges(spec: str) -> list[tuple[int, int]]:
+    """Parse a spec such as ``"10-45,80"`` into 1-based inclusive ranges.
+
+    Open-ended ranges (``"200-"``) run to the end of the document.
+    """
+
+    ranges: list[tuple[int, int]] = []
+    for part in spec.replace(" ", "").split(","):
+        if not part:
+            continue
+        first, sep, last = part.partition("-")
+        try:
+            start = int(first)
+            end = int(last) if last else (10**9 if sep else start)
+        except ValueError:
+            raise ValueError(f"Invalid page range: {part!r}") from None
+        if start < 1 or end < start:
+            raise ValueError(f"Invalid page range: {part!r}")
+        ranges.append((start, end))
+    return ranges
+
+
+def sample_evenly(items: Sequence[T], count: int) -> list[T]:
+    """Pick *count* items spread evenly from first to last."""
+
+    if count <= 0 or count >= len(items):
+        return list(items)
+    if count == 1:
+        return [items[len(items) // 2]]
+    step = (len(items) - 1) / (count - 1)
+    return [items[round(i * step)] for i in range(count)]
+
+
+def select_pages(
+    page_count: int, page_ranges: str = "", sample_chunks: int = 0
+) -> list[int]:
+    """Zero-based indices of the pages to extract, in document order.
+
+    *page_ranges* narrows the document first; *sample_chunks* then keeps that
+    many pages spread evenly across what remains, so unselected pages are
+    never parsed. Raises ``ValueError`` when a range starts past the last
+    page or nothing is left to read.
+    """
+
+    if sample_chunks < 0:
+        raise ValueError(f"Invalid sample size: {sample_chunks}")
+    if page_ranges:
+        ranges = parse_page_ranges(page_ranges)
+        outside = [start for start, _ in ranges if start > page_count]
+        if outside:
+            raise ValueError(
+                f"Page range {page_ranges!r} starts past the last page"
+                f" of a {page_count}-page document"
+            )
+        selected = sorted(
+            {
+                page - 1
+                for start, end in ranges
+                for page in range(start, min(end, page_count) + 1)
+            }
+        )
+    else:
+        selected = list(range(page_count))
+    if not selected:
+        raise ValueError("The document has no pages to read")
+    if sample_chunks > len(selected):
+        logger.warning(
+            f"Asked for {sample_chunks} sampled pages but only {len(selected)}"
+            " are selected; reading them all"
+        )
+    return sample_evenly(selected, sample_chunks)
+
+
+def sample_chunks_per_page(
+    chunks: list[ChunkData], pages: Sequence[int] = ()
+) -> list[ChunkData]:
+    """Keep the middle chunk of each page, so a sampled page yields one chunk.
+
+    *pages* are the 1-based numbers that were sampled; any of them without a
+    chunk (a blank or image-only page) is logged, since the sample comes up
+    short by that many questions.
+    """
+
+    by_page: dict[int, list[ChunkData]] = {}
+    for chunk in chunks:
+        by_page.setdefault(chunk["page_number"], []).append(chunk)
+    missing = [page for page in pages if page not in by_page]
+    if missing:
+        logger.warning(
+            f"Sampled pages {missing} have no text; the sample is"
+            f" {len(missing)} chunk(s) short"
+        )
+    return [page_chunks[len(page_chunks) // 2] for page_chunks in by_page.values()]
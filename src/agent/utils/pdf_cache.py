@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, TypeVar
+
+from ...core import logger, settings
+from .ingest_pdf import PDFSource, resolve_pdf_source
+
+T = TypeVar("T")
+
+
+class PDFCache:
+    """Content-addressed on-disk store for extracted pages and chunks.
+
+    Entries are JSON files named by key. Reads bump the file's mtime, and
+    writes evict the least recently used entries once the directory grows
+    past *max_bytes*.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+
+    def get(self, key: str) -> Any | None:
+        path = self._path(key)
+        try:
+            with path.open(encoding="utf-8") as file:
+                value = json.load(file)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.warning(f"Discarding unreadable PDF cache entry {key}")
+            path.unlink(missing_ok=True)
+            return None
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=path.parent, delete=False
+            ) as tmp:
+                json.dump(value, tmp)
+            os.replace(tmp.name, path)
+        except OSError:
+            logger.warning(f"Failed to write PDF cache entry {key}", exc_info=True)
+            return
+        self._evict()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            for path in self.directory.glob("*/*.json"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+
+
+def pdf_digest(source: PDFSource) -> str:
+    """SHA-256 of the PDF bytes, streamed from disk for file paths."""
+
+    resolved = resolve_pdf_source(source)
+    if isinstance(resolved, str):
+        with open(resolved, "rb") as file:
+            return hashlib.file_digest(file, "sha256").hexdigest()
+    return hashlib.sha256(resolved).hexdigest()
+
+
+def cache_key(digest: str, kind: str, **params: object) -> str:
+    """Derive an entry key from the document digest and stage parameters."""
+
+    payload = json.dumps([digest, kind, params], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def cached_stage(
+    kind: str, digest: str, compute: Callable[[], T], **params: object
+) -> T:
+    """Return the cached result of a document stage, computing it on a miss.
+
+    Without a configured cache or a document digest this is just ``compute()``.
+    """
+
+    pdf_cache = get_pdf_cache()
+    if pdf_cache is None or not digest:
+        return compute()
+
+    key = cache_key(digest, kind, **params)
+    value = pdf_cache.get(key)
+    if value is not None:
+        logger.debug(f"PDF cache hit: {kind} {params}")
+        return value
+
+    value = compute()
+    pdf_cache.put(key, value)
+    return value
+
+
+def get_pdf_cache() -> PDFCache | None:
+    """The shared cache configured in settings, or None when disabled."""
+
+    if not settings.PDF_CACHE_DIR:
+        return None
+    return _cache_for(settings.PDF_CACHE_DIR, settings.PDF_CACHE_MAX_MB * 1024 * 1024)
+
+
+@lru_cache(maxsize=4)
+def _cache_for(directory: str, max_bytes: int) -> PDFCache:
+    return PDFCache(directory, max_bytes)
@@ -0,0 +1,121 @@
+import re
+from dataclasses import dataclass, field
+from typing import Literal
+
+from ..state import FinalQuizItem
+
+_WORD = re.compile(r"[a-z0-9]+")
+# "option B", "choice (C)"; the letter must be upper case so "the answer is
+# a ..." is not read as a citation of option A.
+_CITED_OPTION = re.compile(r"\b(?i:option|answer|choice)(?:\s+is)?\s*\(?([A-D])\)?(?![\w'])")
+# An explanation naming its answer: "the answer is C", "option C is correct".
+_STATED_ANSWER = re.compile(
+    r"\b(?i:answer\s+is)\s*(?i:option\s*|choice\s*)?\(?([A-D])\)?(?![\w'])"
+    r"|\b(?i:option|choice)\s*\(?([A-D])\)?\s+(?i:is\s+(?:the\s+)?(?:correct|right))"
+)
+_STOPWORDS = frozenset(
+    "the and for are was were which what when where who why how that this with from "
+    "into onto than then there their they them these those its not but can could "
+    "does did has have had will would should may might must each other all any "
+    "most more less some such only also about following true false correct best".split()
+)
+
+Verdict = Literal["pass", "fail", "borderline"]
+
+
+@dataclass
+class PrecheckResult:
+    verdict: Verdict
+    problems: list[str] = field(default_factory=list)
+    # One verdict per quiz, in order, and what was wrong with it ("" if nothing).
+    verdicts: list[Verdict] = field(default_factory=list)
+    notes: list[str] = field(default_factory=list)
+
+
+def precheck_quiz(
+    quizzes: list[FinalQuizItem], chunk_text: str, pass_overlap: float = 0
+) -> PrecheckResult:
+    """Score generated quizzes against their chunk without calling a model.
+
+    Broken quizzes (an answer pointing at an empty option, duplicate
+    options, no word in common with the chunk, an explanation stating a
+    different answer) fail outright. With ``pass_overlap`` set, quizzes with
+    at least that share of their question and answer words in the chunk
+    pass; word overlap says nothing about whether the answer is right, so
+    this is off by default. Anything else is borderline and left to the LLM
+    reviewer. The overall verdict fails if any quiz fails and
+    passes only if every quiz passes; an empty quiz list is borderline.
+    """
+    if not quizzes:
+        return PrecheckResult("borderline", ["no quizzes"])
+
+    chunk_words = _content_words(chunk_text)
+    result = PrecheckResult("pass")
+    failures: list[str] = []
+    doubts: list[str] = []
+    for index, quiz in enumerate(quizzes, start=1):
+        failure, doubt = _check(quiz, chunk_words, pass_overlap)
+        if failure:
+            failures.append(f"quiz {index}: {failure}")
+            result.verdicts.append("fail")
+        elif doubt:
+            doubts.append(f"quiz {index}: {doubt}")
+            result.verdicts.append("borderline")
+        else:
+            result.verdicts.append("pass")
+        result.notes.append(failure or doubt)
+
+    if failures:
+        result.verdict = "fail"
+        result.problems = failures + doubts
+    elif doubts:
+        result.verdict = "borderline"
+        result.problems = doubts
+    return result
+
+
+def _check(
+    quiz: FinalQuizItem, chunk_words: set[str], pass_overlap: float
+) -> tuple[str, str]:
+    """Return (clear failure, borderline reason); empty strings when absent."""
+    options = {
+        letter: quiz.get(f"option_{letter.lower()}", "").strip() for letter in "ABCD"
+    }
+    answer = quiz.get("answer", "")
+    if not quiz.get("question", "").strip():
+        return "empty question", ""
+    if not options.get(answer):
+        return f"answer {answer} points at an empty option", ""
+    filled = [" ".join(_WORD.findall(text.lower())) for text in options.values() if text]
+    if len(set(filled)) < len(filled):
+        return "duplicate options", ""
+
+    quiz_words = _content_words(f"{quiz['question']} {options[answer]}")
+    overlap = len(quiz_words & chunk_words) / len(quiz_words) if quiz_words else 0.0
+    if quiz_words and overlap == 0:
+        return "no words in common with the chunk", ""
+
+    explanation = quiz.get("explanation", "")
+    stated = {
+        letter for match in _STATED_ANSWER.findall(explanation) for letter in match if letter
+    }
+    if stated and answer not in stated:
+        return f"explanation gives answer {'/'.join(sorted(stated))}, answer is {answer}", ""
+    cited = set(_CITED_OPTION.findall(explanation))
+    if cited and answer not in cited:
+        # Often a distractor being discussed, so left to the reviewer.
+        return "", f"explanation mentions option {'/'.join(sorted(cited))}, not {answer}"
+
+    if pass_overlap <= 0:
+        return "", "left to the reviewer"
+    if overlap < pass_overlap:
+        return "", f"only {overlap:.0%} of its words appear in the chunk"
+    return "", ""
+
+
+def _content_words(text: str) -> set[str]:
+    return {
+        word
+        for word in _WORD.findall(text.lower())
+        if len(word) > 2 and word not in _STOPWORDS
+    }
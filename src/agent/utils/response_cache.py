@@ -0,0 +1,115 @@
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+from ...core import logger, settings
+
+
+@dataclass
+class ResponseCacheStats:
+    hits: int = 0
+    misses: int = 0
+
+
+class ResponseCache:
+    """SQLite store of structured LLM responses keyed by their request.
+
+    Entries expire *ttl_seconds* after they were written, and writes evict
+    the least recently used entries once stored responses exceed *max_bytes*.
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: float) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.stats = ResponseCacheStats()
+        self._lock = Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as db, db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created REAL NOT NULL, used REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS responses_used ON responses(used)")
+
+    def get(self, key: str) -> Any | None:
+        now = time.time()
+        try:
+            with self._lock, closing(self._connect()) as db, db:
+                row = db.execute(
+                    "SELECT value, created FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and now - row[1] > self.ttl_seconds:
+                    db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    row = None
+                if row is None:
+                    self.stats.misses += 1
+                    return None
+                db.execute("UPDATE responses SET used = ? WHERE key = ?", (now, key))
+                self.stats.hits += 1
+                return json.loads(row[0])
+        except (sqlite3.Error, ValueError):
+            logger.warning(f"LLM response cache read failed for {key}", exc_info=True)
+            self.stats.misses += 1
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        payload = json.dumps(value)
+        now = time.time()
+        try:
+            with self._lock, closing(self._connect()) as db, db:
+                db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                    (key, payload, len(payload), now, now),
+                )
+                self._evict(db, now)
+        except sqlite3.Error:
+            logger.warning(f"LLM response cache write failed for {key}", exc_info=True)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=10)
+
+    def _evict(self, db: sqlite3.Connection, now: float) -> None:
+        db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+        (total,) = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if total <= self.max_bytes:
+            return
+        stale: list[tuple[str]] = []
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY used"):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        db.executemany("DELETE FROM responses WHERE key = ?", stale)
+
+
+def response_key(*parts: object) -> str:
+    """Derive an entry key from everything that determines the response."""
+
+    payload = json.dumps(parts, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_response_cache() -> ResponseCache | None:
+    """The shared cache configured in settings, or None when disabled."""
+
+    if not settings.LLM_CACHE_PATH:
+        return None
+    return _cache_for(
+        settings.LLM_CACHE_PATH,
+        settings.LLM_CACHE_MAX_MB * 1024 * 1024,
+        settings.LLM_CACHE_TTL_HOURS * 3600,
+    )
+
+
+@lru_cache(maxsize=4)
+def _cache_for(path: str, max_bytes: int, ttl_seconds: float) -> ResponseCache:
+    return ResponseCache(path, max_bytes, ttl_seconds)
@@ -0,0 +1,101 @@
+import json
+import sqlite3
+import time
+from contextlib import closing
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+
+from ...core import logger, settings
+from ..state import FinalQuizItem
+
+
+class RunStore:
+    """SQLite record of each run's finished chunks, keyed by thread id.
+
+    Every chunk a run completes is stored with its reviewed quizzes (possibly
+    none), so a run that is cancelled, crashes or loses its process can be
+    resumed under the same thread id and only generate the missing chunks.
+    Chunk ids are derived from the PDF and chunk text, so they match across
+    runs over the same document and settings. Writes drop every thread not
+    written to for *ttl_seconds* (0 keeps them forever).
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 0) -> None:
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self._lock = Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as db, db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS chunk_results ("
+                "thread_id TEXT NOT NULL, chunk_id TEXT NOT NULL, quizzes TEXT NOT NULL, "
+                "created REAL NOT NULL, PRIMARY KEY (thread_id, chunk_id))"
+            )
+
+    def get(self, thread_id: str, chunk_ids: list[str]) -> dict[str, list[FinalQuizItem]]:
+        """Stored quizzes of those *chunk_ids* the thread already completed."""
+        if not chunk_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in chunk_ids)
+        try:
+            with self._lock, closing(self._connect()) as db:
+                rows = db.execute(
+                    "SELECT chunk_id, quizzes FROM chunk_results "
+                    f"WHERE thread_id = ? AND chunk_id IN ({placeholders})",
+                    (thread_id, *chunk_ids),
+                ).fetchall()
+            return {chunk_id: json.loads(quizzes) for chunk_id, quizzes in rows}
+        except (sqlite3.Error, ValueError):
+            logger.warning(f"Run store read failed for {thread_id}", exc_info=True)
+            return {}
+
+    def put(self, thread_id: str, results: dict[str, list[FinalQuizItem]]) -> None:
+        now = time.time()
+        rows = [
+            (thread_id, chunk_id, json.dumps(quizzes), now)
+            for chunk_id, quizzes in results.items()
+        ]
+        try:
+            with self._lock, closing(self._connect()) as db, db:
+                db.executemany("INSERT OR REPLACE INTO chunk_results VALUES (?, ?, ?, ?)", rows)
+                self._evict(db, now)
+        except sqlite3.Error:
+            logger.warning(f"Run store write failed for {thread_id}", exc_info=True)
+
+    def completed(self, thread_id: str) -> int:
+        """How many chunks the thread has finished."""
+        try:
+            with self._lock, closing(self._connect()) as db:
+                (count,) = db.execute(
+                    "SELECT COUNT(*) FROM chunk_results WHERE thread_id = ?", (thread_id,)
+                ).fetchone()
+            return count
+        except sqlite3.Error:
+            logger.warning(f"Run store read failed for {thread_id}", exc_info=True)
+            return 0
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=10)
+
+    def _evict(self, db: sqlite3.Connection, now: float) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        db.execute(
+            "DELETE FROM chunk_results WHERE thread_id IN ("
+            "SELECT thread_id FROM chunk_results GROUP BY thread_id HAVING MAX(created) < ?)",
+            (now - self.ttl_seconds,),
+        )
+
+
+def get_run_store() -> RunStore | None:
+    """The shared store configured in settings, or None when disabled."""
+
+    if not settings.CHECKPOINT_PATH:
+        return None
+    return _store_for(settings.CHECKPOINT_PATH, settings.CHECKPOINT_TTL_HOURS * 3600)
+
+
+@lru_cache(maxsize=4)
+def _store_for(path: str, ttl_seconds: float) -> RunStore:
+    return RunStore(path, ttl_seconds)
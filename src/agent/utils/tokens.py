@@ -0,0 +1,10 @@
+import math
+
+# Close enough for English prose across the supported providers; used for
+# estimates and budgets, never for billing.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of *text*."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
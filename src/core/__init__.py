@@ -1,4 +1,5 @@
 # flake8: noqa
 
+from .blocking import loop_monitor, run_blocking, run_blocking_in_thread
 from .logger import configure_logging, logger
 from .settings import settings
@@ -0,0 +1,126 @@
+import asyncio
+import functools
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable, ParamSpec, TypeVar
+
+from .logger import logger
+from .settings import settings
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+_executors: dict[str, Executor] = {}
+_executors_lock = Lock()
+
+
+def get_blocking_executor(kind: str | None = None) -> Executor:
+    """The process-wide executor for CPU-bound pipeline stages.
+
+    One executor is shared by every session, so ``BLOCKING_WORKERS`` bounds
+    how much parsing and chunking runs at once across all connected users.
+    """
+
+    kind = kind or settings.BLOCKING_EXECUTOR
+    with _executors_lock:
+        executor = _executors.get(kind)
+        if executor is None:
+            if kind == "process":
+                executor = ProcessPoolExecutor(
+                    max_workers=settings.BLOCKING_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                executor = ThreadPoolExecutor(
+                    max_workers=settings.BLOCKING_WORKERS,
+                    thread_name_prefix="quizzer-blocking",
+                )
+            _executors[kind] = executor
+        return executor
+
+
+async def run_blocking(
+    func: Callable[P, T],
+    *args: P.args,
+    **kwargs: P.kwargs,
+) -> T:
+    """Run a blocking callable on the shared executor without stalling the loop.
+
+    With ``BLOCKING_EXECUTOR=process`` the callable and its arguments must be
+    picklable; :func:`run_blocking_in_thread` covers calls that are not.
+    """
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_blocking_executor(), functools.partial(func, *args, **kwargs)
+    )
+
+
+async def run_blocking_in_thread(
+    func: Callable[P, T],
+    *args: P.args,
+    **kwargs: P.kwargs,
+) -> T:
+    """Like :func:`run_blocking`, but always on the shared thread pool."""
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_blocking_executor("thread"), functools.partial(func, *args, **kwargs)
+    )
+
+
+@dataclass
+class LoopStallStats:
+    samples: int = 0
+    stalls: int = 0
+    max_stall_ms: float = 0.0
+    total_stall_ms: float = 0.0
+
+
+class EventLoopMonitor:
+    """Measures how late the event loop wakes a periodic sleeper.
+
+    Any lateness beyond the sleep interval is time the loop spent running
+    something that did not yield; stalls over the warning threshold are
+    logged with their duration.
+    """
+
+    def __init__(self, interval: float = 0.05, warn_ms: float | None = None) -> None:
+        self.interval = interval
+        self.warn_ms = settings.LOOP_STALL_WARN_MS if warn_ms is None else warn_ms
+        self.stats = LoopStallStats()
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.record((time.perf_counter() - started - self.interval) * 1000)
+
+    def record(self, lateness_ms: float) -> None:
+        stall_ms = max(lateness_ms, 0.0)
+        self.stats.samples += 1
+        self.stats.max_stall_ms = max(self.stats.max_stall_ms, stall_ms)
+        if stall_ms >= self.warn_ms:
+            self.stats.stalls += 1
+            self.stats.total_stall_ms += stall_ms
+            logger.warning(f"Event loop stalled for {stall_ms:.0f} ms")
+
+
+loop_monitor = EventLoopMonitor()
@@ -34,6 +34,112 @@ class Settings(BaseSettings):
     LANGSMITH_ENDPOINT: str = "https://api.smith.langchain.com"
 
     GEN_CONCURRENCY: int = 5
+    # Adapt in-flight LLM calls per provider/model at runtime (AIMD): start at
+    # GEN_CONCURRENCY, grow on success and halve on rate-limit errors, within
+    # [GEN_CONCURRENCY_MIN, GEN_CONCURRENCY_MAX]. The per-run concurrency then
+    # only caps how many chunks a run has in progress.
+    ADAPTIVE_CONCURRENCY: bool = True
+    GEN_CONCURRENCY_MIN: int = 1
+    GEN_CONCURRENCY_MAX: int = 32
+    # Process-wide requests/tokens per minute per provider, shared by every
+    # session using the same API key, e.g. RATE_LIMIT_RPM='{"groq": 30}'.
+    # Calls queue fairly across sessions instead of failing; unset is unlimited.
+    RATE_LIMIT_RPM: dict[str, int] = {}
+    RATE_LIMIT_TPM: dict[str, int] = {}
+    # Chunks sent to the model in one generation request. 1 sends each chunk
+    # on its own; 0 packs as many as fit in a quarter of the model's context
+    # window (at most GEN_BATCH_MAX), which helps with low requests-per-minute
+    # limits.
+    GEN_BATCH_SIZE: int = 1
+    GEN_BATCH_MAX: int = 16
+
+    # "separate" reviews every generated quiz with a second LLM call. "self"
+    # asks the generator to review its own output in the same response and
+    # only calls the reviewer when that self-review fails.
+    REVIEW_MODE: Literal["separate", "self"] = "separate"
+
+    # Score quizzes with local heuristics first: clear failures regenerate
+    # straight away instead of costing a reviewer call.
+    PRECHECK_ENABLED: bool = True
+    # Share of a quiz's question and answer words that must appear in the
+    # chunk for it to skip the reviewer; overlap does not check the answer is
+    # right, so 0 (every quiz that does not fail is reviewed) by default.
+    PRECHECK_PASS_OVERLAP: float = 0
+
+    # Order in which chunk batches start generating: "document" in page order,
+    # "spread" across the document so early questions cover all of it,
+    # "shortest" smallest requests first for the quickest first results. The
+    # run's concurrency is the window of batches in progress at once. Only
+    # chunks already read compete for a free slot: "spread" also reads the
+    # page batches in spread order, while "shortest" ranks within what has
+    # been read so far.
+    SCHEDULE_POLICY: Literal["document", "spread", "shortest"] = "document"
+
+    # Seconds before a single LLM call is abandoned; the generator and reviewer
+    # nodes then retry it (3 attempts in all). 0 waits indefinitely.
+    LLM_CALL_TIMEOUT_S: float = 0
+
+    # Once a call outlasts the model's HEDGE_PERCENTILE latency, send a
+    # duplicate (to the fallback provider/model when set) and keep the first
+    # answer. Costs extra requests, so off by default.
+    HEDGE_ENABLED: bool = False
+    HEDGE_PERCENTILE: float = 95
+    HEDGE_FALLBACK_PROVIDER: str = ""
+    HEDGE_FALLBACK_MODEL: str = ""
+
+    # LLM clients kept alive (with their connection pools) per provider, model
+    # and API key; the least recently used are dropped beyond this.
+    LLM_CLIENT_CACHE_SIZE: int = 16
+    # Runs whose final state stays in the shared in-memory checkpointer; the
+    # least recently active are evicted beyond this count or after this long
+    # idle (0 disables either bound).
+    CHECKPOINT_MAX_THREADS: int = 64
+    CHECKPOINT_TTL_MINUTES: float = 60
+    # SQLite file recording every finished chunk per run, so a cancelled or
+    # crashed run can be resumed by thread id (CLI --resume, UI "Resume");
+    # empty disables it. Runs not written to for CHECKPOINT_TTL_HOURS are
+    # deleted (0 keeps them forever).
+    CHECKPOINT_PATH: str = ""
+    CHECKPOINT_TTL_HOURS: float = 168
+
+    # Shared executor for PDF parsing, chunking and dedup, so one user's large
+    # upload cannot stall the event loop for every other session.
+    BLOCKING_EXECUTOR: Literal["thread", "process"] = "thread"
+    BLOCKING_WORKERS: int = 4
+    LOOP_STALL_WARN_MS: int = 100
+
+    # Pages per ingestion batch. Batches are read one after another, and each
+    # starts generating as soon as it is chunked while later ones are still
+    # being read. 0 reads the whole document as one batch.
+    INGEST_BATCH_PAGES: int = 20
+    # Worker processes used to extract a batch's pages in parallel; each
+    # worker needs at least 8 pages, so raise INGEST_BATCH_PAGES alongside it.
+    INGEST_WORKERS: int = 1
+
+    # On-disk cache of extracted pages and chunks keyed by the PDF's hash;
+    # empty disables it.
+    PDF_CACHE_DIR: str = ""
+    PDF_CACHE_MAX_MB: int = 512
+
+    # Strip repeated headers/footers and drop near-duplicate chunks (MinHash
+    # similarity at or above DEDUP_THRESHOLD) before generation.
+    DEDUP_ENABLED: bool = True
+    DEDUP_THRESHOLD: float = 0.8
+
+    # SQLite cache of generator/reviewer responses keyed by provider, model,
+    # prompt-template version and rendered prompt; empty disables it.
+    LLM_CACHE_PATH: str = ""
+    LLM_CACHE_TTL_HOURS: float = 24 * 7
+    LLM_CACHE_MAX_MB: int = 256
+
+    # "chars" splits pages into fixed 1000/200-character chunks. "tokens" packs
+    # adjacent pages into chunks of up to CHUNK_MAX_TOKENS (capped at a quarter
+    # of the model's context window) with no overlap, so fewer, larger chunks
+    # each cost one generate/review round trip.
+    CHUNK_MODE: Literal["chars", "tokens"] = "chars"
+    CHUNK_MAX_TOKENS: int = 4000
+    # Questions requested per chunk; 0 lets the model decide.
+    QUESTIONS_PER_CHUNK: int = 0
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
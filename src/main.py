@@ -4,20 +4,65 @@ import asyncio
 from dotenv import load_dotenv
 from langgraph.types import StateSnapshot
 
+from .agent.budget import RunBudget
 from .agent.graph import graph_ainvoke
-from .core import configure_logging, logger
+from .agent.scheduler import POLICIES, SchedulePolicy
+from .agent.state import ReviewMode
+from .agent.utils import parse_page_ranges
+from .core import configure_logging, logger, settings
 from .utils.export import export_quizzes_to_csv
 
 load_dotenv()
 
 
-async def main(pdf_input: str, csv_output: str | None = None) -> str | None:
+async def main(
+    pdf_input: str,
+    csv_output: str | None = None,
+    page_ranges: str | None = None,
+    sample_chunks: int | None = None,
+    questions_per_chunk: int | None = None,
+    review_mode: ReviewMode | None = None,
+    resume: str | None = None,
+    schedule_policy: SchedulePolicy | None = None,
+    budget: RunBudget | None = None,
+) -> str | None:
     logger.info("Quizzer started")
-    result = await graph_ainvoke(pdf_url_or_base64=pdf_input)
+    if resume and not settings.CHECKPOINT_PATH:
+        logger.warning("--resume needs CHECKPOINT_PATH; regenerating every chunk")
+    result = await graph_ainvoke(
+        pdf_url_or_base64=pdf_input,
+        thread_id=resume,
+        resume=resume is not None,
+        page_ranges=page_ranges,
+        sample_chunks=sample_chunks,
+        questions_per_chunk=questions_per_chunk,
+        review_mode=review_mode,
+        schedule_policy=schedule_policy,
+        budget=budget,
+    )
     state_values = result.values if isinstance(result, StateSnapshot) else result
     logger.info(f"Graph finished with keys: {list(state_values.keys())}")
+    run_stats = state_values.get("run_stats", {}) or {}
+    if run_stats.get("reviews_skipped"):
+        reviews = run_stats.get("reviews", 0)
+        mean_review_ms = run_stats.get("review_ms", 0) / reviews if reviews else 0
+        logger.info(
+            f"Self-review skipped {run_stats['reviews_skipped']} reviewer calls "
+            f"(~{run_stats.get('review_tokens_saved', 0)} tokens, "
+            f"~{run_stats['reviews_skipped'] * mean_review_ms / 1000:.1f}s saved)"
+        )
+    if run_stats.get("chunks_resumed"):
+        logger.info(f"Resumed {run_stats['chunks_resumed']} finished chunks from {resume}")
+    if run_stats.get("hedged"):
+        logger.info(
+            f"Hedged {run_stats['hedged']} of {run_stats.get('llm_calls', 0)} LLM calls; "
+            f"the hedge answered first {run_stats.get('hedge_wins', 0)} times"
+        )
 
     final_quiz_data = state_values.get("final_quiz", [])
+    if budget is not None and budget.reason:
+        final_quiz_data = budget.trim(final_quiz_data)
+        logger.info(f"Stopped early ({budget.reason}) with {len(final_quiz_data)} questions")
     filepath = export_quizzes_to_csv(final_quiz_data, custom_filepath=csv_output)
 
     return filepath
@@ -33,10 +78,92 @@ def cli():
     parser.add_argument(
         "--output", type=str, help="Optional custom path for the output CSV"
     )
+    parser.add_argument(
+        "--pages",
+        type=_page_ranges_arg,
+        help='Only process these 1-based pages, e.g. "10-45,80"',
+    )
+    parser.add_argument(
+        "--sample",
+        type=int,
+        metavar="N",
+        help="Only process N chunks spread evenly across the selected pages",
+    )
+    parser.add_argument(
+        "--questions",
+        type=int,
+        metavar="N",
+        help="Ask for N questions per chunk (default: QUESTIONS_PER_CHUNK)",
+    )
+    parser.add_argument(
+        "--review-mode",
+        choices=["separate", "self"],
+        help="Review quizzes with a separate LLM call, or let the generator "
+        "review its own output (default: REVIEW_MODE)",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="THREAD_ID",
+        help="Continue an interrupted run (its thread id is logged at start); "
+        "chunks it finished are taken from CHECKPOINT_PATH",
+    )
+
+    parser.add_argument(
+        "--schedule",
+        choices=list(POLICIES),
+        help="Order chunks start in: page order, spread across the document, "
+        "or shortest first (default: SCHEDULE_POLICY)",
+    )
+
+    parser.add_argument(
+        "--max-questions",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Stop once N questions have been accepted",
+    )
+    parser.add_argument(
+        "--max-tokens",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Stop once the run has spent N tokens",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=0,
+        metavar="SECONDS",
+        help="Stop SECONDS after the run starts",
+    )
 
     args = parser.parse_args()
     configure_logging()
-    asyncio.run(main(args.input, args.output))
+    asyncio.run(
+        main(
+            args.input,
+            args.output,
+            args.pages,
+            args.sample,
+            args.questions,
+            args.review_mode,
+            args.resume,
+            args.schedule,
+            RunBudget(
+                max_questions=args.max_questions,
+                max_tokens=args.max_tokens,
+                deadline_s=args.deadline,
+            ),
+        )
+    )
+
+
+def _page_ranges_arg(value: str) -> str:
+    try:
+        parse_page_ranges(value)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error)) from None
+    return value
 
 
 if __name__ == "__main__":
@@ -4,13 +4,17 @@ import asyncio
 import math
 import os
 import tempfile
+from collections import Counter
 from pathlib import Path
 from typing import IO, Any
 from uuid import uuid4
 
 from nicegui import app, events, ui
 
-from ..core import configure_logging, logger, settings
+from ..agent.budget import RunBudget
+from ..agent.graph import default_concurrency
+from ..agent.utils import parse_page_ranges
+from ..core import configure_logging, logger, loop_monitor, settings
 from ..utils.export import export_quizzes_to_csv
 from .runner import GenerationProgress, run_generation
 
@@ -20,6 +24,10 @@ PROVIDER_MODEL_FIELD = {
     "google": "GEMINI_MODEL",
     "groq": "GROQ_MODEL",
 }
+REVIEW_MODES = {
+    "separate": "Separate reviewer call",
+    "self": "Self-review (fewer calls)",
+}
 PROVIDER_KEY_LABEL = {
     "openai": "OpenAI API Key",
     "google": "Google API Key",
@@ -175,6 +183,12 @@ body, .q-app { font-family: var(--font-ui) !important; }
 }
 .body--dark .qz-page-chip  { background: oklch(28% 0.010 142); color: oklch(62% 0.010 142); }
 .body--light .qz-page-chip { background: oklch(88% 0.012 142); color: oklch(40% 0.010 142); }
+.qz-provisional-chip {
+  display: inline-flex; align-items: center;
+  padding: 2px 8px; border-radius: 999px;
+  font-size: 11px; font-weight: 600; font-family: var(--font-ui);
+  border: 1px dashed currentColor; opacity: 0.7;
+}
 
 .qz-options-label {
   font-size: 10px; font-weight: 700; letter-spacing: 0.08em;
@@ -208,6 +222,47 @@ def is_valid_pdf(content: IO[bytes]) -> bool:
     return header == b"%PDF-"
 
 
+def _quiz_key(quiz: dict[str, Any]) -> tuple[str, str]:
+    return str(quiz.get("chunk_id", "")), str(quiz.get("question", ""))
+
+
+def _card(quiz: dict[str, Any], provisional: bool = False) -> dict[str, Any]:
+    # ``_key`` is the question as generated, so an edited card is still found.
+    card = {**dict(quiz), "_id": uuid4().hex, "_key": _quiz_key(quiz)}
+    if provisional:
+        card["_provisional"] = True
+    return card
+
+
+def settle_cards(
+    cards: list[dict[str, Any]], final: list[dict[str, Any]], shown: Counter
+) -> list[dict[str, Any]]:
+    """The cards to keep once a run ends, given its final questions.
+
+    Streamed drafts go, and so does any card the final list no longer holds
+    (trimmed to the run's budget). Reviewed cards keep the user's edits and
+    deleted ones stay deleted; final questions never shown (counted in
+    *shown* by ``_quiz_key``) are added at the end.
+    """
+    remaining = Counter(_quiz_key(quiz) for quiz in final)
+    kept = []
+    for card in cards:
+        key = card.get("_key")
+        if card.get("_provisional") or not remaining[key]:
+            continue
+        remaining[key] -= 1
+        kept.append(card)
+    unseen = Counter(shown)
+    added = []
+    for quiz in final:
+        key = _quiz_key(quiz)
+        if unseen[key]:
+            unseen[key] -= 1
+        else:
+            added.append(_card(quiz))
+    return kept + added
+
+
 def _model_for(provider: str) -> str:
     field = PROVIDER_MODEL_FIELD.get(provider)
     return getattr(settings, field, "") if field else ""
@@ -256,11 +311,20 @@ def index() -> None:
         "running": False,
         "provider": settings.MODEL_PROVIDER,
         "model": _model_for(settings.MODEL_PROVIDER),
-        "concurrency": settings.GEN_CONCURRENCY,
+        "concurrency": default_concurrency(),
+        "page_ranges": "",
+        "sample_chunks": 0,
+        "review_mode": settings.REVIEW_MODE,
+        # Run budgets; 0 leaves a budget off.
+        "max_questions": 0,
+        "max_tokens": 0,
+        "deadline_min": 0,
         "api_key": "",
         "page": 0,
         "page_size": 10,
         "cancel_event": None,
+        # Thread id of an interrupted run that the run store can resume.
+        "resume_thread": None,
         "quiz_mode": False,
         "revealed": set(),
     }
@@ -298,13 +362,43 @@ def index() -> None:
                 detail = f"pages {p.total_pages}"
             else:
                 token_part = f" · tokens {p.total_tokens:,}" if p.total_tokens else ""
+                dedup_part = (
+                    f" · skipped {p.chunks_removed} duplicate chunks"
+                    f" (~{p.tokens_saved:,} tokens saved)"
+                    if p.chunks_removed
+                    else ""
+                )
+                review_part = (
+                    f" · self-review skipped {p.reviews_skipped} reviews"
+                    f" (~{p.review_tokens_saved:,} tokens"
+                    + (f", ~{p.review_ms_saved / 1000:.0f}s" if p.review_ms_saved else "")
+                    + " saved)"
+                    if p.reviews_skipped
+                    else ""
+                )
+                hedge_part = (
+                    f" · hedged {p.hedge_rate:.0%} of calls ({p.hedge_wins} won)"
+                    if p.hedged
+                    else ""
+                )
+                resumed_part = (
+                    f" · resumed {p.chunks_resumed} finished chunks"
+                    if p.chunks_resumed
+                    else ""
+                )
+                limit_part = (
+                    f" · in flight ≤ {p.concurrency_limit}" if p.concurrency_limit else ""
+                )
+                queued_part = f" · {p.chunks_queued} queued" if p.chunks_queued else ""
                 detail = (
                     f"pages {p.total_pages} · "
                     f"chunks {p.chunks_done}/{p.total_chunks or '?'} · "
                     f"questions {len(p.quizzes)}"
-                    f"{token_part}"
+                    f"{token_part}{limit_part}{queued_part}{hedge_part}{resumed_part}{dedup_part}{review_part}"
                 )
             ui.label(detail).classes("text-xs opacity-70")
+            if p.stop_reason:
+                ui.label(f"Stopped early: {p.stop_reason}").classes("text-xs text-warning")
             if p.phase == "error" and p.error:
                 ui.label(f"Error: {p.error}").classes("text-xs text-negative")
 
@@ -381,7 +475,8 @@ def index() -> None:
                 )
 
     def _quiz_card(idx: int, quiz: dict) -> None:
-        with ui.card().classes("w-full p-0"):
+        provisional = bool(quiz.get("_provisional"))
+        with ui.card().classes("w-full p-0" + (" opacity-70" if provisional else "")):
             # ── Header ──────────────────────────────
             with ui.row().classes("w-full items-center justify-between px-4 pt-3 pb-2"):
                 with ui.row().classes("items-center gap-2"):
@@ -389,12 +484,17 @@ def index() -> None:
                     ui.html(
                         f'<span class="qz-page-chip">page {quiz.get("page_number", "?")}</span>'
                     )
-                ui.button(
-                    icon="delete",
-                    on_click=lambda *_, i=idx: delete_quiz(i),
-                ).props("flat dense round color=negative").tooltip(
-                    "Remove this question"
-                )
+                    if provisional:
+                        ui.html(
+                            '<span class="qz-provisional-chip">awaiting review</span>'
+                        ).tooltip("Streamed from the model; may still be rejected")
+                if not provisional:
+                    ui.button(
+                        icon="delete",
+                        on_click=lambda *_, i=idx: delete_quiz(i),
+                    ).props("flat dense round color=negative").tooltip(
+                        "Remove this question"
+                    )
             ui.separator().style("margin: 0; opacity: 0.15")
 
             # ── Question + Options + Answer ──────────
@@ -466,7 +566,7 @@ def index() -> None:
     # Handlers
     # ============================================================
 
-    async def on_generate() -> None:
+    async def on_generate(resume: bool = False) -> None:
         if state["running"]:
             return
         if not state["pdf_path"]:
@@ -484,6 +584,12 @@ def index() -> None:
             )
             return
 
+        try:
+            parse_page_ranges(state["page_ranges"])
+        except ValueError as exc:
+            ui.notify(str(exc), type="warning")
+            return
+
         provider_chip.set_text(f"provider: {state['provider']}")
 
         state["quiz_mode"] = False
@@ -498,10 +604,29 @@ def index() -> None:
         cards_view.refresh()
         action_buttons.refresh()
 
+        shown = 0
+        shown_keys: Counter = Counter()
+        last_provisional: list = []
+
         def push(snapshot: GenerationProgress) -> None:
+            nonlocal shown, last_provisional
             state["progress"] = snapshot
             if snapshot.phase in ("done", "error"):
-                state["quizzes"] = [{**dict(q), "_id": uuid4().hex} for q in snapshot.quizzes]
+                state["quizzes"] = settle_cards(state["quizzes"], snapshot.quizzes, shown_keys)
+            else:
+                # Reviewed questions keep their cards (and any edits); streamed
+                # ones are redrawn whenever the model publishes more.
+                fresh = snapshot.quizzes[shown:]
+                shown = len(snapshot.quizzes)
+                shown_keys.update(_quiz_key(q) for q in fresh)
+                if fresh or snapshot.provisional != last_provisional:
+                    last_provisional = snapshot.provisional
+                    reviewed = [q for q in state["quizzes"] if not q.get("_provisional")]
+                    reviewed += [_card(q) for q in fresh]
+                    state["quizzes"] = reviewed + [
+                        _card(q, provisional=True) for q in snapshot.provisional
+                    ]
+                    cards_view.refresh()
             progress_view.refresh()
 
         try:
@@ -513,20 +638,37 @@ def index() -> None:
                 model_name=state["model"],
                 concurrency=int(state["concurrency"]) or 1,
                 api_key=state["api_key"].strip() or None,
+                page_ranges=state["page_ranges"].strip() or None,
+                sample_chunks=int(state["sample_chunks"] or 0) or None,
+                review_mode=state["review_mode"],
+                thread_id=state["resume_thread"] if resume else None,
+                resume=resume,
+                budget=RunBudget(
+                    max_questions=int(state["max_questions"] or 0),
+                    max_tokens=int(state["max_tokens"] or 0),
+                    deadline_s=float(state["deadline_min"] or 0) * 60,
+                ),
             )
+            state["resume_thread"] = None
             if state["cancel_event"] and state["cancel_event"].is_set():
+                if settings.CHECKPOINT_PATH:
+                    state["resume_thread"] = state["progress"].thread_id
                 ui.notify(
                     f"Cancelled — kept {len(state['quizzes'])} questions",
                     type="warning",
                 )
             else:
+                stop_reason = state["progress"].stop_reason
                 ui.notify(
-                    f"Generated {len(state['quizzes'])} questions",
+                    f"Generated {len(state['quizzes'])} questions"
+                    + (f" — stopped early: {stop_reason}" if stop_reason else ""),
                     type="positive",
                 )
         except Exception as exc:
             logger.exception("UI generation failed")
             ui.notify(f"Generation failed: {exc}", type="negative")
+            if settings.CHECKPOINT_PATH:
+                state["resume_thread"] = state["progress"].thread_id
         finally:
             state["running"] = False
             state["cancel_event"] = None
@@ -536,7 +678,7 @@ def index() -> None:
             action_buttons.refresh()
 
     def on_download() -> None:
-        quizzes = state["quizzes"]
+        quizzes = [q for q in state["quizzes"] if not q.get("_provisional")]
         if not quizzes:
             ui.notify("Nothing to export yet", type="warning")
             return
@@ -570,6 +712,7 @@ def index() -> None:
             Path(state["pdf_path"]).unlink(missing_ok=True)
         state["pdf_path"] = None
         state["pdf_name"] = None
+        state["resume_thread"] = None
         state["page"] = 0
         state["quizzes"] = []
         state["progress"] = GenerationProgress()
@@ -578,6 +721,7 @@ def index() -> None:
         generate_btn.disable()
         progress_view.refresh()
         cards_view.refresh()
+        action_buttons.refresh()
 
     async def on_upload(e: events.UploadEventArguments) -> None:
         from io import BytesIO
@@ -597,10 +741,12 @@ def index() -> None:
         tmp.close()
         await e.file.save(tmp.name)
         state["pdf_path"] = tmp.name
+        state["resume_thread"] = None
         state["pdf_name"] = filename
         upload_status.set_text(f"Loaded: {filename}")
         upload_status.classes(remove="opacity-50")
         generate_btn.enable()
+        action_buttons.refresh()
 
     def on_provider_change(e: events.ValueChangeEventArguments) -> None:
         state["provider"] = e.value
@@ -691,14 +837,58 @@ def index() -> None:
                     link.set_visibility(provider == state["provider"])
 
             ui.number(
-                label="Concurrency",
+                label="Max concurrency",
                 value=state["concurrency"],
                 min=1,
-                max=20,
+                max=max(settings.GEN_CONCURRENCY_MAX, 20),
                 step=1,
                 on_change=lambda e: state.update(concurrency=int(e.value or 1)),
             ).classes("w-full").props("outlined dense")
 
+            ui.input(
+                label="Pages (e.g. 10-45,80)",
+                value=state["page_ranges"],
+                on_change=lambda e: state.update(page_ranges=e.value or ""),
+            ).classes("w-full").props("outlined dense clearable")
+
+            ui.number(
+                label="Sample chunks (0 = all)",
+                value=state["sample_chunks"],
+                min=0,
+                step=1,
+                on_change=lambda e: state.update(sample_chunks=int(e.value or 0)),
+            ).classes("w-full").props("outlined dense")
+
+            ui.select(
+                REVIEW_MODES,
+                value=state["review_mode"],
+                label="Review",
+                on_change=lambda e: state.update(review_mode=e.value),
+            ).classes("w-full").props("outlined dense")
+
+            ui.label("Budget (0 = no limit)").classes("text-xs uppercase text-primary")
+            ui.number(
+                label="Stop after N questions",
+                value=state["max_questions"],
+                min=0,
+                step=5,
+                on_change=lambda e: state.update(max_questions=int(e.value or 0)),
+            ).classes("w-full").props("outlined dense")
+            ui.number(
+                label="Token cap",
+                value=state["max_tokens"],
+                min=0,
+                step=10000,
+                on_change=lambda e: state.update(max_tokens=int(e.value or 0)),
+            ).classes("w-full").props("outlined dense")
+            ui.number(
+                label="Deadline (minutes)",
+                value=state["deadline_min"],
+                min=0,
+                step=1,
+                on_change=lambda e: state.update(deadline_min=float(e.value or 0)),
+            ).classes("w-full").props("outlined dense")
+
             ui.separator()
             ui.label("Tip").classes("text-xs uppercase text-primary")
             ui.label(
@@ -737,6 +927,14 @@ def index() -> None:
                         icon="refresh",
                         on_click=reset_all,
                     ).props("flat color=primary")
+                    if state["resume_thread"]:
+                        ui.button(
+                            "Resume",
+                            icon="replay",
+                            on_click=lambda: on_generate(resume=True),
+                        ).props("flat color=primary").tooltip(
+                            "Continue the interrupted run; finished chunks are not regenerated"
+                        )
 
         ui.html(
             '<div class="qz-step-row" style="margin-top:4px"><span class="qz-step-badge">2</span><span class="qz-step-label">Generate</span></div>'
@@ -762,6 +960,8 @@ def main() -> None:
     load_dotenv()
     configure_logging()
     app.on_startup(lambda: logger.info("Quizzer UI started"))
+    app.on_startup(loop_monitor.start)
+    app.on_shutdown(loop_monitor.stop)
     ui.run(
         title="Quizzer",
         host="0.0.0.0",
@@ -1,47 +1,25 @@
 from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass, field
+import os
+from dataclasses import dataclass, field, replace
 from typing import Awaitable, Callable, Literal
 
-from langchain_core.callbacks import AsyncCallbackHandler
-from langchain_core.outputs import LLMResult
 from langgraph.types import StateSnapshot
 
-from ..agent.graph import graph_ainvoke
-from ..agent.state import FinalQuizItem
-from ..core import logger
+from ..agent.budget import RunBudget, TokenCounterCallback
+from ..agent.concurrency import get_limiter
+from ..agent.graph import default_concurrency, graph_ainvoke
+from ..agent.llm import default_model
+from ..agent.scheduler import ChunkScheduler
+from ..agent.state import FinalQuizItem, ReviewMode
+from ..core import logger, settings
 
 Phase = Literal[
     "idle", "ingesting", "chunking", "generating", "aggregating", "done", "error"
 ]
 
 
-class TokenCounterCallback(AsyncCallbackHandler):
-    def __init__(self) -> None:
-        self.total_tokens: int = 0
-
-    async def on_llm_end(self, response: LLMResult, **kwargs: object) -> None:
-        try:
-            found = False
-            for gen_list in response.generations:
-                for gen in gen_list:
-                    msg = getattr(gen, "message", None)
-                    usage = getattr(msg, "usage_metadata", None) if msg else None
-                    if isinstance(usage, dict) and usage.get("total_tokens"):
-                        self.total_tokens += usage["total_tokens"]
-                        found = True
-                        break
-                if found:
-                    break
-            if not found and response.llm_output:
-                usage = response.llm_output.get("token_usage", {})
-                if isinstance(usage, dict):
-                    self.total_tokens += usage.get("total_tokens", 0)
-        except Exception:
-            pass
-
-
 @dataclass
 class GenerationProgress:
     phase: Phase = "idle"
@@ -49,8 +27,42 @@ class GenerationProgress:
     total_chunks: int = 0
     chunks_done: int = 0
     quizzes: list[FinalQuizItem] = field(default_factory=list)
+    # Questions streamed from the model whose chunk has not finished review.
+    provisional: list[FinalQuizItem] = field(default_factory=list)
     error: str | None = None
+    # The run's thread id; pass it back to run_generation to resume the run.
+    thread_id: str = ""
+    chunks_resumed: int = 0
     total_tokens: int = 0
+    chunks_removed: int = 0
+    tokens_saved: int = 0
+    reviews: int = 0
+    review_ms: int = 0
+    reviews_skipped: int = 0
+    review_tokens_saved: int = 0
+    llm_calls: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+    # Current adaptive limit on in-flight LLM calls for the run's model.
+    concurrency_limit: int = 0
+    # Chunk batches sent for generation that are still waiting for a slot.
+    chunks_queued: int = 0
+    # Set when a run budget ended the run before every chunk was generated.
+    stop_reason: str = ""
+
+    @property
+    def review_ms_saved(self) -> int:
+        """Reviewer time avoided by self-review, at this run's mean review latency."""
+        if self.reviews <= 0:
+            return 0
+        return self.reviews_skipped * self.review_ms // self.reviews
+
+    @property
+    def hedge_rate(self) -> float:
+        """Share of LLM calls that outlasted the latency percentile and were hedged."""
+        if self.llm_calls <= 0:
+            return 0.0
+        return self.hedged / self.llm_calls
 
     @property
     def fraction(self) -> float:
@@ -70,12 +82,25 @@ async def run_generation(
     model_name: str | None = None,
     concurrency: int | None = None,
     api_key: str | None = None,
+    page_ranges: str | None = None,
+    sample_chunks: int | None = None,
+    review_mode: ReviewMode | None = None,
+    thread_id: str | None = None,
+    budget: RunBudget | None = None,
+    resume: bool = False,
 ) -> list[FinalQuizItem]:
     token_counter = TokenCounterCallback()
-    progress = GenerationProgress(phase="ingesting")
+    budget = budget or RunBudget()
+    thread_id = thread_id or f"qthread_{os.urandom(8).hex()}"
+    progress = GenerationProgress(phase="ingesting", thread_id=thread_id)
     await _emit(on_progress, progress)
 
     cancelled = False
+    chosen = provider or settings.MODEL_PROVIDER
+    limiter = get_limiter(chosen, model_name or default_model(chosen))
+    scheduler = ChunkScheduler(
+        window=concurrency or default_concurrency(), policy=settings.SCHEDULE_POLICY
+    )
 
     async def on_update(update: dict) -> None:
         nonlocal cancelled
@@ -83,34 +108,71 @@ async def run_generation(
             if not isinstance(node_update, dict):
                 continue
 
+            # Pages and chunks arrive in batches while earlier batches are
+            # already generating, so the totals grow over the run.
             if node_name == "page_ingestor":
-                pages = node_update.get("pdf_pages_data", []) or []
-                progress.total_pages = len(pages)
-                progress.phase = "chunking"
+                pages = node_update.get("page_numbers", []) or []
+                progress.total_pages += len(pages)
+                if progress.total_chunks == 0:
+                    progress.phase = "chunking"
 
             elif node_name == "chunking":
-                chunks = node_update.get("crawled_chunks", []) or []
-                progress.total_chunks = len(chunks)
+                chunks = node_update.get("chunk_ids", []) or []
+                progress.total_chunks += len(chunks)
                 progress.phase = "generating"
 
+            elif node_name == "dedup":
+                stats = node_update.get("run_stats", {}) or {}
+                removed = stats.get("chunks_removed", 0)
+                progress.total_chunks -= removed
+                progress.chunks_removed += removed
+                progress.tokens_saved += stats.get("tokens_saved", 0)
+
             elif node_name == "subgraph_generator":
                 new_items = node_update.get("final_quiz", []) or []
                 progress.quizzes.extend(new_items)
-                progress.chunks_done += 1
+                # A batched request completes several chunks at once.
+                completed = node_update.get("completed_chunks") or []
+                progress.chunks_done += len(completed or [None])
+                progress.provisional = [
+                    quiz
+                    for quiz in progress.provisional
+                    if quiz.get("chunk_id") not in completed
+                ]
+                stats = node_update.get("run_stats", {}) or {}
+                progress.reviews += stats.get("reviews", 0)
+                progress.review_ms += stats.get("review_ms", 0)
+                progress.reviews_skipped += stats.get("reviews_skipped", 0)
+                progress.review_tokens_saved += stats.get("review_tokens_saved", 0)
+                progress.llm_calls += stats.get("llm_calls", 0)
+                progress.hedged += stats.get("hedged", 0)
+                progress.hedge_wins += stats.get("hedge_wins", 0)
+                progress.chunks_resumed += stats.get("chunks_resumed", 0)
                 progress.phase = "generating"
 
             elif node_name == "aggregator":
                 progress.phase = "aggregating"
 
         progress.total_tokens = token_counter.total_tokens
+        if limiter is not None:
+            progress.concurrency_limit = limiter.limit
+        progress.chunks_queued = scheduler.queued
         await _emit(on_progress, progress)
 
         if cancel_event is not None and cancel_event.is_set():
             cancelled = True
 
+    async def on_questions(chunk_ids: list[str], questions: list[FinalQuizItem]) -> None:
+        progress.provisional = [
+            quiz for quiz in progress.provisional if quiz.get("chunk_id") not in chunk_ids
+        ] + questions
+        await _emit(on_progress, progress)
+
     try:
         result = await graph_ainvoke(
             pdf_url_or_base64=pdf_path,
+            thread_id=thread_id,
+            resume=resume,
             on_update=on_update,
             cancel_event=cancel_event,
             provider=provider,
@@ -118,26 +180,38 @@ async def run_generation(
             concurrency=concurrency,
             api_key=api_key,
             callbacks=[token_counter],
+            page_ranges=page_ranges,
+            sample_chunks=sample_chunks,
+            review_mode=review_mode,
+            on_questions=on_questions,
+            scheduler=scheduler,
+            budget=budget,
         )
     except Exception as exc:
         logger.exception("Generation failed")
         progress.phase = "error"
         progress.error = str(exc)
+        progress.provisional = []
         await _emit(on_progress, progress)
         raise
 
     if cancelled or (cancel_event is not None and cancel_event.is_set()):
         logger.info("Generation cancelled by user")
+        progress.provisional = []
+        progress.chunks_queued = 0
         progress.phase = "done"
         await _emit(on_progress, progress)
         return list(progress.quizzes)
 
     state_values = result.values if isinstance(result, StateSnapshot) else result
-    final_quiz: list[FinalQuizItem] = list(state_values.get("final_quiz", []) or [])
+    final_quiz = budget.trim(list(state_values.get("final_quiz", []) or []))
 
     progress.quizzes = final_quiz
+    progress.stop_reason = budget.reason
+    progress.provisional = []
+    progress.chunks_queued = 0
     progress.total_tokens = token_counter.total_tokens
-    if progress.total_chunks:
+    if progress.total_chunks and not budget.reason:
         progress.chunks_done = progress.total_chunks
     progress.phase = "done"
     await _emit(on_progress, progress)
@@ -146,14 +220,10 @@ async def run_generation(
 
 
 async def _emit(on_progress: OnProgress, progress: GenerationProgress) -> None:
-    snapshot = GenerationProgress(
-        phase=progress.phase,
-        total_pages=progress.total_pages,
-        total_chunks=progress.total_chunks,
-        chunks_done=progress.chunks_done,
+    snapshot = replace(
+        progress,
         quizzes=list(progress.quizzes),
-        error=progress.error,
-        total_tokens=progress.total_tokens,
+        provisional=list(progress.provisional),
     )
     result = on_progress(snapshot)
     if result is not None:
@@ -0,0 +1,147 @@
+import inspect
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+import pymupdf
+import pytest
+from pydantic import BaseModel
+
+from src.agent import graph as graph_module
+from src.agent import llm
+from src.agent.run_context import RunContext, get_run_context
+
+
+@pytest.fixture
+def write_pdf(tmp_path: Path) -> Callable[..., str]:
+    """Write a PDF with one page per text and return its path.
+
+    An empty text leaves its page blank.
+    """
+
+    def write(texts: list[str], name: str = "doc.pdf") -> str:
+        doc = pymupdf.open()
+        for text in texts:
+            page = doc.new_page()
+            if text:
+                page.insert_text((72, 72), text)
+        doc.save(str(tmp_path / name))
+        doc.close()
+        return str(tmp_path / name)
+
+    return write
+
+
+def _make_quiz(**overrides: object) -> dict:
+    quiz = {
+        "question": "Which organelle produces most of the cell's ATP?",
+        "option_a": "Mitochondria",
+        "option_b": "Ribosome",
+        "option_c": "Nucleus",
+        "option_d": "Golgi apparatus",
+        "answer": "A",
+        "explanation": "Mitochondria run oxidative phosphorylation.",
+        "page_number": 1,
+        "chunk_id": "p1_abc",
+    }
+    return quiz | overrides
+
+
+@pytest.fixture
+def make_quiz() -> Callable[..., dict]:
+    """A well-formed quiz about mitochondria, with any field overridden."""
+    return _make_quiz
+
+
+def _make_chunk(**overrides: object) -> dict:
+    chunk = {
+        "chunk_text": "Mitochondria produce most of the cell's ATP.",
+        "page_number": 1,
+        "iter_count": 0,
+        "is_quiz_relevant": False,
+        "chunk_id": "p1_abc",
+    }
+    return chunk | overrides
+
+
+@pytest.fixture
+def make_chunk() -> Callable[..., dict]:
+    """A chunk about mitochondria, with any field overridden."""
+    return _make_chunk
+
+
+@pytest.fixture
+def chunk_config() -> Callable[..., dict]:
+    """Run config whose run context holds *chunks*, as ``graph_ainvoke`` sets it up.
+
+    The generator subgraph reads chunk text and the LLM target from there.
+    """
+
+    def config(*chunks: dict, **target: str) -> dict:
+        context = RunContext(chunks={chunk["chunk_id"]: chunk for chunk in chunks}, **target)
+        return {"configurable": {"run_context": context}}
+
+    return config
+
+
+@pytest.fixture
+def fake_subgraph(monkeypatch: pytest.MonkeyPatch) -> Callable[[Callable], None]:
+    """Replace the generator subgraph: ``generate(chunk)`` returns a chunk's quizzes.
+
+    *generate* may be a coroutine function; it sees the first chunk of each
+    batch, resolved from the run context as the real subgraph does.
+    """
+
+    def install(generate: Callable) -> None:
+        class FakeSubgraph:
+            async def ainvoke(self, state, config=None):
+                chunks = get_run_context(config).chunks
+                result = generate(chunks[state["chunk_ids"][0]])
+                return {"quiz": await result if inspect.isawaitable(result) else result}
+
+        monkeypatch.setattr(graph_module, "build_generator_subgraph", FakeSubgraph)
+
+    return install
+
+
+@dataclass
+class LLMCall:
+    """One structured LLM call seen by the ``fake_llm`` fixture."""
+
+    schema: type[BaseModel]
+    prompt: str
+    model: str | None
+
+
+Reply = Callable[[LLMCall], object | Awaitable[object]]
+
+
+@pytest.fixture
+def fake_llm(monkeypatch: pytest.MonkeyPatch) -> Callable[[Reply], list[LLMCall]]:
+    """Answer every structured LLM call with ``reply(call)``.
+
+    Returns the list the calls are recorded in, in the order they were made.
+    """
+
+    def install(reply: Reply) -> list[LLMCall]:
+        calls: list[LLMCall] = []
+
+        class FakeStructuredLLM:
+            def __init__(self, schema: type[BaseModel], model: str | None) -> None:
+                self.schema = schema
+                self.model = model
+
+            async def ainvoke(self, messages):
+                call = LLMCall(self.schema, messages[0].content, self.model)
+                calls.append(call)
+                result = reply(call)
+                return await result if inspect.isawaitable(result) else result
+
+        monkeypatch.setattr(
+            llm,
+            "get_structured_llm",
+            lambda schema, model=None, **_: FakeStructuredLLM(schema, model),
+        )
+        return calls
+
+    return install
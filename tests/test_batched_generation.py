@@ -0,0 +1,57 @@
+import pytest
+
+from src.agent.graph import batch_chunks, quiz_generator
+from src.agent.schemas import MultipleBatchedQuiz
+from src.agent.state import ChunkData
+from src.core import settings
+
+
+def _chunk(n: int, text: str = "Mitochondria produce ATP.") -> ChunkData:
+    return {
+        "chunk_text": text,
+        "page_number": n,
+        "iter_count": 0,
+        "is_quiz_relevant": False,
+        "chunk_id": f"p{n}_id",
+    }
+
+
+def test_batch_chunks_fixed_and_context_derived(monkeypatch: pytest.MonkeyPatch) -> None:
+    chunks = [_chunk(n, "x" * 4000) for n in range(1, 6)]
+
+    monkeypatch.setattr(settings, "GEN_BATCH_SIZE", 2)
+    assert [len(b) for b in batch_chunks(chunks, "openai", "gpt-4.1-mini")] == [2, 2, 1]
+
+    # gemma2-9b-it has an 8k window: a quarter of it fits two 1000-token chunks.
+    monkeypatch.setattr(settings, "GEN_BATCH_SIZE", 0)
+    assert [len(b) for b in batch_chunks(chunks, "groq", "gemma2-9b-it")] == [2, 2, 1]
+
+    monkeypatch.setattr(settings, "GEN_BATCH_MAX", 4)
+    assert [len(b) for b in batch_chunks(chunks, "openai", "gpt-4.1-mini")] == [4, 1]
+
+
+async def test_batched_reply_is_split_back_per_chunk(
+    fake_llm, make_quiz, chunk_config
+) -> None:
+    calls = fake_llm(
+        lambda call: MultipleBatchedQuiz.model_validate(
+            {
+                "quizzes": [
+                    make_quiz(chunk_id=chunk_id) for chunk_id in ("p2_id", "p1_id", "unknown")
+                ]
+            }
+        )
+    )
+    batch = [_chunk(1), _chunk(2)]
+
+    result = await quiz_generator(
+        {"chunk_ids": ["p1_id", "p2_id"], "quiz": [], "iter_count": 0},
+        chunk_config(*batch),
+    )
+
+    assert "[chunk_id: p1_id]" in calls[0].prompt and "[chunk_id: p2_id]" in calls[0].prompt
+    assert [(q["chunk_id"], q["page_number"]) for q in result["quiz"]] == [
+        ("p2_id", 2),
+        ("p1_id", 1),
+        ("p1_id", 1),
+    ]
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.agent import graph as graph_module
+from src.agent.graph import page_ingestor, page_planner
+from src.core import run_blocking
+from src.core.blocking import EventLoopMonitor
+
+
+@pytest.mark.asyncio
+async def test_run_blocking_runs_off_the_event_loop_thread() -> None:
+    loop_thread = threading.get_ident()
+
+    worker_thread = await run_blocking(threading.get_ident)
+
+    assert worker_thread != loop_thread
+
+
+@pytest.mark.asyncio
+async def test_page_ingestor_keeps_event_loop_responsive(monkeypatch) -> None:
+    def slow_count(_source):
+        time.sleep(0.3)
+        return 1
+
+    def slow_ingest(_source, pages=None, workers=1):
+        time.sleep(0.3)
+        return [{"page_number": 1, "content": "text"}]
+
+    monkeypatch.setattr(graph_module, "count_pdf_pages", slow_count)
+    monkeypatch.setattr(graph_module, "ingest_pdf", slow_ingest)
+
+    ticks = 0
+
+    async def ticker() -> None:
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.02)
+            ticks += 1
+
+    ticker_task = asyncio.create_task(ticker())
+    plan = await page_planner({"pdf_url_or_base64": "doc.pdf"}, {"configurable": {}})
+    result = await page_ingestor(
+        {"pdf_url_or_base64": "doc.pdf", "page_indices": plan["page_indices"]},
+        {"configurable": {}},
+    )
+    ticker_task.cancel()
+
+    assert plan["page_count"] == 1
+    assert result["page_numbers"] == [1]
+    assert ticks >= 10
+
+
+def test_event_loop_monitor_counts_stalls_over_threshold() -> None:
+    monitor = EventLoopMonitor(warn_ms=100)
+
+    monitor.record(5)
+    monitor.record(250)
+    monitor.record(-1)
+
+    assert monitor.stats.samples == 3
+    assert monitor.stats.stalls == 1
+    assert monitor.stats.max_stall_ms == 250
@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+import pytest
+
+from src.agent.budget import RunBudget
+from src.agent.graph import graph_ainvoke
+from src.core import settings
+
+TEXTS = [
+    "Mitochondria produce ATP in eukaryotic cells.",
+    "Ribosomes assemble proteins from amino acids.",
+    "The Golgi apparatus packages secreted proteins.",
+    "Lysosomes digest worn-out organelles and debris.",
+]
+
+
+@pytest.fixture
+def pdf_path(write_pdf, monkeypatch: pytest.MonkeyPatch) -> str:
+    monkeypatch.setattr(settings, "INGEST_BATCH_PAGES", 1)
+    return write_pdf(TEXTS)
+
+
+def test_budget_records_the_first_limit_reached() -> None:
+    budget = RunBudget(max_questions=3, max_tokens=100)
+
+    assert not budget.check(questions=2, tokens=50)
+    assert budget.check(questions=1, tokens=120)
+    assert budget.check(questions=5, tokens=0)
+    assert budget.reason == "spent 120 of 100 tokens"
+    assert RunBudget(max_questions=2).trim([{}, {}, {}]) == [{}, {}]
+
+
+async def test_question_target_stops_dispatch_and_cancels_in_flight(
+    pdf_path: str, fake_subgraph
+) -> None:
+    started: list[int] = []
+    finished: list[int] = []
+
+    async def generate(chunk: dict) -> list[dict]:
+        started.append(chunk["page_number"])
+        await asyncio.sleep(0.05)
+        finished.append(chunk["page_number"])
+        return [{"question": chunk["chunk_text"], "chunk_id": chunk["chunk_id"]}]
+
+    fake_subgraph(generate)
+    budget = RunBudget(max_questions=2)
+
+    result = await graph_ainvoke(pdf_url_or_base64=pdf_path, concurrency=1, budget=budget)
+
+    assert budget.reason == "reached 2 questions"
+    assert finished == [1, 2]
+    assert 4 not in started
+    assert len(result.values["final_quiz"]) == 2
+    assert result.values["run_stats"]["chunks_skipped"] >= 1
+
+
+async def test_deadline_cancels_slow_calls_and_returns_partial_quiz(
+    pdf_path: str, fake_subgraph
+) -> None:
+    async def generate(chunk: dict) -> list[dict]:
+        if chunk["page_number"] > 1:
+            await asyncio.sleep(30)
+        return [{"question": chunk["chunk_text"], "chunk_id": chunk["chunk_id"]}]
+
+    fake_subgraph(generate)
+    budget = RunBudget(deadline_s=0.5)
+
+    started = time.perf_counter()
+    result = await graph_ainvoke(pdf_url_or_base64=pdf_path, budget=budget)
+
+    assert time.perf_counter() - started < 5
+    assert budget.reason == "deadline of 0.5s passed"
+    assert [quiz["question"] for quiz in result.values["final_quiz"]] == [TEXTS[0]]
@@ -0,0 +1,159 @@
+from operator import add
+from typing import Annotated, TypedDict
+
+import pytest
+from langgraph.graph import END, START, StateGraph
+
+from src.agent import checkpoint
+from src.agent import graph as graph_module
+from src.agent.checkpoint import BoundedMemorySaver
+from src.agent.graph import build_graph, graph_ainvoke
+from src.agent.schemas import MultipleQuiz, ReviewedQuiz
+from src.core import settings
+
+
+class CounterState(TypedDict):
+    steps: Annotated[list[int], add]
+
+
+def _compile(saver: BoundedMemorySaver):
+    builder = StateGraph(CounterState)
+    for name in ("one", "two", "three"):
+        builder.add_node(name, lambda state: {"steps": [len(state["steps"])]})
+    builder.add_edge(START, "one")
+    builder.add_edge("one", "two")
+    builder.add_edge("two", "three")
+    builder.add_edge("three", END)
+    return builder.compile(checkpointer=saver)
+
+
+def _config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+async def test_only_the_latest_checkpoint_is_kept() -> None:
+    saver = BoundedMemorySaver()
+    graph = _compile(saver)
+
+    await graph.ainvoke({"steps": []}, _config("t1"))
+
+    snapshot = await graph.aget_state(_config("t1"))
+    assert snapshot.values == {"steps": [0, 1, 2]}
+    assert len(saver.storage["t1"][""]) == 1
+    channels = [key[2] for key in saver.blobs]
+    assert len(channels) == len(set(channels))  # one version per channel
+
+
+async def test_threads_are_evicted_by_count_and_age(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    now = [0.0]
+    monkeypatch.setattr(checkpoint.time, "monotonic", lambda: now[0])
+    saver = BoundedMemorySaver(max_threads=2, ttl_seconds=60)
+    graph = _compile(saver)
+
+    for thread_id in ("a", "b", "c"):
+        await graph.ainvoke({"steps": []}, _config(thread_id))
+    assert saver.thread_count == 2
+    assert (await graph.aget_state(_config("a"))).values == {}
+    assert (await graph.aget_state(_config("c"))).values == {"steps": [0, 1, 2]}
+
+    now[0] = 120.0
+    await graph.ainvoke({"steps": []}, _config("d"))
+    assert saver.thread_count == 1
+    assert not any(key[0] in ("b", "c") for key in saver.writes)
+
+
+async def test_threads_with_an_active_run_are_not_evicted() -> None:
+    saver = BoundedMemorySaver(max_threads=1)
+    graph = _compile(saver)
+
+    with saver.active("live"):
+        await graph.ainvoke({"steps": []}, _config("live"))
+        for thread_id in ("b", "c"):
+            await graph.ainvoke({"steps": []}, _config(thread_id))
+        assert (await graph.aget_state(_config("live"))).values == {"steps": [0, 1, 2]}
+
+    await graph.ainvoke({"steps": []}, _config("d"))
+    assert saver.thread_count == 1
+    assert (await graph.aget_state(_config("live"))).values == {}
+
+
+def test_main_graph_is_compiled_once() -> None:
+    assert build_graph() is build_graph()
+    assert isinstance(build_graph().checkpointer, BoundedMemorySaver)
+
+
+async def test_checkpoints_hold_references_not_document_text(
+    write_pdf, fake_subgraph, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    pdf_path = write_pdf(["Mitochondria produce ATP.", "Ribosomes assemble proteins."])
+    contexts = []
+    fake_subgraph(lambda chunk: [{"question": "q?", "chunk_id": chunk["chunk_id"]}])
+
+    real_context = graph_module.get_run_context
+
+    def recording_context(config):
+        contexts.append(real_context(config))
+        return contexts[-1]
+
+    monkeypatch.setattr(graph_module, "get_run_context", recording_context)
+
+    result = await graph_ainvoke(
+        pdf_url_or_base64=pdf_path,
+        thread_id="slim-state",
+        api_key="sk-secret",
+    )
+
+    assert len(result.values["final_quiz"]) == 2
+    saver = build_graph().checkpointer
+    saved = b"".join(
+        [blob for key, (_, blob) in saver.blobs.items() if key[0] == "slim-state"]
+        + [
+            value[2][1]
+            for key, writes in saver.writes.items()
+            if key[0] == "slim-state"
+            for value in writes.values()
+        ]
+    )
+    assert b"Mitochondria" not in saved and b"sk-secret" not in saved
+    # The key reaches generation through the context; pages and chunks are
+    # dropped from it once used.
+    assert contexts[-1].api_key == "sk-secret"
+    assert not contexts[-1].pages and not contexts[-1].chunks
+
+
+async def test_generator_subgraph_writes_no_checkpoints(
+    write_pdf, fake_llm, make_quiz, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "PRECHECK_ENABLED", False)
+    fake_llm(
+        lambda call: MultipleQuiz.model_validate({"quizzes": [make_quiz()]})
+        if call.schema is MultipleQuiz
+        else ReviewedQuiz(is_relevant=True, feedback="Fine.")
+    )
+    pdf_path = write_pdf(
+        [
+            "Ribosomes assemble proteins in eukaryotic cells.",
+            "The Golgi apparatus packages secreted proteins.",
+        ]
+    )
+
+    result = await graph_ainvoke(
+        pdf_url_or_base64=pdf_path, thread_id="real-subgraph", api_key="sk-secret"
+    )
+
+    assert len(result.values["final_quiz"]) == 2
+    saver = build_graph().checkpointer
+    assert set(saver.storage["real-subgraph"]) == {""}
+    saved = b"".join(
+        [blob for key, (_, blob) in saver.blobs.items() if key[0] == "real-subgraph"]
+        + [
+            value[2][1]
+            for key, writes in saver.writes.items()
+            if key[0] == "real-subgraph"
+            for value in writes.values()
+        ]
+    )
+    assert b"eukaryotic" not in saved and b"Golgi apparatus packages" not in saved
+    assert b"sk-secret" not in saved
@@ -0,0 +1,106 @@
+import random
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from src.agent.graph import chunk_token_budget
+from src.agent.state import PDFPageData
+from src.agent.utils import chunk_pdf_content, estimate_tokens, pack_pdf_content
+from src.agent.utils.chunk_pdf_content import (
+    CHUNK_OVERLAP,
+    CHUNK_SEPARATORS,
+    CHUNK_SIZE,
+)
+from src.core import settings
+
+WORDS = ["cell", "energy", "membrane\n", "\n\n", "  ", "x" * 1200, "y" * 300 + "\n"]
+
+
+def _random_pages(seed: int) -> list[PDFPageData]:
+    rng = random.Random(seed)
+    return [
+        {
+            "page_number": page + 1,
+            "content": " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 300))),
+        }
+        for page in range(rng.randint(1, 4))
+    ]
+
+
+def _reference_chunks(pages: list[PDFPageData]) -> list[tuple[int, str]]:
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
+        separators=CHUNK_SEPARATORS,
+    )
+    docs = splitter.split_documents(
+        [
+            Document(page_content=p["content"], metadata={"page_number": p["page_number"]})
+            for p in pages
+        ]
+    )
+    return [(doc.metadata["page_number"], doc.page_content) for doc in docs]
+
+
+def test_chunks_match_recursive_character_text_splitter() -> None:
+    for seed in range(20):
+        pages = _random_pages(seed)
+        chunks = chunk_pdf_content(pages)
+        assert [(c["page_number"], c["chunk_text"]) for c in chunks] == _reference_chunks(
+            pages
+        )
+
+
+def test_chunk_ids_are_deterministic_and_unique() -> None:
+    pages: list[PDFPageData] = [
+        {"page_number": 1, "content": "same paragraph\n\n" * 200},
+        {"page_number": 2, "content": "same paragraph\n\n" * 200},
+    ]
+
+    first = [c["chunk_id"] for c in chunk_pdf_content(pages)]
+    second = [c["chunk_id"] for c in chunk_pdf_content(pages)]
+
+    assert first == second
+    assert len(set(first)) == len(first)
+    assert all(chunk_id.startswith(("p1_", "p2_")) for chunk_id in first)
+
+
+def test_pack_joins_small_pages_within_the_token_budget() -> None:
+    pages: list[PDFPageData] = [
+        {"page_number": n, "content": f"page {n} " + "word " * 150} for n in range(1, 8)
+    ]
+
+    chunks = pack_pdf_content(pages, max_tokens=500)
+
+    assert [c["page_number"] for c in chunks] == [1, 3, 5, 7]
+    assert all(estimate_tokens(c["chunk_text"]) <= 500 for c in chunks)
+    joined = "".join(c["chunk_text"] for c in chunks)
+    assert all(f"page {n} " in joined for n in range(1, 8))
+
+
+def test_pack_splits_oversized_pages_without_overlap() -> None:
+    pages: list[PDFPageData] = [
+        {"page_number": 1, "content": "short intro"},
+        {"page_number": 2, "content": "\n\n".join(["sentence " * 40] * 30)},
+        {"page_number": 3, "content": "short outro"},
+    ]
+
+    chunks = pack_pdf_content(pages, max_tokens=250)
+
+    assert chunks[0]["chunk_text"] == "short intro"
+    assert chunks[-1]["chunk_text"] == "short outro"
+    middle = chunks[1:-1]
+    assert len(middle) > 1
+    assert all(c["page_number"] == 2 for c in middle)
+    assert all(len(c["chunk_text"]) <= 1000 for c in middle)
+    assert sum(len(c["chunk_text"]) for c in middle) <= len(pages[1]["content"])
+
+
+def test_chunk_token_budget_follows_mode_and_model(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "CHUNK_MODE", "chars")
+    assert chunk_token_budget("openai", "gpt-4.1-mini") == 0
+
+    monkeypatch.setattr(settings, "CHUNK_MODE", "tokens")
+    monkeypatch.setattr(settings, "CHUNK_MAX_TOKENS", 6000)
+    assert chunk_token_budget("openai", "gpt-4.1-mini") == 6000
+    assert chunk_token_budget("groq", "gemma2-9b-it") == 8192 // 4
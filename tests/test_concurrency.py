@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from src.agent import concurrency
+from src.agent.concurrency import AdaptiveLimiter, is_rate_limit_error
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+def test_limit_grows_on_success_and_halves_on_rate_limit(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    limiter = AdaptiveLimiter(initial=4, minimum=1, maximum=6)
+    for _ in range(20):
+        limiter.record_success(latency_ms=100)
+    assert limiter.limit == 6  # capped at the maximum
+
+    limiter.record_rate_limit()
+    limiter.record_rate_limit()  # same burst: only one decrease
+    assert limiter.limit == 3
+
+    monkeypatch.setattr(concurrency, "BACKOFF_COOLDOWN_SECONDS", 0)
+    for _ in range(5):
+        limiter.record_rate_limit()
+    assert limiter.limit == 1  # never below the minimum
+
+
+def test_rate_limit_errors_are_recognised() -> None:
+    assert is_rate_limit_error(RateLimitError())
+    assert not is_rate_limit_error(ValueError("boom"))
+
+
+async def test_slots_bound_in_flight_calls_and_react_to_429s() -> None:
+    limiter = AdaptiveLimiter(initial=2, minimum=1, maximum=2)
+    peak = 0
+
+    async def call(fail: bool) -> None:
+        nonlocal peak
+        async with limiter.slot():
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+            if fail:
+                raise RateLimitError()
+
+    results = await asyncio.gather(
+        *(call(fail=i == 0) for i in range(6)), return_exceptions=True
+    )
+
+    assert peak == 2
+    assert sum(isinstance(r, RateLimitError) for r in results) == 1
+    assert limiter.rate_limits == 1 and limiter.in_flight == 0
@@ -0,0 +1,106 @@
+import random
+
+import pytest
+
+from src.agent.state import ChunkData
+from src.agent.utils import dedup_chunks
+from src.ui import runner as runner_module
+from src.ui.runner import GenerationProgress, run_generation
+
+BODY = [
+    "Photosynthesis converts light energy into chemical energy stored in glucose molecules inside plant cells.",
+    "The French Revolution began in 1789 and transformed the political landscape of Europe for decades.",
+    "Newton's second law states that force equals mass times acceleration for a body of constant mass.",
+    "Mitochondria generate most of the cell's supply of adenosine triphosphate used as chemical energy.",
+]
+
+VOCABULARY = (
+    "cell energy light plant river empire court law force mass orbit star acid "
+    "salt gene trait cloud storm price trade coast glacier poem verse atom field"
+).split()
+
+
+def _chunk(text: str, page: int, chunk_id: str) -> ChunkData:
+    return {
+        "chunk_text": text,
+        "page_number": page,
+        "iter_count": 0,
+        "is_quiz_relevant": False,
+        "chunk_id": chunk_id,
+    }
+
+
+def test_repeated_headers_and_footers_are_stripped() -> None:
+    chunks = [
+        _chunk(f"BIOLOGY 101 - Lecture Notes\n{body}\nPage {i + 1} of 40", i + 1, str(i))
+        for i, body in enumerate(BODY)
+    ]
+
+    result = dedup_chunks(chunks)
+
+    assert result.chunks_removed == 0
+    assert [c["chunk_text"] for c in result.chunks] == BODY
+    assert result.lines_stripped == 8
+    assert result.tokens_saved > 0
+
+
+def _prose(seed: int, lines: int = 3) -> list[str]:
+    words = random.Random(seed).choices(VOCABULARY, k=12 * lines)
+    return [" ".join(words[i : i + 12]) for i in range(0, len(words), 12)]
+
+
+def test_only_page_edges_count_and_lines_are_stripped_at_chunk_edges() -> None:
+    chunks = []
+    for page in range(1, 5):
+        head, middle, tail = (_prose(page * 10 + k) for k in range(3))
+        chunks += [
+            _chunk("\n".join(["BIOLOGY", *head, "Key terms"]), page, f"{page}a"),
+            _chunk("\n".join(["Key terms", *middle, "Example"]), page, f"{page}b"),
+            _chunk("\n".join(["Example", *tail, f"Page {page}"]), page, f"{page}c"),
+        ]
+    body = _prose(99, lines=6)
+    chunks.append(_chunk("\n".join([*body[:3], "BIOLOGY", *body[3:]]), 5, "5a"))
+
+    result = dedup_chunks(chunks)
+
+    assert result.boilerplate_lines == ["biology", "page #"]
+    texts = {c["chunk_id"]: c["chunk_text"] for c in result.chunks}
+    assert texts["1a"] == "\n".join([*_prose(10), "Key terms"])
+    assert texts["1c"] == "\n".join(["Example", *_prose(12)])
+    # Away from the chunk's edges a repeated header line is body text.
+    assert "BIOLOGY" in texts["5a"]
+
+
+def test_near_duplicate_chunks_are_dropped_across_batches() -> None:
+    first = dedup_chunks([_chunk(BODY[0] + " " + BODY[1], 1, "a")])
+    near_copy = BODY[0] + " " + BODY[1].replace("decades", "decades.")
+
+    second = dedup_chunks(
+        [_chunk(near_copy, 7, "b"), _chunk(BODY[2], 8, "c")],
+        boilerplate_lines=first.boilerplate_lines,
+        seen_signatures=first.signatures,
+    )
+
+    assert [c["chunk_id"] for c in second.chunks] == ["c"]
+    assert second.chunks_removed == 1
+    assert second.duplicates == ["b"]
+    assert len(second.signatures) == 2
+
+
+@pytest.mark.asyncio
+async def test_runner_reports_dedup_savings(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def fake_graph_ainvoke(*_args, on_update=None, **_kwargs):
+        await on_update({"chunking": {"chunk_ids": ["c1", "c2", "c3"]}})
+        await on_update(
+            {"dedup": {"run_stats": {"chunks_removed": 1, "tokens_saved": 500}}}
+        )
+        return {"final_quiz": []}
+
+    monkeypatch.setattr(runner_module, "graph_ainvoke", fake_graph_ainvoke)
+    snapshots: list[GenerationProgress] = []
+
+    await run_generation("dummy.pdf", snapshots.append)
+
+    assert snapshots[-2].total_chunks == 2
+    assert snapshots[-2].chunks_removed == 1
+    assert snapshots[-2].tokens_saved == 500
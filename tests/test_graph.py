@@ -23,8 +23,8 @@ async def test_aggregator_does_not_re_emit_quiz_items() -> None:
     """Regression: aggregator must return {} so the add reducer doesn't double quiz items."""
     state = GlobalQuizState(
         pdf_url_or_base64="",
-        pdf_pages_data=[],
-        crawled_chunks=[],
+        page_numbers=[],
+        chunk_ids=[],
         final_quiz=[_make_quiz_item("Q1?"), _make_quiz_item("Q2?")],
     )
 
@@ -13,17 +13,17 @@ async def test_on_update_exception_does_not_abort_graph(monkeypatch):
     """A raising on_update callback should be caught and logged, not propagated."""
 
     fake_updates = [
-        {"page_ingestor": {"pdf_pages_data": []}},
-        {"chunking": {"crawled_chunks": []}},
+        {"page_ingestor": {"page_numbers": []}},
+        {"chunking": {"chunk_ids": []}},
         {"aggregator": {"final_quiz": []}},
     ]
 
     fake_final_state = AsyncMock()
     fake_final_state.values = {"final_quiz": []}
 
-    async def fake_astream(initial_state, *, config, stream_mode):
+    async def fake_astream(initial_state, *, config, stream_mode, subgraphs):
         for update in fake_updates:
-            yield update
+            yield (), update
 
     mock_graph = AsyncMock()
     mock_graph.astream = fake_astream
@@ -48,17 +48,17 @@ async def test_on_update_healthy_callback_still_receives_updates(monkeypatch):
     """A well-behaved on_update callback should still receive every update."""
 
     fake_updates = [
-        {"page_ingestor": {"pdf_pages_data": []}},
-        {"chunking": {"crawled_chunks": []}},
+        {"page_ingestor": {"page_numbers": []}},
+        {"chunking": {"chunk_ids": []}},
         {"aggregator": {"final_quiz": []}},
     ]
 
     fake_final_state = AsyncMock()
     fake_final_state.values = {"final_quiz": []}
 
-    async def fake_astream(initial_state, *, config, stream_mode):
+    async def fake_astream(initial_state, *, config, stream_mode, subgraphs):
         for update in fake_updates:
-            yield update
+            yield (), update
 
     mock_graph = AsyncMock()
     mock_graph.astream = fake_astream
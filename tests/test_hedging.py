@@ -0,0 +1,180 @@
+import asyncio
+
+import pytest
+
+from src.agent import llm
+from src.agent.concurrency import AdaptiveLimiter
+from src.agent.graph import build_generator_subgraph
+from src.agent.hedging import LatencyTracker, call_with_hedge
+from src.agent.schemas import MultipleQuiz, ReviewedQuiz
+from src.core import settings
+
+
+def _warm_tracker(seconds: float, samples: int = 20) -> LatencyTracker:
+    tracker = LatencyTracker()
+    for _ in range(samples):
+        tracker.record(seconds)
+    return tracker
+
+
+def test_percentile_needs_enough_samples() -> None:
+    tracker = LatencyTracker()
+    for latency in range(1, 20):
+        tracker.record(latency / 100)
+    assert tracker.percentile(95) is None
+
+    tracker.record(0.2)
+    assert tracker.percentile(95) == 0.19
+    assert tracker.percentile(50) == 0.1
+
+
+async def test_straggler_is_hedged_and_loser_cancelled(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "HEDGE_PERCENTILE", 95)
+    cancelled = asyncio.Event()
+
+    async def straggler() -> str:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "primary"
+
+    async def hedge() -> str:
+        return "hedge"
+
+    stats: dict[str, int] = {}
+    result = await call_with_hedge(straggler, hedge, _warm_tracker(0.01), stats)
+    await asyncio.sleep(0)
+
+    assert result == "hedge"
+    assert cancelled.is_set()
+    assert stats == {"llm_calls": 1, "hedged": 1, "hedge_wins": 1}
+
+
+async def test_fast_call_is_not_hedged() -> None:
+    async def fast() -> str:
+        return "primary"
+
+    async def hedge() -> str:
+        raise AssertionError("hedge should not be sent")
+
+    stats: dict[str, int] = {}
+    assert await call_with_hedge(fast, hedge, _warm_tracker(1.0), stats) == "primary"
+    assert stats == {"llm_calls": 1}
+
+
+async def test_failed_hedge_falls_back_to_primary() -> None:
+    async def slow() -> str:
+        await asyncio.sleep(0.05)
+        return "primary"
+
+    async def broken() -> str:
+        raise RuntimeError("fallback down")
+
+    stats: dict[str, int] = {}
+    result = await call_with_hedge(slow, broken, _warm_tracker(0.01), stats)
+    assert result == "primary"
+    assert stats.get("hedge_wins", 0) == 0
+
+
+async def test_deadline_abandons_the_call(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "LLM_CALL_TIMEOUT_S", 0.02)
+
+    async def hung() -> str:
+        await asyncio.sleep(10)
+        return "never"
+
+    stats: dict[str, int] = {}
+    with pytest.raises(TimeoutError):
+        await call_with_hedge(hung, None, LatencyTracker(), stats)
+    assert stats["deadline_exceeded"] == 1
+
+
+async def test_invoke_structured_hedges_to_fallback_model(
+    fake_llm, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "HEDGE_ENABLED", True)
+    monkeypatch.setattr(settings, "HEDGE_FALLBACK_MODEL", "backup-model")
+    monkeypatch.setattr(settings, "LLM_CACHE_PATH", "")
+    monkeypatch.setattr(settings, "ADAPTIVE_CONCURRENCY", False)
+    monkeypatch.setattr(
+        llm, "get_latency_tracker", lambda provider, model: _warm_tracker(0.01)
+    )
+
+    async def reply(call):
+        if call.model != "backup-model":
+            await asyncio.sleep(10)
+        return ReviewedQuiz(is_relevant=True, feedback=call.model or "")
+
+    calls = fake_llm(reply)
+
+    stats: dict[str, int] = {}
+    response = await llm.invoke_structured(
+        ReviewedQuiz, "prompt", provider="groq", model="slow-model", stats=stats
+    )
+
+    assert isinstance(response, ReviewedQuiz)
+    assert response.feedback == "backup-model"
+    assert [call.model for call in calls] == ["slow-model", "backup-model"]
+    assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+
+
+async def test_waiting_for_a_slot_is_neither_timed_out_nor_hedged(
+    fake_llm, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "HEDGE_ENABLED", True)
+    monkeypatch.setattr(settings, "HEDGE_FALLBACK_MODEL", "backup-model")
+    monkeypatch.setattr(settings, "LLM_CALL_TIMEOUT_S", 0.05)
+    monkeypatch.setattr(settings, "LLM_CACHE_PATH", "")
+    monkeypatch.setattr(
+        llm, "get_latency_tracker", lambda provider, model: _warm_tracker(0.01)
+    )
+    monkeypatch.setattr(llm, "get_rate_limiter", lambda provider, api_key: None)
+    limiter = AdaptiveLimiter(initial=1, minimum=1, maximum=1)
+    monkeypatch.setattr(llm, "get_limiter", lambda provider, model: limiter)
+    calls = fake_llm(lambda call: ReviewedQuiz(is_relevant=True, feedback=call.model or ""))
+
+    await limiter.acquire()  # another call holds the only slot
+    stats: dict[str, int] = {}
+    call = asyncio.create_task(
+        llm.invoke_structured(
+            ReviewedQuiz, "prompt", provider="groq", model="slow-model", stats=stats
+        )
+    )
+    await asyncio.sleep(0.2)
+    assert calls == []
+
+    limiter.release()
+    response = await call
+
+    assert isinstance(response, ReviewedQuiz)
+    assert response.feedback == "slow-model"
+    assert stats == {"llm_calls": 1}
+    assert limiter.in_flight == 0 and limiter.successes == 1
+
+
+async def test_timed_out_call_is_retried_by_the_graph(
+    fake_llm, make_quiz, make_chunk, chunk_config, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "LLM_CALL_TIMEOUT_S", 0.05)
+    monkeypatch.setattr(settings, "PRECHECK_ENABLED", False)
+    quiz = make_quiz()
+
+    async def reply(call):
+        if len(calls) == 1:
+            await asyncio.sleep(10)
+        if call.schema is MultipleQuiz:
+            return MultipleQuiz.model_validate({"quizzes": [quiz]})
+        return ReviewedQuiz(is_relevant=True, feedback="Fine.")
+
+    calls = fake_llm(reply)
+    result = await build_generator_subgraph().ainvoke(
+        {"chunk_ids": ["p1_abc"], "quiz": [], "iter_count": 0, "is_quiz_relevant": False},
+        chunk_config(make_chunk()),
+    )
+
+    assert [call.schema for call in calls] == [MultipleQuiz, MultipleQuiz, ReviewedQuiz]
+    assert [q["question"] for q in result["quiz"]] == [quiz["question"]]
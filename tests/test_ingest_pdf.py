@@ -0,0 +1,167 @@
+import asyncio
+import base64
+import importlib
+import os
+import threading
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+
+from src.agent import graph as graph_module
+from src.agent.graph import graph_ainvoke
+from src.agent.utils import (
+    count_pdf_pages,
+    ingest_pdf,
+    iter_pdf_pages,
+    resolve_pdf_source,
+)
+from src.core import settings
+
+# The package re-exports the function under the module's own name.
+ingest_module = importlib.import_module("src.agent.utils.ingest_pdf")
+
+
+def test_iter_pdf_pages_skips_empty_pages_and_honours_range(write_pdf) -> None:
+    pdf_path = write_pdf(["one", "", "three", "four"])
+
+    assert count_pdf_pages(pdf_path) == 4
+    assert [p["page_number"] for p in ingest_pdf(pdf_path)] == [1, 3, 4]
+    assert [p["page_number"] for p in iter_pdf_pages(pdf_path, start=1, stop=3)] == [3]
+    assert "three" in next(iter_pdf_pages(pdf_path, start=2))["content"]
+
+
+@pytest.mark.asyncio
+async def test_generation_starts_before_all_pages_are_ingested(
+    write_pdf, fake_subgraph, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    pdf_path = write_pdf(["alpha", "beta", "gamma"])
+    monkeypatch.setattr(settings, "INGEST_BATCH_PAGES", 1)
+
+    events: list[str] = []
+    generated = threading.Event()
+    real_ingest = graph_module.ingest_pdf
+
+    def recording_ingest(source, workers=1, pages=None):
+        if pages == [2]:
+            # Hold the last page back until the first one has generated.
+            generated.wait(timeout=5)
+        events.append(f"ingest:{pages[0]}")
+        return real_ingest(source, workers=workers, pages=pages)
+
+    def generate(chunk: dict) -> list[dict]:
+        events.append(f"generate:{chunk['page_number']}")
+        generated.set()
+        return [{"question": chunk["chunk_text"]}]
+
+    monkeypatch.setattr(graph_module, "ingest_pdf", recording_ingest)
+    fake_subgraph(generate)
+
+    updates: list[dict] = []
+
+    async def on_update(update: dict) -> None:
+        updates.append(update)
+
+    result = await graph_ainvoke(pdf_url_or_base64=pdf_path, on_update=on_update)
+
+    assert events.index("generate:1") < events.index("ingest:2")
+    assert [event for event in events if event.startswith("ingest")] == [
+        "ingest:0",
+        "ingest:1",
+        "ingest:2",
+    ]
+    assert len(result.values["final_quiz"]) == 3
+    assert sum("page_ingestor" in update for update in updates) == 3
+    assert sum("aggregator" in update for update in updates) == 1
+
+
+@pytest.mark.asyncio
+async def test_page_batches_generate_while_earlier_batches_still_are(
+    write_pdf, fake_subgraph, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    pdf_path = write_pdf(["alpha", "beta"])
+    monkeypatch.setattr(settings, "INGEST_BATCH_PAGES", 1)
+    second_started = asyncio.Event()
+
+    async def generate(chunk: dict) -> list[dict]:
+        if chunk["page_number"] == 1:
+            # Page 1 only finishes once page 2 is generating alongside it.
+            await asyncio.wait_for(second_started.wait(), timeout=5)
+        else:
+            second_started.set()
+        return [{"question": chunk["chunk_text"]}]
+
+    fake_subgraph(generate)
+
+    result = await graph_ainvoke(pdf_url_or_base64=pdf_path)
+
+    assert len(result.values["final_quiz"]) == 2
+
+
+def test_parallel_extraction_matches_serial_page_order(write_pdf) -> None:
+    texts = [f"page {i}" if i % 5 else "" for i in range(40)]
+    pdf_path = write_pdf(texts)
+
+    serial = ingest_pdf(pdf_path)
+    parallel = ingest_pdf(pdf_path, workers=2)
+
+    assert parallel == serial
+    assert ingest_pdf(Path(pdf_path).read_bytes(), workers=2) == serial
+    assert [p["page_number"] for p in parallel] == sorted(p["page_number"] for p in parallel)
+
+
+async def test_buffer_is_spilled_once_per_run(
+    write_pdf, fake_subgraph, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    pdf_path = write_pdf([f"Page {i} covers cell biology." for i in range(48)])
+    monkeypatch.setattr(settings, "INGEST_WORKERS", 2)
+    monkeypatch.setattr(settings, "INGEST_BATCH_PAGES", 16)
+    spills: list[str] = []
+    real_spill = ingest_module.spill_pdf
+
+    def recording_spill(buffer) -> str:
+        spills.append(real_spill(buffer))
+        return spills[-1]
+
+    monkeypatch.setattr(ingest_module, "spill_pdf", recording_spill)
+    monkeypatch.setattr(graph_module, "spill_pdf", recording_spill)
+    fake_subgraph(lambda chunk: [])
+
+    result = await graph_ainvoke(pdf_url_or_base64=Path(pdf_path).read_bytes())
+
+    assert result.values["page_count"] == 48
+    assert len(spills) == 1
+    assert not os.path.exists(spills[0])
+
+
+def test_ingest_pdf_accepts_paths_buffers_and_file_objects(write_pdf) -> None:
+    pdf_path = write_pdf(["one", "two"])
+    raw = Path(pdf_path).read_bytes()
+    data_url = "data:application/pdf;base64," + base64.b64encode(raw).decode()
+    expected = ingest_pdf(pdf_path)
+
+    assert ingest_pdf(Path(pdf_path)) == expected
+    assert ingest_pdf(raw) == expected
+    assert ingest_pdf(memoryview(bytearray(raw))) == expected
+    assert ingest_pdf(BytesIO(raw)) == expected
+    assert ingest_pdf(data_url) == expected
+    with open(pdf_path, "rb") as file:
+        assert ingest_pdf(file) == expected
+
+
+def test_resolve_pdf_source_rejects_unknown_strings() -> None:
+    with pytest.raises(ValueError):
+        resolve_pdf_source("not a pdf")
+
+
+@pytest.mark.asyncio
+async def test_graph_keeps_in_memory_pdf_out_of_state(
+    write_pdf, fake_subgraph
+) -> None:
+    raw = Path(write_pdf(["alpha"])).read_bytes()
+    fake_subgraph(lambda chunk: [{"question": chunk["chunk_text"]}])
+
+    result = await graph_ainvoke(pdf_url_or_base64=raw)
+
+    assert result.values["pdf_url_or_base64"] == ""
+    assert len(result.values["final_quiz"]) == 1
@@ -0,0 +1,40 @@
+import pytest
+
+from src.agent import llm
+from src.agent.schemas import MultipleQuiz, ReviewedQuiz
+from src.core import settings
+
+
+@pytest.fixture(autouse=True)
+def _fresh_registry():
+    llm.clear_llm_clients()
+    yield
+    llm.clear_llm_clients()
+
+
+def test_clients_are_reused_per_provider_model_and_key() -> None:
+    first = llm.get_llm("openai", "gpt-4.1-mini", "sk-one")
+
+    assert llm.get_llm("openai", "gpt-4.1-mini", "sk-one") is first
+    assert llm.get_llm("openai", "gpt-4.1-mini", "sk-two") is not first
+    assert llm.get_llm("openai", "gpt-4o-mini", "sk-one") is not first
+
+
+def test_structured_runnables_are_cached_per_schema() -> None:
+    quiz = llm.get_structured_llm(MultipleQuiz, "groq", "llama-3.3-70b-versatile", "gsk")
+
+    assert llm.get_structured_llm(MultipleQuiz, "groq", "llama-3.3-70b-versatile", "gsk") is quiz
+    assert llm.get_structured_llm(ReviewedQuiz, "groq", "llama-3.3-70b-versatile", "gsk") is not quiz
+
+
+def test_registry_evicts_least_recently_used(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "LLM_CLIENT_CACHE_SIZE", 2)
+    a = llm.get_llm("openai", "gpt-4.1-mini", "sk-a")
+    b = llm.get_llm("openai", "gpt-4.1-mini", "sk-b")
+    llm.get_llm("openai", "gpt-4.1-mini", "sk-a")
+    llm.get_llm("openai", "gpt-4.1-mini", "sk-c")
+
+    assert len(llm._clients) == 2
+    assert all("sk-a" not in key for key in llm._clients)
+    assert llm.get_llm("openai", "gpt-4.1-mini", "sk-a") is a
+    assert llm.get_llm("openai", "gpt-4.1-mini", "sk-b") is not b
@@ -0,0 +1,75 @@
+import pytest
+
+from src.agent.utils import (
+    parse_page_ranges,
+    sample_chunks_per_page,
+    sample_evenly,
+    select_pages,
+)
+from src.core import logger
+
+
+def test_parse_page_ranges_handles_single_pages_and_spans() -> None:
+    assert parse_page_ranges("10-45, 80") == [(10, 45), (80, 80)]
+    assert parse_page_ranges("") == []
+
+
+@pytest.mark.parametrize("spec", ["0", "5-3", "a-b", "1-2-3"])
+def test_parse_page_ranges_rejects_invalid_specs(spec: str) -> None:
+    with pytest.raises(ValueError):
+        parse_page_ranges(spec)
+
+
+def test_select_pages_applies_ranges_then_sampling() -> None:
+    assert select_pages(5) == [0, 1, 2, 3, 4]
+    assert select_pages(100, page_ranges="3-5,4,99-") == [2, 3, 4, 98, 99]
+    assert select_pages(100, sample_chunks=3) == [0, 50, 99]
+    assert select_pages(100, page_ranges="11-20", sample_chunks=2) == [10, 19]
+
+
+def test_sample_evenly_returns_everything_when_count_is_large() -> None:
+    assert sample_evenly([1, 2, 3], 5) == [1, 2, 3]
+    assert sample_evenly([1, 2, 3], 1) == [2]
+
+
+def test_sample_chunks_per_page_keeps_one_chunk_per_page() -> None:
+    chunks = [
+        {
+            "chunk_text": text,
+            "page_number": page,
+            "iter_count": 0,
+            "is_quiz_relevant": False,
+            "chunk_id": text,
+        }
+        for text, page in [("a", 1), ("b", 1), ("c", 1), ("d", 2)]
+    ]
+    assert [c["chunk_id"] for c in sample_chunks_per_page(chunks)] == ["b", "d"]
+
+
+@pytest.mark.parametrize(
+    "page_count, page_ranges, sample_chunks",
+    [(10, "20-30", 0), (10, "3,11", 0), (0, "", 0), (10, "", -1)],
+)
+def test_select_pages_rejects_empty_or_out_of_range_selections(
+    page_count: int, page_ranges: str, sample_chunks: int
+) -> None:
+    with pytest.raises(ValueError):
+        select_pages(page_count, page_ranges=page_ranges, sample_chunks=sample_chunks)
+
+
+def test_short_samples_are_logged() -> None:
+    warnings: list[str] = []
+    sink = logger.add(warnings.append, level="WARNING", format="{message}")
+    assert select_pages(3, sample_chunks=5) == [0, 1, 2]
+    chunk = {
+        "chunk_text": "a",
+        "page_number": 1,
+        "iter_count": 0,
+        "is_quiz_relevant": False,
+        "chunk_id": "a",
+    }
+    assert sample_chunks_per_page([chunk], pages=[1, 2]) == [chunk]
+    logger.remove(sink)
+
+    assert len(warnings) == 2
+    assert "[2]" in warnings[1]
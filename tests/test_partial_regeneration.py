@@ -0,0 +1,45 @@
+import pytest
+
+from src.agent.graph import build_generator_subgraph
+from src.agent.schemas import MultipleQuiz, ReviewedQuiz
+from src.core import settings
+
+
+async def test_rejected_questions_are_replaced_and_accepted_ones_kept(
+    fake_llm, make_quiz, make_chunk, chunk_config, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "PRECHECK_ENABLED", False)
+    replies = iter(
+        [
+            MultipleQuiz.model_validate(
+                {"quizzes": [make_quiz(question="Good?"), make_quiz(question="Vague?")]}
+            ),
+            ReviewedQuiz.model_validate(
+                {
+                    "is_relevant": False,
+                    "feedback": "One vague question.",
+                    "verdicts": [
+                        {"index": 1, "accepted": True},
+                        {"index": 2, "accepted": False, "feedback": "too vague"},
+                    ],
+                }
+            ),
+            MultipleQuiz.model_validate({"quizzes": [make_quiz(question="Sharper?")]}),
+            ReviewedQuiz(is_relevant=True, feedback="Fine."),
+        ]
+    )
+    calls = fake_llm(lambda call: next(replies))
+    result = await build_generator_subgraph().ainvoke(
+        {"chunk_ids": ["p1_abc"], "quiz": [], "iter_count": 0, "is_quiz_relevant": False},
+        chunk_config(make_chunk()),
+    )
+
+    regenerate_prompt = calls[2].prompt
+    assert "'Vague?': too vague" in regenerate_prompt
+    assert "Good?" in regenerate_prompt and "exactly 1 new quiz" in regenerate_prompt
+    second_review_prompt = calls[3].prompt
+    assert "Sharper?" in second_review_prompt and "Good?" not in second_review_prompt
+
+    questions = [q["question"] for q in result["accepted"] + result["quiz"]]
+    assert questions == ["Good?", "Sharper?"]
+    assert result["run_stats"]["questions_kept"] == 1
@@ -0,0 +1,74 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from src.agent import graph as graph_module
+from src.agent.graph import graph_ainvoke
+from src.agent.utils import PDFCache, pdf_digest
+from src.core import settings
+
+
+def test_pdf_cache_round_trip_and_lru_eviction(tmp_path: Path) -> None:
+    cache = PDFCache(str(tmp_path), max_bytes=250)
+    cache.put("aa-old", ["x" * 100])
+    cache.put("bb-new", ["y" * 100])
+    old_path = tmp_path / "aa" / "aa-old.json"
+    os.utime(old_path, (0, 0))
+    assert cache.get("aa-old") == ["x" * 100]  # read bumps recency
+
+    cache.put("cc-newest", ["z" * 100])
+
+    assert cache.get("aa-old") == ["x" * 100]
+    assert cache.get("bb-new") is None
+    assert cache.get("cc-newest") == ["z" * 100]
+
+
+def test_pdf_digest_matches_for_path_and_bytes(write_pdf) -> None:
+    pdf_path = Path(write_pdf(["hello"]))
+
+    assert pdf_digest(str(pdf_path)) == pdf_digest(pdf_path.read_bytes())
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_skips_ingestion_and_chunking(
+    tmp_path: Path, write_pdf, fake_subgraph, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    pdf_path = Path(write_pdf(["alpha", "beta", "gamma"]))
+
+    monkeypatch.setattr(settings, "PDF_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(settings, "INGEST_BATCH_PAGES", 2)
+
+    fake_subgraph(lambda chunk: [{"question": chunk["chunk_text"]}])
+    first = await graph_ainvoke(pdf_url_or_base64=str(pdf_path))
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("cache miss")
+
+    monkeypatch.setattr(graph_module, "ingest_pdf", fail)
+    monkeypatch.setattr(graph_module, "count_pdf_pages", fail)
+    monkeypatch.setattr(graph_module, "chunk_pdf_content", fail)
+    second = await graph_ainvoke(pdf_url_or_base64=pdf_path.read_bytes())
+
+    assert second.values["final_quiz"] == first.values["final_quiz"]
+
+
+@pytest.mark.asyncio
+async def test_chunk_cache_is_keyed_on_the_selected_pages(
+    tmp_path: Path, write_pdf, fake_subgraph, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    pdf_path = write_pdf(
+        [f"Topic {number}: fact number {number * 37}." for number in range(1, 11)]
+    )
+
+    monkeypatch.setattr(settings, "PDF_CACHE_DIR", str(tmp_path / "cache"))
+    sent: list[int] = []
+
+    fake_subgraph(lambda chunk: sent.append(chunk["page_number"]) or [])
+    await graph_ainvoke(pdf_url_or_base64=pdf_path, page_ranges="1-10")
+    sent.clear()
+
+    # Same first and last page as the run above, but only two pages selected.
+    await graph_ainvoke(pdf_url_or_base64=pdf_path, page_ranges="1,10")
+
+    assert sorted(sent) == [1, 10]
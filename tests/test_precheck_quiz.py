@@ -0,0 +1,122 @@
+import pytest
+
+from src.agent.graph import build_generator_subgraph
+from src.agent.schemas import MultipleQuiz, ReviewedQuiz
+from src.agent.utils import precheck_quiz
+from src.core import settings
+
+CHUNK = (
+    "Mitochondria produce most of the cell's ATP through oxidative "
+    "phosphorylation across the inner membrane."
+)
+
+
+@pytest.fixture
+def subgraph_input(make_chunk, chunk_config) -> tuple[dict, dict]:
+    """Subgraph state and config for one chunk of ``CHUNK``."""
+    state = {"chunk_ids": ["p1_abc"], "quiz": [], "iter_count": 0, "is_quiz_relevant": False}
+    return state, chunk_config(make_chunk(chunk_text=CHUNK))
+
+
+def test_grounded_quiz_passes_only_when_overlap_passes_are_enabled(make_quiz) -> None:
+    assert precheck_quiz([make_quiz()], CHUNK, pass_overlap=0.5).verdict == "pass"
+    assert precheck_quiz([make_quiz()], CHUNK).verdict == "borderline"
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"option_b": "", "answer": "B"},
+        {"option_c": "mitochondria"},
+        {"question": "Who painted the Sistine Chapel?", "option_a": "Michelangelo"},
+        {"explanation": "Option C is correct because it stores DNA."},
+        {"explanation": "The answer is (B): ribosomes make ATP."},
+    ],
+)
+def test_clear_failures_are_rejected(make_quiz, overrides: dict) -> None:
+    result = precheck_quiz([make_quiz(), make_quiz(**overrides)], CHUNK)
+
+    assert result.verdict == "fail"
+    assert result.problems[0].startswith("quiz 2:")
+
+
+@pytest.mark.parametrize(
+    "explanation",
+    [
+        "Option C is a common distractor; mitochondria make the ATP.",
+        "Unlike choice B, mitochondria run oxidative phosphorylation.",
+        "Option D is wrong because the Golgi packages proteins.",
+    ],
+)
+def test_explanation_discussing_a_distractor_is_borderline(
+    make_quiz, explanation: str
+) -> None:
+    result = precheck_quiz([make_quiz(explanation=explanation)], CHUNK, pass_overlap=0.5)
+
+    assert result.verdict == "borderline"
+    assert result.notes[0].startswith("explanation mentions option")
+
+
+def test_verdicts_are_reported_per_quiz(make_quiz) -> None:
+    weak = make_quiz(question="Which structure in eukaryotic cells generates energy?")
+    result = precheck_quiz(
+        [make_quiz(), make_quiz(option_c="mitochondria"), weak], CHUNK, pass_overlap=0.5
+    )
+
+    assert result.verdict == "fail"
+    assert result.verdicts == ["pass", "fail", "borderline"]
+    assert result.notes[1] == "duplicate options"
+
+
+def test_weakly_grounded_quiz_is_borderline(make_quiz) -> None:
+    quiz = make_quiz(question="Which structure in eukaryotic cells generates energy?")
+
+    assert precheck_quiz([quiz], CHUNK).verdict == "borderline"
+
+
+async def test_precheck_skips_reviewer_and_regenerates_failures(
+    fake_llm, make_quiz, subgraph_input, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "PRECHECK_PASS_OVERLAP", 0.5)
+    drafts = iter([make_quiz(option_b="mitochondria"), make_quiz()])
+    calls = fake_llm(lambda call: MultipleQuiz.model_validate({"quizzes": [next(drafts)]}))
+
+    result = await build_generator_subgraph().ainvoke(*subgraph_input)
+
+    assert [call.schema for call in calls] == [MultipleQuiz, MultipleQuiz]
+    assert result["is_quiz_relevant"] is True
+    assert result["run_stats"] == {
+        "llm_calls": 2,
+        "prechecks_failed": 1,
+        "prechecks_passed": 1,
+    }
+
+
+async def test_precheck_keeps_passing_questions_and_replaces_failures(
+    fake_llm, make_quiz, subgraph_input, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "PRECHECK_PASS_OVERLAP", 0.5)
+    good = make_quiz(question="Which organelle produces ATP?")
+    broken = make_quiz(question="Where is ATP produced?", option_c="mitochondria")
+    weak = make_quiz(question="Which structure in eukaryotic cells generates energy?")
+    replies = iter(
+        [
+            MultipleQuiz.model_validate({"quizzes": [good, broken, weak]}),
+            ReviewedQuiz(is_relevant=True, feedback="Fine."),
+            MultipleQuiz.model_validate({"quizzes": [make_quiz()]}),
+        ]
+    )
+    calls = fake_llm(lambda call: next(replies))
+
+    result = await build_generator_subgraph().ainvoke(*subgraph_input)
+
+    review_prompt = calls[1].prompt
+    assert weak["question"] in review_prompt
+    assert good["question"] not in review_prompt
+    assert broken["question"] not in review_prompt
+    replacement_prompt = calls[2].prompt
+    assert "duplicate options" in replacement_prompt
+    assert "exactly 1 new quiz" in replacement_prompt
+    assert good["question"] in replacement_prompt and weak["question"] in replacement_prompt
+    questions = [q["question"] for q in result["accepted"] + result["quiz"]]
+    assert questions == [good["question"], weak["question"], make_quiz()["question"]]
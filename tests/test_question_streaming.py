@@ -0,0 +1,145 @@
+import json
+from collections import Counter, OrderedDict
+
+import pytest
+from langchain_core.language_models.chat_models import agenerate_from_stream
+from langchain_core.messages import AIMessageChunk
+from langchain_core.outputs import ChatGenerationChunk
+from langchain_openai import ChatOpenAI
+from pydantic import Field
+
+from src.agent import llm
+from src.agent.graph import graph_ainvoke
+from src.core import settings
+from src.ui.app import _card, _quiz_key, settle_cards
+from src.ui import runner as runner_module
+from src.ui.runner import GenerationProgress, run_generation
+
+QUIZ_FIELDS = (
+    "question", "option_a", "option_b", "option_c", "option_d", "answer", "explanation"
+)
+
+
+class StreamingChatOpenAI(ChatOpenAI):
+    """ChatOpenAI that streams canned replies a few characters at a time.
+
+    Tool calls arrive as tool-call chunks and JSON schema replies as content,
+    the way the API sends them; ``replies`` maps a schema's name to its JSON.
+    """
+
+    replies: dict[str, str] = Field(default_factory=dict)
+    events: list[str] = Field(default_factory=list)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        # Tools arrive converted to OpenAI's format, a response format as the schema.
+        tools = kwargs.get("tools")
+        name = tools[0]["function"]["name"] if tools else kwargs["response_format"].__name__
+        reply = self.replies[name]
+        for start in range(0, len(reply), 8):
+            self.events.append(f"sent:{name}:{start + 8 >= len(reply)}")
+            piece = reply[start : start + 8]
+            if tools:
+                first = start == 0
+                chunk = AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {
+                            "name": name if first else None,
+                            "args": piece,
+                            "id": "call_1" if first else None,
+                            "index": 0,
+                        }
+                    ],
+                )
+            else:
+                chunk = AIMessageChunk(content=piece)
+                if start + 8 >= len(reply):
+                    chunk.additional_kwargs["parsed"] = json.loads(reply)
+            yield ChatGenerationChunk(message=chunk)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        return await agenerate_from_stream(self._astream(messages, stop, **kwargs))
+
+
+async def test_questions_are_published_as_they_complete(
+    write_pdf, make_quiz, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    pdf_path = write_pdf(["Mitochondria produce most of the ATP."])
+    monkeypatch.setattr(settings, "PRECHECK_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_CACHE_PATH", "")
+    monkeypatch.setattr(settings, "HEDGE_ENABLED", False)
+
+    quizzes = [make_quiz(question="first?"), make_quiz(question="second?")]
+    model = StreamingChatOpenAI(
+        model="gpt-4o-mini",
+        api_key="sk-test",
+        replies={
+            "MultipleQuiz": json.dumps(
+                {"quizzes": [{key: quiz[key] for key in QUIZ_FIELDS} for quiz in quizzes]}
+            ),
+            "ReviewedQuiz": json.dumps({"is_relevant": True, "feedback": ""}),
+        },
+    )
+    monkeypatch.setattr(llm, "_clients", OrderedDict())
+    monkeypatch.setattr(llm, "_build_llm", lambda provider, name, key: model)
+    published: list[list[str]] = []
+
+    def on_questions(chunk_ids: list[str], questions: list[dict]) -> None:
+        model.events.append(f"published:{len(questions)}")
+        published.append([q["question"] for q in questions])
+
+    result = await graph_ainvoke(
+        pdf_url_or_base64=pdf_path,
+        provider="openai",
+        model_name="gpt-4o-mini",
+        api_key="sk-test",
+        on_questions=on_questions,
+    )
+
+    # The first question is out while the second is still being streamed,
+    # and everything is published before the reviewer runs.
+    events = model.events
+    assert published == [[], ["first?"], ["first?", "second?"]]
+    assert events.index("published:1") < events.index("sent:MultipleQuiz:True")
+    assert events.index("published:2") < events.index("sent:ReviewedQuiz:True")
+    assert len(result.values["final_quiz"]) == 2
+
+
+async def test_provisional_questions_clear_when_their_chunk_completes(
+    make_quiz, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def fake_graph_ainvoke(*_args, on_update=None, on_questions=None, **_kwargs):
+        await on_questions(["c1"], [make_quiz(question="draft", chunk_id="c1")])
+        await on_questions(["c2"], [make_quiz(question="other", chunk_id="c2")])
+        await on_update({"subgraph_generator": {
+            "final_quiz": [make_quiz(question="reviewed", chunk_id="c1")],
+            "completed_chunks": ["c1"],
+        }})
+        return {"final_quiz": [make_quiz(question="reviewed", chunk_id="c1")]}
+
+    monkeypatch.setattr(runner_module, "graph_ainvoke", fake_graph_ainvoke)
+    snapshots: list[GenerationProgress] = []
+
+    await run_generation("dummy.pdf", snapshots.append)
+
+    assert [q["question"] for q in snapshots[1].provisional] == ["draft"]
+    assert [q["question"] for q in snapshots[2].provisional] == ["draft", "other"]
+    assert [q["question"] for q in snapshots[3].provisional] == ["other"]
+    assert [q["question"] for q in snapshots[3].quizzes] == ["reviewed"]
+    assert snapshots[-1].provisional == []
+
+
+def test_settled_cards_keep_the_users_edits_and_deletions(make_quiz) -> None:
+    kept, deleted, trimmed, unseen, draft = (
+        make_quiz(question=f"{name}?", chunk_id=name)
+        for name in ("kept", "deleted", "trimmed", "unseen", "draft")
+    )
+    shown = Counter(_quiz_key(q) for q in (kept, deleted, trimmed))
+    edited = {**_card(kept), "question": "kept, reworded?"}
+    cards = [edited, _card(trimmed), _card(draft, provisional=True)]
+
+    settled = settle_cards(cards, [unseen, deleted, kept], shown)
+
+    assert [card["question"] for card in settled] == ["kept, reworded?", "unseen?"]
+    assert settled[0]["_id"] == edited["_id"]
+    assert not any(card.get("_provisional") for card in settled)
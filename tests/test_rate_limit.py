@@ -0,0 +1,64 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.agent import graph as graph_module
+from src.agent.graph import graph_ainvoke
+from src.agent.rate_limit import RateLimiter, current_session, get_rate_limiter
+from src.core import settings
+
+
+async def test_sessions_are_served_round_robin() -> None:
+    # 10 requests/s with room for a single request at a time.
+    limiter = RateLimiter(requests_per_minute=600, burst_seconds=0.1)
+    order: list[str] = []
+
+    async def call(session: str, n: int) -> None:
+        await limiter.acquire(tokens=1, session=session)
+        order.append(f"{session}{n}")
+
+    busy = [asyncio.create_task(call("a", n)) for n in range(1, 5)]
+    await asyncio.sleep(0)
+    late = asyncio.create_task(call("b", 1))
+    await asyncio.gather(*busy, late)
+
+    # b's request waits for at most one more of a's, not all of them.
+    assert order == ["a1", "a2", "b1", "a3", "a4"]
+
+
+async def test_token_budget_delays_large_prompts() -> None:
+    limiter = RateLimiter(tokens_per_minute=60_000, burst_seconds=0.1)  # 100 burst
+
+    started = time.perf_counter()
+    await limiter.acquire(tokens=100, session="a")
+    await limiter.acquire(tokens=50, session="a")
+
+    assert time.perf_counter() - started >= 0.04
+
+
+def test_limiters_are_shared_per_provider_and_key(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "RATE_LIMIT_RPM", {"groq": 30})
+
+    assert get_rate_limiter("openai", "sk") is None
+    shared = get_rate_limiter("groq", "gsk-server")
+    assert get_rate_limiter("groq", "gsk-server") is shared
+    assert get_rate_limiter("groq", "gsk-user") is not shared
+
+
+async def test_run_session_does_not_outlive_the_run(monkeypatch: pytest.MonkeyPatch) -> None:
+    sessions: list[str] = []
+
+    async def fake_astream(initial_state, *, config, stream_mode, subgraphs):
+        sessions.append(current_session.get())
+        yield (), {"aggregator": {}}
+
+    mock_graph = AsyncMock()
+    mock_graph.astream = fake_astream
+    monkeypatch.setattr(graph_module, "build_graph", lambda: mock_graph)
+
+    await graph_ainvoke(pdf_url_or_base64="test.pdf", thread_id="run-1")
+
+    assert sessions == ["run-1"]
+    assert current_session.get() == ""
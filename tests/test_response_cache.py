@@ -0,0 +1,68 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from src.agent.graph import build_generator_subgraph
+from src.agent.schemas import MultipleQuiz, ReviewedQuiz
+from src.agent.utils import ResponseCache
+from src.core import settings
+
+
+def test_response_cache_ttl_lru_eviction_and_counters(tmp_path: Path) -> None:
+    cache = ResponseCache(str(tmp_path / "llm.sqlite"), max_bytes=50, ttl_seconds=60)
+    cache.put("old", {"v": "x" * 10})
+    cache.put("new", {"v": "y" * 10})
+    assert cache.get("old") == {"v": "x" * 10}  # read bumps recency
+
+    cache.put("newest", {"v": "z" * 10})
+
+    assert cache.get("new") is None
+    assert cache.get("newest") == {"v": "z" * 10}
+    assert (cache.stats.hits, cache.stats.misses) == (2, 1)
+
+    cache.ttl_seconds = 0
+    time.sleep(0.01)
+    assert cache.get("newest") is None
+
+
+async def test_rerun_is_served_from_the_response_cache(
+    tmp_path: Path,
+    fake_llm,
+    make_quiz,
+    make_chunk,
+    chunk_config,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "LLM_CACHE_PATH", str(tmp_path / "llm.sqlite"))
+    monkeypatch.setattr(settings, "PRECHECK_ENABLED", False)
+
+    def reply(call):
+        if call.schema is MultipleQuiz:
+            return MultipleQuiz.model_validate({"quizzes": [make_quiz()]})
+        # Reject the first draft so the rerun has to replay a regeneration.
+        reviews = sum(c.schema is ReviewedQuiz for c in calls)
+        return ReviewedQuiz(is_relevant=reviews > 1, feedback="")
+
+    calls = fake_llm(reply)
+    state = {
+        "chunk_ids": ["p1_abc"],
+        "quiz": [],
+        "iter_count": 0,
+        "is_quiz_relevant": False,
+        "questions_per_chunk": 0,
+    }
+    config = chunk_config(make_chunk(), provider="openai", model_name="gpt-4.1-mini")
+
+    first = await build_generator_subgraph().ainvoke(state, config)
+    assert [call.schema for call in calls] == [
+        MultipleQuiz,
+        ReviewedQuiz,
+        MultipleQuiz,
+        ReviewedQuiz,
+    ]
+
+    second = await build_generator_subgraph().ainvoke(state, config)
+    assert len(calls) == 4
+    assert second["quiz"] == first["quiz"]
+    assert second["is_quiz_relevant"] is True
@@ -0,0 +1,69 @@
+import pytest
+
+from src.agent.graph import build_generator_subgraph
+from src.agent.schemas import ReviewedQuiz, SelfReviewedQuiz
+from src.core import settings
+
+
+def _state(review_mode: str) -> dict:
+    return {
+        "chunk_ids": ["p3_abc"],
+        "quiz": [],
+        "iter_count": 0,
+        "is_quiz_relevant": False,
+        "questions_per_chunk": 0,
+        "review_mode": review_mode,
+        "run_stats": {},
+    }
+
+
+@pytest.fixture
+def config(make_chunk, chunk_config) -> dict:
+    return chunk_config(
+        make_chunk(page_number=3, chunk_id="p3_abc"),
+        provider="openai",
+        model_name="gpt-4.1-mini",
+    )
+
+
+@pytest.fixture
+def self_reviewing_llm(fake_llm, make_quiz):
+    """Install a model whose own review of its quiz is *self_verdict*."""
+
+    def install(self_verdict: bool) -> list:
+        def reply(call):
+            if call.schema is ReviewedQuiz:
+                return ReviewedQuiz(is_relevant=True, feedback="ok")
+            return call.schema.model_validate(
+                {"quizzes": [make_quiz()], "is_relevant": self_verdict, "feedback": ""}
+            )
+
+        return fake_llm(reply)
+
+    return install
+
+
+async def test_passing_self_review_skips_the_reviewer(self_reviewing_llm, config) -> None:
+    calls = self_reviewing_llm(self_verdict=True)
+
+    result = await build_generator_subgraph().ainvoke(_state("self"), config)
+
+    assert [call.schema for call in calls] == [SelfReviewedQuiz]
+    assert result["is_quiz_relevant"] is True
+    assert result["quiz"][0]["page_number"] == 3
+    assert result["run_stats"]["reviews_skipped"] == 1
+    assert result["run_stats"]["review_tokens_saved"] > 0
+
+
+async def test_failed_self_review_falls_back_to_the_reviewer(
+    self_reviewing_llm, config, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls = self_reviewing_llm(self_verdict=False)
+    monkeypatch.setattr(settings, "PRECHECK_ENABLED", False)
+
+    result = await build_generator_subgraph().ainvoke(_state("self"), config)
+
+    assert [call.schema for call in calls] == [SelfReviewedQuiz, ReviewedQuiz]
+    assert result["is_quiz_relevant"] is True
+    assert result["run_stats"]["reviews"] == 1
+    assert "reviews_skipped" not in result["run_stats"]
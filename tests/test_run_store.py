@@ -0,0 +1,106 @@
+from pathlib import Path
+
+import pytest
+
+from src.agent.checkpoint import BoundedMemorySaver
+from src.agent.graph import build_graph, graph_ainvoke
+from src.agent.utils import RunStore, run_store
+from src.core import settings
+
+
+def test_run_store_round_trip(tmp_path: Path) -> None:
+    store = RunStore(str(tmp_path / "runs.sqlite"))
+    quiz = {"question": "q?", "chunk_id": "c1"}
+
+    store.put("t1", {"c1": [quiz], "c2": []})
+
+    assert store.get("t1", ["c1", "c2", "c3"]) == {"c1": [quiz], "c2": []}
+    assert store.get("t2", ["c1"]) == {}
+    assert store.completed("t1") == 2
+
+
+def test_run_store_drops_threads_past_their_ttl(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(run_store.time, "time", lambda: now[0])
+    store = RunStore(str(tmp_path / "runs.sqlite"), ttl_seconds=60)
+
+    store.put("old", {"c1": []})
+    now[0] += 30
+    store.put("kept", {"c1": []})
+    store.put("old", {"c2": []})  # a write keeps the whole thread alive
+    now[0] += 45
+    store.put("new", {"c1": []})
+    assert store.completed("old") == 2
+
+    now[0] += 40
+    store.put("new", {"c2": []})
+
+    assert store.completed("old") == 0
+    assert store.completed("kept") == 0
+    assert store.completed("new") == 2
+
+
+async def test_resume_only_generates_missing_chunks(
+    tmp_path: Path, write_pdf, fake_subgraph, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    pdf_path = write_pdf(["Mitochondria produce ATP.", "Ribosomes assemble proteins."])
+    monkeypatch.setattr(settings, "CHECKPOINT_PATH", str(tmp_path / "runs.sqlite"))
+    monkeypatch.setattr(settings, "INGEST_BATCH_PAGES", 1)
+
+    generated: list[int] = []
+    fail_on_page = [2]
+
+    def generate(chunk: dict) -> list[dict]:
+        if chunk["page_number"] in fail_on_page:
+            raise RuntimeError("process restarted")
+        generated.append(chunk["page_number"])
+        return [{"question": chunk["chunk_text"], "chunk_id": chunk["chunk_id"]}]
+
+    fake_subgraph(generate)
+
+    with pytest.raises(RuntimeError):
+        await graph_ainvoke(pdf_url_or_base64=pdf_path, thread_id="run-1")
+    assert generated == [1]
+
+    fail_on_page.clear()
+    result = await graph_ainvoke(
+        pdf_url_or_base64=pdf_path, thread_id="run-1", resume=True
+    )
+
+    assert generated == [1, 2]
+    assert len(result.values["final_quiz"]) == 2
+    assert result.values["run_stats"]["chunks_resumed"] == 1
+
+
+async def test_only_an_explicit_resume_with_a_store_wipes_the_thread(
+    tmp_path: Path, write_pdf, fake_subgraph, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    pdf_path = write_pdf(["Mitochondria produce ATP."])
+    monkeypatch.setattr(settings, "CHECKPOINT_PATH", "")
+    fake_subgraph(lambda chunk: [{"question": chunk["chunk_text"]}])
+    wiped: list[str] = []
+    real_delete = BoundedMemorySaver.adelete_thread
+
+    async def recording_delete(self, thread_id: str) -> None:
+        wiped.append(thread_id)
+        await real_delete(self, thread_id)
+
+    monkeypatch.setattr(BoundedMemorySaver, "adelete_thread", recording_delete)
+
+    first = await graph_ainvoke(pdf_url_or_base64=pdf_path, thread_id="live-run")
+    resumed = await graph_ainvoke(
+        pdf_url_or_base64=pdf_path, thread_id="live-run", resume=True
+    )
+
+    assert wiped == []
+    assert len(resumed.values["final_quiz"]) == 1
+    assert resumed.config["configurable"]["thread_id"] != "live-run"
+    kept = await build_graph().aget_state({"configurable": {"thread_id": "live-run"}})
+    assert kept.values["final_quiz"] == first.values["final_quiz"]
+
+    monkeypatch.setattr(settings, "CHECKPOINT_PATH", str(tmp_path / "runs.sqlite"))
+    await graph_ainvoke(pdf_url_or_base64=pdf_path, thread_id="live-run", resume=True)
+
+    assert wiped == ["live-run"]
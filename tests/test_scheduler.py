@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+
+from src.agent import graph as graph_module
+from src.agent.graph import graph_ainvoke
+from src.agent.scheduler import ChunkScheduler, OrderedTurns, spread_order
+from src.core import settings
+
+
+def _chunk(chunk_id: str, text: str) -> dict:
+    return {"chunk_id": chunk_id, "chunk_text": text, "page_number": 1}
+
+
+def test_spread_order_halves_the_gaps() -> None:
+    order = sorted(range(8), key=lambda position: spread_order([], position, 8))
+
+    assert order == [0, 4, 2, 6, 1, 5, 3, 7]
+
+
+async def test_window_bounds_batches_and_releases_by_priority() -> None:
+    scheduler = ChunkScheduler(window=1, policy="shortest")
+    texts = {"a": "x" * 400, "b": "x" * 40, "c": "x" * 4000, "d": "x" * 4}
+    for key, text in texts.items():
+        scheduler.submit(key, [_chunk(key, text)])
+    started: list[str] = []
+    peak = 0
+
+    async def run(key: str) -> None:
+        nonlocal peak
+        async with scheduler.turn(key) as admitted:
+            assert admitted
+            started.append(key)
+            peak = max(peak, scheduler.running)
+            await asyncio.sleep(0.01)
+
+    assert scheduler.queued == 4
+    await asyncio.gather(*(run(key) for key in texts))
+
+    assert started == ["d", "b", "a", "c"]
+    assert peak == 1
+    assert scheduler.running == 0
+    assert scheduler.queued == 0
+
+
+async def test_stop_turns_queued_batches_away() -> None:
+    scheduler = ChunkScheduler(window=1)
+    for key in ("a", "b", "c"):
+        scheduler.submit(key, [_chunk(key, key)])
+    outcomes: dict[str, bool] = {}
+
+    async def run(key: str) -> None:
+        async with scheduler.turn(key) as admitted:
+            outcomes[key] = admitted
+            if admitted:
+                scheduler.stop()
+                await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(run(key) for key in ("a", "b", "c")))
+
+    assert outcomes == {"a": True, "b": False, "c": False}
+    assert scheduler.running == 0
+
+
+async def test_ordered_turns_pass_by_rank_even_when_a_holder_fails() -> None:
+    turns = OrderedTurns()
+    entered: list[int] = []
+
+    async def take(rank: int) -> None:
+        async with turns.turn(rank):
+            entered.append(rank)
+            await asyncio.sleep(0)
+            if rank == 1:
+                raise RuntimeError("extraction failed")
+
+    results = await asyncio.gather(
+        *(take(rank) for rank in (3, 1, 2, 0)), return_exceptions=True
+    )
+
+    assert entered == [0, 1, 2, 3]
+    assert isinstance(results[1], RuntimeError)
+    assert [results[0], results[2], results[3]] == [None, None, None]
+
+
+async def test_graph_starts_chunks_in_policy_order(
+    write_pdf, fake_subgraph, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    pdf_path = write_pdf(
+        [
+            "Mitochondria produce ATP in eukaryotic cells.",
+            "Ribosomes assemble proteins from amino acids.",
+            "The Golgi apparatus packages secreted proteins.",
+            "Lysosomes digest worn-out organelles and debris.",
+        ]
+    )
+    monkeypatch.setattr(settings, "INGEST_BATCH_PAGES", 0)
+
+    started: list[int] = []
+
+    async def generate(chunk: dict) -> list[dict]:
+        started.append(chunk["page_number"])
+        await asyncio.sleep(0)
+        return []
+
+    fake_subgraph(generate)
+
+    await graph_ainvoke(
+        pdf_url_or_base64=pdf_path,
+        concurrency=1,
+        schedule_policy="spread",
+    )
+
+    assert started == [1, 3, 2, 4]
+
+
+async def test_spread_order_reaches_across_page_batches(
+    write_pdf, fake_subgraph, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    pdf_path = write_pdf(
+        [
+            "Mitochondria produce ATP in eukaryotic cells.",
+            "Ribosomes assemble proteins from amino acids.",
+            "The Golgi apparatus packages secreted proteins.",
+            "Lysosomes digest worn-out organelles and debris.",
+        ]
+    )
+    monkeypatch.setattr(settings, "INGEST_BATCH_PAGES", 1)
+    read: list[int] = []
+    real_ingest = graph_module.ingest_pdf
+
+    def recording_ingest(source, workers=1, pages=None):
+        read.extend(pages)
+        return real_ingest(source, workers=workers, pages=pages)
+
+    monkeypatch.setattr(graph_module, "ingest_pdf", recording_ingest)
+    started: list[int] = []
+
+    async def generate(chunk: dict) -> list[dict]:
+        started.append(chunk["page_number"])
+        await asyncio.sleep(0)
+        return []
+
+    fake_subgraph(generate)
+
+    await graph_ainvoke(
+        pdf_url_or_base64=pdf_path,
+        concurrency=1,
+        schedule_policy="spread",
+    )
+
+    assert read == [0, 2, 1, 3]
+    assert started == [1, 3, 2, 4]
+
+
+def test_read_order_follows_the_policy() -> None:
+    assert ChunkScheduler(policy="spread").read_order(5) == [0, 4, 2, 1, 3]
+    assert ChunkScheduler(policy="shortest").read_order(3) == [0, 1, 2]
@@ -26,8 +26,8 @@ def _quiz(qid: str, page: int) -> dict:
 @pytest.mark.asyncio
 async def test_run_generation_maps_updates_to_progress(monkeypatch):
     fake_updates = [
-        {"page_ingestor": {"pdf_pages_data": [{"page_number": i, "content": ""} for i in range(1, 4)]}},
-        {"chunking": {"crawled_chunks": [{}, {}]}},
+        {"page_ingestor": {"page_numbers": [1, 2, 3]}},
+        {"chunking": {"chunk_ids": ["c1", "c2"]}},
         {"subgraph_generator": {"final_quiz": [_quiz("c1", 1)]}},
         {"subgraph_generator": {"final_quiz": [_quiz("c2", 2)]}},
         {"aggregator": {"final_quiz": [_quiz("c1", 1), _quiz("c2", 2)]}},
@@ -43,6 +43,7 @@ async def test_run_generation_maps_updates_to_progress(monkeypatch):
         concurrency: int | None = None,
         api_key: str | None = None,
         callbacks: list | None = None,
+        **_kwargs,
     ) -> Any:
         for update in fake_updates:
             if on_update is not None:
@@ -115,8 +116,8 @@ async def test_run_generation_supports_async_callback(monkeypatch):
         *_args, on_update=None, cancel_event=None, provider=None, model_name=None, concurrency=None, **_kwargs
     ):
         if on_update is not None:
-            await on_update({"page_ingestor": {"pdf_pages_data": [{}]}})
-            await on_update({"chunking": {"crawled_chunks": [{}]}})
+            await on_update({"page_ingestor": {"page_numbers": [1]}})
+            await on_update({"chunking": {"chunk_ids": ["c1"]}})
             await on_update({"subgraph_generator": {"final_quiz": [_quiz("c1", 1)]}})
             await on_update({"aggregator": {"final_quiz": [_quiz("c1", 1)]}})
         return {"final_quiz": [_quiz("c1", 1)]}
@@ -140,8 +141,8 @@ async def test_run_generation_cancels_early(monkeypatch):
     cancel_event = asyncio.Event()
 
     fake_updates = [
-        {"page_ingestor": {"pdf_pages_data": [{"page_number": i, "content": ""} for i in range(1, 4)]}},
-        {"chunking": {"crawled_chunks": [{}, {}, {}, {}]}},
+        {"page_ingestor": {"page_numbers": [1, 2, 3]}},
+        {"chunking": {"chunk_ids": ["c1", "c2", "c3", "c4"]}},
         {"subgraph_generator": {"final_quiz": [_quiz("c1", 1)]}},
         # cancel_event will be set after the first subgraph update
         {"subgraph_generator": {"final_quiz": [_quiz("c2", 2)]}},
@@ -162,6 +163,7 @@ async def test_run_generation_cancels_early(monkeypatch):
         concurrency: int | None = None,
         api_key: str | None = None,
         callbacks: list | None = None,
+        **_kwargs,
     ) -> Any:
         nonlocal call_count
         for update in fake_updates: